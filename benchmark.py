@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Benchmark the aquarium without a terminal.
+
+Runs a headless aquarium with tanks of different sizes and prints how many
+frames and simulated days per second it manages, along with how long each
+part of a frame takes. With --startup it instead times how long the
+command line commands take to start up and run, and with --replay it
+replays a recorded session as fast as it can. With --memory it measures
+how much memory each fish takes up.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.fish.fish import DAY
+from src.tank import Tank, DEFAULT_HEIGHT, DEFAULT_MAX_FISH, DEFAULT_WIDTH, \
+    default_max_fish
+from src.urwid_interface.headless import HeadlessAquarium, PHASES
+from src.urwid_interface.movement import MOVEMENTS, RANDOM
+
+
+def make_tank(fish_count: int, seed: int) -> Tank:
+    """Make a tank filled with random fish.
+
+    The tank is made just big enough to fit the fish, keeping the shape of
+    the default tank, so the fish have as much room as they would in the
+    aquarium.
+
+    Args:
+        fish_count: Number of fish to put in the tank.
+        seed: Seed for picking the fish.
+    """
+    random.seed(seed)
+    scale = max(1, math.sqrt(fish_count/DEFAULT_MAX_FISH))
+    width = math.ceil(DEFAULT_WIDTH*scale)
+    height = math.ceil(DEFAULT_HEIGHT*scale)
+    tank = Tank(width=width, height=height,
+                max_fish=default_max_fish(width, height), last_checkin=0)
+    species = list(tank.fish_builder.species.keys())
+    personalities = list(tank.fish_builder.personalities.keys())
+    for i in range(fish_count):
+        fish = tank.fish_builder.make_fish(name=f'Fish {i}',
+                                           species_name=random.choice(species),
+                                           personality_name=random.choice(personalities))
+        fish.last_fed = 0
+        fish.last_checkin = 0
+        tank.add_fish(fish)
+    return tank
+
+
+def startup_time(args: list, runs: int) -> float:
+    """Time running fish.py in a new process.
+
+    Args:
+        args: Command line arguments for fish.py.
+        runs: Number of times to run it.
+
+    Returns:
+        Median seconds it took to run.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fish.py')
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, script] + args, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def benchmark_startup(runs: int, seed: int):
+    """Time the command line commands and print the results."""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'afish')
+        make_tank(10, seed).save(filename)
+        print(f'{"command":>10} {"ms":>10}')
+        for command in ['--help', 'status', 'feed']:
+            seconds = startup_time([command, '--file', filename], runs)
+            print(f'{command:>10} {1000*seconds:>10.4g}')
+
+
+def memory_per_fish(fish_count: int, seed: int) -> dict:
+    """Measure how many bytes each fish takes up when a tank is loaded.
+
+    The tank is saved and loaded again so the fish are built the same way as
+    when reading a save file, then each fish is given art as if it were shown
+    in a tank.
+
+    Returns:
+        Dict with the bytes per fish and per fish art.
+    """
+    from src.urwid_interface.fish_art import FishArt
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'afish')
+        make_tank(fish_count, seed).save(filename)
+        tank = Tank(max_fish=fish_count)
+        tank.fish_builder.species  # Read in the catalogs before measuring
+        tank.fish_builder.personalities
+        tracemalloc.start()
+        tank.load(filename)
+        fish_bytes = tracemalloc.get_traced_memory()[0]
+        art = [FishArt(fish, 1, 1, flipped=False) for fish in tank.fish]
+        art_bytes = tracemalloc.get_traced_memory()[0] - fish_bytes
+        tracemalloc.stop()
+    return {'fish': fish_bytes/fish_count, 'art': art_bytes/len(art)}
+
+
+def benchmark_memory(fish_counts: list, seed: int):
+    """Measure the memory used by fish and print the results."""
+    print(f'{"fish":>10} {"B/fish":>10} {"B/art":>10}')
+    for fish_count in fish_counts:
+        result = memory_per_fish(fish_count, seed)
+        print(f'{fish_count:>10} {result["fish"]:>10.4g} {result["art"]:>10.4g}')
+
+
+def benchmark_replay(filename: str):
+    """Replay a recorded session and print how fast it ran."""
+    from src.urwid_interface.recording import Replay
+    result = Replay(filename).run()
+    print(f'{"frames":>10} {"seconds":>10} {"fps":>10}')
+    print(f'{result["frames"]:>10} {result["seconds"]:>10.4g} '
+          f'{result["frames_per_second"]:>10.4g}')
+
+
+def main():
+    """Run the benchmarks and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fish', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Number of fish in each tank to benchmark')
+    parser.add_argument('--frames', type=int, default=1000,
+                        help='Number of frames to run for each tank')
+    parser.add_argument('--speed', type=float, default=DAY,
+                        help='How many times faster than real time to run')
+    parser.add_argument('--movement', choices=MOVEMENTS, default=RANDOM,
+                        help='How the fish move around the tank')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed for making the tanks and moving the fish')
+    parser.add_argument('--startup', type=int, metavar='RUNS', default=0,
+                        help='Time starting up the commands instead, running '
+                             'each this many times')
+    parser.add_argument('--memory', action='store_true',
+                        help='Measure the bytes used by each fish instead')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='Replay a session recorded with fish.py --record '
+                             'instead')
+    args = parser.parse_args()
+
+    if args.memory:
+        benchmark_memory(args.fish, args.seed)
+        return
+
+    if args.replay:
+        benchmark_replay(args.replay)
+        return
+
+    if args.startup:
+        benchmark_startup(args.startup, args.seed)
+        return
+
+    columns = ['fish', 'fps', 'days/s'] + [f'{phase} ms' for phase in PHASES]
+    print(' '.join(f'{column:>10}' for column in columns))
+    for fish_count in args.fish:
+        aquarium = HeadlessAquarium(make_tank(fish_count, args.seed),
+                                    speed=args.speed,
+                                    movement=args.movement)
+        result = aquarium.run(args.frames)
+        values = [fish_count,
+                  result['frames_per_second'],
+                  result['days_per_second']]
+        values += [result[f'{phase}_ms'] for phase in PHASES]
+        print(' '.join(f'{value:>10.4g}' for value in values))
+
+
+if __name__ == '__main__':
+    main()
@@ -14,34 +14,151 @@
 Feed your fish every day to make sure they are happy and grow.
 """
 
+import argparse
 import os
-import json
+from typing import List
 
-from src.tank import Tank
-#from src.cmd_interface.interface import Interface
-from src.urwid_interface.interface import Interface
+from src.tank import Tank, DEFAULT_HEIGHT, DEFAULT_WIDTH, default_max_fish
+from src.journal import Journal
+from src.profiler import Profiler, instrument_aquarium
+from src.urwid_interface.movement import MOVEMENTS
 
-def main():
-    """Open up the aquarium"""
-    # Get OS dependant save file location
+
+def get_save_file() -> str:
+    """Get the OS dependant save file location."""
     if 'APPDATA' in os.environ:
         config_folder = os.environ['APPDATA']
     elif 'XDG_CONFIG_HOME' in os.environ:
         config_folder = os.environ['XDG_CONFIG_HOME']
     else:
         config_folder = os.path.join(os.environ['HOME'], '.config')
-    filename = os.path.join(config_folder, 'afish')
+    return os.path.join(config_folder, 'afish')
+
+
+def run_interface(tank: Tank, filename: str, profiler: Profiler = None,
+                  record: str = None, seed: int = None):
+    """Open the aquarium in the terminal.
+
+    Args:
+        tank: The tank to show.
+        filename: Save file for the tank.
+        profiler: If given, time the tank and how its frames are drawn, and
+                  show the timings from the menu.
+        record: If given, record the session to this file.
+        seed: Seed for the random numbers while recording.
+    """
+    # Only imported when needed so the other commands start quickly
+    from src.urwid_interface.interface import Interface
+    #from src.cmd_interface.interface import Interface
+    gui = Interface(tank, filename=filename, profiler=profiler)
+    if profiler is not None:
+        instrument_aquarium(profiler, tank, gui.tank_widget)
+    if record is None:
+        gui.run()
+        return
+    from src.urwid_interface.recording import Recorder
+    recorder = Recorder(record, seed=seed)
+    recorder.start(tank, gui.tank_widget)
+    try:
+        gui.run()
+    finally:
+        recorder.close()
+
+
+def write_profile(profiler: Profiler, args: argparse.Namespace):
+    """Write out the profiling results asked for on the command line."""
+    if args.profile:
+        profiler.dump(args.profile)
+    if args.trace:
+        profiler.export_trace(args.trace)
+    if args.cprofile:
+        profiler.export_cprofile(args.cprofile)
+
+
+def status(tank: Tank):
+    """Print how each of the fish are doing."""
+    for line in tank.get_status():
+        print(line)
+
+
+def feed(tank: Tank):
+    """Feed the fish."""
+    tank.feed()
+    print('The fish have been feed')
 
-    tank = Tank()
+
+def clean(tank: Tank):
+    """Clean the tank."""
+    print(tank.clean())
+
+
+COMMANDS = {
+    'status': status,
+    'feed': feed,
+    'clean': clean,
+}
+
+
+def main(argv: List[str] = None):
+    """Open up the aquarium, or run a single command on it.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', choices=list(COMMANDS),
+                        help='Run a command without opening the aquarium')
+    parser.add_argument('--file', default=None,
+                        help='Save file to use instead of the default')
+    parser.add_argument('--width', type=int, default=DEFAULT_WIDTH,
+                        help='Width of a new tank')
+    parser.add_argument('--height', type=int, default=DEFAULT_HEIGHT,
+                        help='Height of a new tank')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Write frame timings and counters to a json file')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Write a Chrome trace of each frame to a json file')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='Write cProfile stats for drawing frames to a file')
+    parser.add_argument('--record', metavar='FILE',
+                        help='Record the session to a file to replay later')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the random numbers while recording')
+    parser.add_argument('--movement', choices=MOVEMENTS,
+                        help='How the fish move around the tank, which is '
+                             'saved with it')
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile or args.trace or args.cprofile:
+        profiler = Profiler(trace=bool(args.trace), cprofile=bool(args.cprofile))
+
+    filename = args.file or get_save_file()
+    tank = Tank(width=args.width, height=args.height)
     if os.path.isfile(filename):
-        with open(filename, 'r') as json_file:
-            json_object = json.load(json_file)
-        tank.load_json(json_object)
-    else:
+        tank.load(filename)
+    elif args.command is None:
         print('Creating a new tank')
-    gui = Interface(tank)
-    gui.run()
-    tank.save(filename)
+    # Bigger tanks fit more fish
+    tank.max_fish = default_max_fish(tank.width, tank.height)
+    if args.movement is not None:
+        tank.movement = args.movement
+    # Record changes as they happen in case the aquarium crashes
+    journal = Journal(tank, filename)
+    journal.open()
+    try:
+        if args.command is None:
+            run_interface(tank, filename, profiler, args.record, args.seed)
+        else:
+            if profiler is not None:
+                instrument_aquarium(profiler, tank)
+            COMMANDS[args.command](tank)
+        tank.save(filename)
+    finally:
+        journal.close()
+    if profiler is not None:
+        write_profile(profiler, args)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Check in on every tank in a directory of save files.
+
+The tanks are split up between worker processes, and each one is checked
+in on, optionally fed or cleaned, and saved again. Prints how many tanks and
+fish were maintained per second, along with any tanks that failed. With
+--list it instead lists what is in each tank, read from their indexes.
+"""
+import argparse
+import os
+import sys
+from typing import List
+
+from src.maintenance import find_save_files, maintain_tanks, summarize_tanks
+
+
+def list_tanks(filenames: List[str]) -> int:
+    """Print a summary of each tank.
+
+    Returns:
+        Number of tanks that couldn't be summarized.
+    """
+    print(f'{"tank":<24} {"fish":>6} {"waste":>6}  species')
+    failures = []
+    for filename, summary, error in summarize_tanks(filenames):
+        if error is not None:
+            failures += [(filename, error)]
+            continue
+        species = ', '.join(f'{name} x{count}' for name, count
+                            in sorted(summary['species'].items()))
+        print(f'{os.path.basename(filename):<24} {summary["fish_count"]:>6} '
+              f'{summary["waste"]:>6.2f}  {species}')
+    for filename, error in failures:
+        print(f'Failed {filename}: {error}', file=sys.stderr)
+    return len(failures)
+
+
+def main(argv: List[str] = None) -> int:
+    """Maintain the tanks and print the results.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv.
+
+    Returns:
+        Exit code, which is 1 if any of the tanks failed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('directory', help='Directory with the save files')
+    parser.add_argument('--feed', action='store_true', help='Feed the fish')
+    parser.add_argument('--clean', action='store_true', help='Clean the tanks')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes, defaults to the '
+                             'number of CPUs')
+    parser.add_argument('--list', action='store_true',
+                        help='List what is in each tank instead')
+    args = parser.parse_args(argv)
+
+    filenames = find_save_files(args.directory)
+    if args.list:
+        return 1 if list_tanks(filenames) else 0
+    result = maintain_tanks(filenames, feed=args.feed, clean=args.clean,
+                            workers=args.workers)
+    print(f'{"tanks":>10} {"fish":>10} {"seconds":>10} {"tanks/s":>10} '
+          f'{"fish/s":>10}')
+    print(f'{result["tanks"]:>10} {result["fish"]:>10} '
+          f'{result["seconds"]:>10.4g} {result["tanks_per_second"]:>10.4g} '
+          f'{result["fish_per_second"]:>10.4g}')
+    for filename, error in result['failures']:
+        print(f'Failed {filename}: {error}', file=sys.stderr)
+    return 1 if result['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Process wide cache of the species and personality data files.
+
+Each data file is only read once, and every FishBuilder reading the same
+file shares the same Species and Personality objects. A file is read again
+if it has changed on disk, which is checked at most every CHECK_INTERVAL
+seconds.
+"""
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Tuple
+
+from src.fish.personality import Personality, get_personalities
+from src.fish.species import Species, get_species
+
+
+CHECK_INTERVAL = 1
+
+
+class Catalog:
+    """A data file that has been read in, along with when it was read.
+
+    Attributes:
+        filename: The data file.
+        loader: Function that reads in the data file.
+        items: Read only dict of everything read from the file.
+        version: Modification time and size of the file when it was read.
+        checked: time.monotonic() of when the file was last checked.
+        lock: Mutex so the file is only read by one thread at a time.
+    """
+    def __init__(self, filename: str, loader: Callable[[str], dict]):
+        self.filename = filename
+        self.loader = loader
+        self.items = None
+        self.version = None
+        self.checked = None
+        self.lock = threading.Lock()
+
+    def get(self) -> Mapping:
+        """Get the items in the file, reading it again if it changed."""
+        now = time.monotonic()
+        if self.checked is not None and now - self.checked < CHECK_INTERVAL:
+            return self.items
+        with self.lock:
+            stat = os.stat(self.filename)
+            version = (stat.st_mtime_ns, stat.st_size)
+            if version != self.version:
+                self.items = MappingProxyType(self.loader(self.filename))
+                self.version = version
+            self.checked = now
+        return self.items
+
+
+_catalogs: Dict[Tuple[str, Callable], Catalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def find_catalog(filename: str, loader: Callable[[str], dict]) -> Catalog:
+    """Get the shared catalog for a data file without reading it yet.
+
+    Holding on to the catalog saves looking it up again each time its items
+    are needed.
+
+    Args:
+        filename: The data file.
+        loader: Function that reads in the data file.
+    """
+    key = (os.path.abspath(filename), loader)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(key, Catalog(filename, loader))
+    return catalog
+
+
+def get_catalog(filename: str, loader: Callable[[str], dict]) -> Mapping:
+    """Get the shared items read from a data file.
+
+    Args:
+        filename: The data file.
+        loader: Function that reads in the data file.
+
+    Returns:
+        Read only dict of the items in the file.
+    """
+    return find_catalog(filename, loader).get()
+
+
+def species_catalog(filename: str = 'data/species.json') -> Mapping[str, Species]:
+    """Get the shared species read from a file."""
+    return get_catalog(filename, get_species)
+
+
+def personality_catalog(filename: str = 'data/personalities.json') \
+        -> Mapping[str, Personality]:
+    """Get the shared personalities read from a file."""
+    return get_catalog(filename, get_personalities)
+
+
+def clear():
+    """Forget every file that has been read."""
+    with _catalogs_lock:
+        _catalogs.clear()
@@ -1,9 +1,22 @@
+import math
+import random
+import sys
 import time
+from typing import Callable
 
 from src.fish.species import Species
 from src.fish.personality import Personality
 
 
+DAY = 60*60*24
+
+
+def catch_up_days(last_checkin: float, timestamp: float) -> int:
+    """Get how many whole days to check in for before timestamp when
+    catching up from last_checkin, as passed to Fish.catch_up."""
+    return max(0, math.ceil((timestamp - last_checkin)/DAY) - 1)
+
+
 class Fish:
     """Fish to put in the aquarium.
 
@@ -16,8 +29,15 @@ class Fish:
         stress: Float from 0-1 of how stressed the fish is, 0 being no stress.
         last_checkin: Timestamp of when the stress was last updated.
         time_fed: Time in seconds of how long the fish has been fed.
-        color: String of the fish's color.
+        color: String of the fish's color, interned so fish of the same
+               color share it.
+        clock: Function giving the current timestamp, used whenever a time
+               isn't given. Fish in a tank are given the tank's clock.
+               Defaults to time.time.
     """
+    __slots__ = ('name', 'species', 'personality', 'stress', 'time_fed',
+                 'birth', 'last_fed', 'last_checkin', 'color', 'clock')
+
     def __init__(self,
                  name: str,
                  species: Species,
@@ -27,7 +47,9 @@ class Fish:
                  stress: float = 0.25,
                  last_checkin: float = None,
                  time_fed: float = 0,
-                 color: str = None):
+                 color: str = None,
+                 clock: Callable[[], float] = None):
+        self.clock = clock if clock is not None else time.time
         self.name = name
         self.species = species
         self.personality = personality
@@ -36,31 +58,52 @@ class Fish:
         if birth is not None:
             self.birth = birth
         else:
-            self.birth = time.time()
+            self.birth = self.clock()
         if last_fed is not None:
             self.last_fed = last_fed
         else:
-            self.last_fed = time.time() - self.species.hunger_time/3
+            self.last_fed = self.clock() - self.species.hunger_time/3
         if last_checkin is not None:
             self.last_checkin = last_checkin
         else:
-            self.last_checkin = time.time()
-        if color is not None:
-            self.color = color
-        else:
-            self.color = species.get_color()
+            self.last_checkin = self.clock()
+        if color is None:
+            color = species.get_color()
+        self.color = sys.intern(color)
 
-    def get_status(self) -> str:
+    def get_status(self, timestamp: float = None,
+                   rng: random.Random = None) -> str:
         """Gets a summary on the fish's current status.
 
+        Args:
+            timestamp: If given, check in and get the status as if it were
+                       that time. Otherwise use the current time.
+            rng: Random number generator to pick the quote with.
+
         Returns:
             String with the fish's name, species, and a quote based on how
             it is feeling
         """
-        self.checkin()
+        if timestamp is None:
+            timestamp = self.clock()
+        self.checkin(timestamp)
+        return self.describe(self.get_hunger(timestamp), rng)
+
+    def describe(self, hunger: float, rng: random.Random = None) -> str:
+        """Gets a summary of the fish without checking in on it first.
+
+        Args:
+            hunger: How hungry the fish is, from get_hunger.
+            rng: Random number generator to pick the quote with.
+
+        Returns:
+            String with the fish's name, species, and a quote based on its
+            stress and the given hunger.
+        """
         quote = self.personality.get_quote(name=self.name,
                                            stress=self.stress,
-                                           hunger=self.get_hunger())
+                                           hunger=hunger,
+                                           rng=rng)
         return f'{self.name} ({self.species.name}): {quote}'
 
     def get_art(self) -> str:
@@ -73,13 +116,40 @@ class Fish:
         """
         return self.species.get_art(self.time_fed)
 
-    def feed(self):
+    def get_stage(self) -> int:
+        """Gets the index of the fish's current art."""
+        return self.species.get_stage(self.time_fed)
+
+    def next_growth_at(self) -> float:
+        """Gets when the fish will grow into its next stage if it isn't fed.
+
+        The time the fish has been fed goes up with time until it is starving,
+        counting from its last check in, so the art for the fish can be kept
+        until then.
+
+        Returns:
+            Timestamp of when the fish will next grow, or math.inf if it will
+            starve first or is fully grown.
+        """
+        _, end = self.species.stage_bounds(self.get_stage())
+        growth_time = self.last_checkin + end - self.time_fed
+        if growth_time > self.last_fed + self.species.hunger_time:
+            return math.inf
+        return growth_time
+
+    def feed(self, timestamp: float = None):
         """Feed the fish.
 
         Updates the time since it was last fed if it hasn't eaten recently.
+
+        Args:
+            timestamp: If given, feed the fish as if it were that time.
+                       Otherwise feed it at the current time.
         """
-        if self.get_hunger() > 0.2:
-            self.last_fed = time.time()
+        if timestamp is None:
+            timestamp = self.clock()
+        if self.get_hunger(timestamp) > 0.2:
+            self.last_fed = timestamp
 
     def get_current_stress(self, timestamp: float = None) -> float:
         """Gets the fish's current stress level
@@ -95,7 +165,7 @@ class Fish:
            no stress.
         """
         if timestamp is None:
-            timestamp = time.time()
+            timestamp = self.clock()
 
         hunger = self.get_hunger(timestamp)
         hunger = max(0, (hunger - 0.5)/0.5)
@@ -118,8 +188,7 @@ class Fish:
                        Otherwise check in using the current time.
         """
         if timestamp is None:
-            timestamp = time.time()
-        DAY = 60*60*24
+            timestamp = self.clock()
         time_delta = min(DAY, timestamp - self.last_checkin)
         new_weight = 0.5*time_delta/DAY
         new_stress = self.get_current_stress(self.last_checkin + time_delta)
@@ -129,6 +198,52 @@ class Fish:
         self.time_fed += new_time_fed
         self.last_checkin = timestamp
 
+    def catch_up(self, timestamp: float, days: int):
+        """Check in once per day for several days without looping over them.
+
+        Gives the same result as calling checkin(timestamp - days*DAY) and then
+        checkin once more for each of the following days up to timestamp. The
+        fish isn't fed in between, so the stress only moves towards a fixed
+        value until it is somewhat hungry and after it is starving, which lets
+        those days be skipped in closed form. Only the days in between are
+        stepped through, and there are at most hunger_time/(2*DAY) of them.
+
+        Args:
+            timestamp: Timestamp of the final check in.
+            days: Number of whole days to check in for before timestamp.
+        """
+        if days <= 0:
+            self.checkin(timestamp)
+            return
+        start = timestamp - days*DAY
+        self.checkin(start)
+        hunger_time = self.species.hunger_time
+
+        # Stress is averaged with the stress at the end of each day
+        stress = self.stress
+        # Days that end before the fish is hungry enough to get stressed
+        first_stressed = math.floor((self.last_fed + hunger_time/2 - start)/DAY)
+        relaxed_days = min(days, max(0, first_stressed))
+        stress *= 0.5**relaxed_days
+        # Days that end after the fish has started starving
+        first_starving = math.ceil((self.last_fed + hunger_time - start)/DAY)
+        first_starving = min(days + 1, max(relaxed_days + 1, first_starving))
+        for day in range(relaxed_days + 1, first_starving):
+            new_stress = self.get_current_stress(start + day*DAY)
+            stress = 0.5*stress + 0.5*new_stress
+        starving_days = days + 1 - first_starving
+        stress = 1 - (1 - stress)*0.5**starving_days
+        self.stress = stress
+
+        # Each day adds min(DAY, starve_time - start of the day) to time_fed
+        time_until_starving = self.last_fed + hunger_time - start
+        full_days = min(days, max(0, math.floor(time_until_starving/DAY)))
+        partial_days = days - full_days
+        self.time_fed += full_days*DAY
+        self.time_fed += partial_days*time_until_starving
+        self.time_fed -= DAY*(days*(days - 1) - full_days*(full_days - 1))/2
+        self.last_checkin = timestamp
+
     def get_hunger(self, timestamp: float = None) -> float:
         """Gets how hungry the fish is.
 
@@ -143,7 +258,7 @@ class Fish:
             Float from 0-1 of how hungry the fish is with 0 being completely full
         """
         if timestamp is None:
-            timestamp = time.time()
+            timestamp = self.clock()
         hunger = (timestamp - self.last_fed)/self.species.hunger_time
         return min(hunger, 1)
 
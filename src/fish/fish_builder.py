@@ -1,66 +1,113 @@
+import random
 import time
+from typing import Callable, Mapping
 
+from src.fish.catalog import find_catalog
 from src.fish.fish import Fish
-from src.fish.personality import get_personalities
-from src.fish.species import get_species
+from src.fish.personality import Personality, get_personalities
+from src.fish.species import Species, get_species
 
 
 class FishBuilder:
     """Used to create fish with a given personality and species.
 
+    The personalities and species come from the shared catalog, so they are
+    only read in when first needed and are shared with every other builder
+    using the same files.
+
     Attributes:
-        personalities: List of personalities the fish could have.
-        species: List of species the fish could be.
+        species_file: File the species are read from.
+        personality_file: File the personalities are read from.
+        personalities: Dict of personalities the fish could have.
+        species: Dict of species the fish could be.
     """
     def __init__(self, species_file: str = 'data/species.json',
                  personality_file: str = 'data/personalities.json'):
-        self.personalities = get_personalities(personality_file)
-        self.species = get_species(species_file)
+        self.species_file = species_file
+        self.personality_file = personality_file
+        # Looked up once, as finding them again each time a fish is loaded
+        # takes longer than loading the fish
+        self._species = find_catalog(species_file, get_species)
+        self._personalities = find_catalog(personality_file, get_personalities)
+
+    @property
+    def personalities(self) -> Mapping[str, Personality]:
+        """Dict of personalities the fish could have."""
+        return self._personalities.get()
+
+    @property
+    def species(self) -> Mapping[str, Species]:
+        """Dict of species the fish could be."""
+        return self._species.get()
 
-    def make_fish(self, name: str, species_name: str, personality_name: str) -> Fish:
+    def make_fish(self, name: str, species_name: str, personality_name: str,
+                  timestamp: float = None, rng: random.Random = None,
+                  clock: Callable[[], float] = None) -> Fish:
         """Creates a new fish.
 
         Args:
             name: Name for the fish.
             species_name: String with the name of the species for the fish.
             personality_name: Name of the personality for the fish.
+            timestamp: If given, make the fish as if it were that time.
+                       Otherwise use the current time from the clock.
+            rng: Random number generator to pick the fish's color with.
+            clock: Clock for the fish, usually its tank's. Defaults to
+                   time.time.
 
         Returns:
             Fish with the given name, species, and personality.
         """
         try:
             personality = self.personalities[personality_name]
-        except IndexError:
+        except KeyError:
             raise IndexError(f'Personality {personality_name} not found')
         try:
             species = self.species[species_name]
-        except IndexError:
+        except KeyError:
             raise IndexError(f'Species {species_name} not found')
-        return Fish(name=name, species=species, personality=personality)
+        if clock is None:
+            clock = time.time
+        if timestamp is None:
+            timestamp = clock()
+        return Fish(name=name,
+                    species=species,
+                    personality=personality,
+                    last_fed=timestamp - species.hunger_time/3,
+                    birth=timestamp,
+                    last_checkin=timestamp,
+                    color=species.get_color(rng),
+                    clock=clock)
 
-    def from_json(self, fish_json: dict) -> Fish:
+    def from_json(self, fish_json: dict,
+                  clock: Callable[[], float] = None) -> Fish:
         """Recreates a fish from serialized json.
 
         Args:
             fish_json: Dict with data to rebuild a fish.
+            clock: Clock for the fish, usually its tank's. Defaults to
+                   time.time.
 
         Returns:
             Fish recreated from the serialized json.
         """
         try:
             personality = self.personalities[fish_json["personality"]]
-        except IndexError:
+        except KeyError:
             raise IndexError(f'Personality {fish_json["personality"]} not found')
         try:
             species = self.species[fish_json["species"]]
-        except IndexError:
+        except KeyError:
             raise IndexError(f'Species {fish_json["species"]} not found')
+        if clock is None:
+            clock = time.time
         return Fish(name=fish_json["name"],
                     species=species,
                     personality=personality,
-                    birth=fish_json.get("birth", time.time()),
+                    birth=fish_json.get("birth", clock()),
                     last_fed=fish_json.get("last_fed", 0),
                     stress=fish_json.get("stress", 0.5),
                     last_checkin=fish_json.get("last_checkin", 0),
                     time_fed=fish_json.get("time_fed", 0),
-                    color=fish_json.get('color', species.get_color()))
+                    color=fish_json.get('color', species.get_color()),
+                    clock=clock)
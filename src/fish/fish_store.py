@@ -0,0 +1,231 @@
+"""Struct of arrays storage for the state of many fish.
+
+Keeps the stress, feeding and check in state for every fish in a tank in
+numpy arrays so a whole tank can be checked in on or fed at once. The fish
+in the store are StoredFish, which read and write their row of the arrays
+and otherwise behave like any other Fish.
+"""
+import time
+from typing import Callable
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the vectorized tank
+    np = None
+
+from src.fish.fish import Fish, DAY
+
+
+COLUMNS = ('stress', 'last_fed', 'last_checkin', 'time_fed', 'hunger_time')
+INITIAL_CAPACITY = 16
+
+
+def _column(name: str) -> property:
+    """Property for a fish's value in one of the store's arrays."""
+    def getter(self):
+        return float(getattr(self.store, name)[self.index])
+
+    def setter(self, value):
+        getattr(self.store, name)[self.index] = value
+    return property(getter, setter)
+
+
+class StoredFish(Fish):
+    """Fish whose stress and feeding state live in a FishStore.
+
+    Attributes:
+        store: The store holding the fish's state.
+        index: Row of the fish in the store's arrays.
+    """
+    __slots__ = ('store', 'index')
+    stress = _column('stress')
+    last_fed = _column('last_fed')
+    last_checkin = _column('last_checkin')
+    time_fed = _column('time_fed')
+
+    def __init__(self, fish: Fish, store: 'FishStore', index: int):
+        # The state in the arrays is copied over by the store
+        self.store = store
+        self.index = index
+        self.name = fish.name
+        self.species = fish.species
+        self.personality = fish.personality
+        self.birth = fish.birth
+        self.color = fish.color
+        self.clock = fish.clock
+
+
+class FishStore:
+    """Holds the state of many fish in numpy arrays.
+
+    The hunger time of each fish's species is copied into the store when the
+    fish is added so that hunger can be calculated for all fish at once.
+
+    Attributes:
+        fish: List of StoredFish in the order of the rows of the arrays.
+        stress: Array of each fish's stress.
+        last_fed: Array of timestamps of when each fish was last fed.
+        last_checkin: Array of timestamps of each fish's last check in.
+        time_fed: Array of how long each fish has been fed.
+        hunger_time: Array of the hunger time of each fish's species.
+        clock: Function giving the current timestamp, used whenever a time
+               isn't given. Defaults to time.time.
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY,
+                 clock: Callable[[], float] = None):
+        if np is None:
+            raise ImportError('numpy is required for a vectorized tank')
+        self.clock = clock if clock is not None else time.time
+        self.fish = []
+        for column in COLUMNS:
+            setattr(self, column, np.zeros(capacity))
+
+    def __len__(self):
+        return len(self.fish)
+
+    def add(self, fish: Fish) -> StoredFish:
+        """Copies a fish into the store.
+
+        Args:
+            fish: The fish to add.
+
+        Returns:
+            StoredFish that should be used in place of the given fish.
+        """
+        index = len(self.fish)
+        if index == len(self.stress):
+            for column in COLUMNS:
+                array = getattr(self, column)
+                setattr(self, column, np.resize(array, 2*len(array)))
+        self.stress[index] = fish.stress
+        self.last_fed[index] = fish.last_fed
+        self.last_checkin[index] = fish.last_checkin
+        self.time_fed[index] = fish.time_fed
+        self.hunger_time[index] = fish.species.hunger_time
+        stored_fish = StoredFish(fish, self, index)
+        self.fish += [stored_fish]
+        return stored_fish
+
+    def remove(self, fish: StoredFish):
+        """Remove a fish from the store, keeping the order of the rest."""
+        index = fish.index
+        size = len(self.fish)
+        for column in COLUMNS:
+            array = getattr(self, column)
+            array[index:size - 1] = array[index + 1:size]
+        del self.fish[index]
+        for moved_fish in self.fish[index:]:
+            moved_fish.index -= 1
+
+    def clear(self):
+        """Remove all fish from the store."""
+        self.fish.clear()
+
+    def _columns(self):
+        """Get the in use part of each array."""
+        size = len(self.fish)
+        return [getattr(self, column)[:size] for column in COLUMNS]
+
+    def get_hunger(self, timestamp: float = None):
+        """Gets how hungry every fish is, like Fish.get_hunger.
+
+        Args:
+            timestamp: If provided, it will calculate how hungry the fish were
+                       at that time. Otherwise it will use the current time.
+
+        Returns:
+            Array with each fish's hunger from 0-1.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        _, last_fed, _, _, hunger_time = self._columns()
+        return np.minimum((timestamp - last_fed)/hunger_time, 1)
+
+    def get_current_stress(self, timestamp=None):
+        """Gets every fish's current stress, like Fish.get_current_stress.
+
+        Args:
+            timestamp: Timestamp or array of timestamps to calculate the
+                       stress at. Uses the current time if not given.
+
+        Returns:
+            Array with each fish's stress from 0-1.
+        """
+        hunger = self.get_hunger(timestamp)
+        return np.maximum(0, (hunger - 0.5)/0.5)
+
+    def feed(self, timestamp: float = None):
+        """Feed all fish that haven't eaten recently, like Fish.feed.
+
+        Args:
+            timestamp: If given, feed the fish as if it were that time.
+                       Otherwise feed them at the current time.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        _, last_fed, _, _, _ = self._columns()
+        last_fed[self.get_hunger(timestamp) > 0.2] = timestamp
+
+    def checkin(self, timestamp: float = None):
+        """Check in on all fish at once, like Fish.checkin.
+
+        Args:
+            timestamp: If given, perform the check in as if it were that time.
+                       Otherwise check in using the current time.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        stress, last_fed, last_checkin, time_fed, hunger_time = self._columns()
+        time_delta = np.minimum(DAY, timestamp - last_checkin)
+        new_weight = 0.5*time_delta/DAY
+        new_stress = self.get_current_stress(last_checkin + time_delta)
+        stress *= 1 - new_weight
+        stress += new_weight*new_stress
+        starve_time = last_fed + hunger_time
+        time_fed += np.minimum(time_delta, starve_time - last_checkin)
+        last_checkin[:] = timestamp
+
+    def catch_up(self, timestamp: float, days=None):
+        """Check in on all fish once per day for several days.
+
+        Works the same as Fish.catch_up, but for every fish at once.
+
+        Args:
+            timestamp: Timestamp of the final check in.
+            days: Number of whole days to check in for before timestamp, or
+                  an array with the number for each fish. Defaults to the
+                  whole days since each fish's last check in, as found by
+                  catch_up_days.
+        """
+        if days is None:
+            _, _, last_checkin, _, _ = self._columns()
+            days = np.maximum(np.ceil((timestamp - last_checkin)/DAY) - 1, 0)
+        if np.all(days <= 0):
+            self.checkin(timestamp)
+            return
+        start = timestamp - days*DAY
+        self.checkin(start)
+        stress, last_fed, last_checkin, time_fed, hunger_time = self._columns()
+
+        relaxed_days = np.floor((last_fed + hunger_time/2 - start)/DAY)
+        relaxed_days = np.clip(relaxed_days, 0, days)
+        stress *= 0.5**relaxed_days
+        first_starving = np.ceil((last_fed + hunger_time - start)/DAY)
+        first_starving = np.clip(first_starving, relaxed_days + 1, days + 1)
+        # Step through the days between for every fish together
+        stressed_days = first_starving - relaxed_days - 1
+        for day in range(int(stressed_days.max(initial=0))):
+            new_stress = self.get_current_stress(
+                start + (relaxed_days + 1 + day)*DAY)
+            stepped = 0.5*stress + 0.5*new_stress
+            stress[:] = np.where(day < stressed_days, stepped, stress)
+        starving_days = days + 1 - first_starving
+        stress[:] = 1 - (1 - stress)*0.5**starving_days
+
+        time_until_starving = last_fed + hunger_time - start
+        full_days = np.clip(np.floor(time_until_starving/DAY), 0, days)
+        partial_days = days - full_days
+        time_fed += full_days*DAY
+        time_fed += partial_days*time_until_starving
+        time_fed -= DAY*(days*(days - 1) - full_days*(full_days - 1))/2
+        last_checkin[:] = timestamp
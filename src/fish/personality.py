@@ -1,6 +1,29 @@
+import functools
 import json
 import random
-from typing import List
+from types import MappingProxyType
+from typing import List, Tuple
+
+
+HAPPY = 'happy'
+NORMAL = 'normal'
+UNHAPPY = 'unhappy'
+# How hungry a fish is before it starts asking for food
+HUNGRY_LEVEL = 0.4
+
+
+def get_mood(stress: float) -> str:
+    """Get whether a fish is happy, normal or unhappy from its stress."""
+    if stress < 0.20:
+        return HAPPY
+    if stress < 0.4:
+        return NORMAL
+    return UNHAPPY
+
+
+def compile_quote(quote: str) -> Tuple[str, ...]:
+    """Split a quote around "{name}" so the name can be joined back in."""
+    return tuple(quote.split("{name}"))
 
 
 class Personality:
@@ -11,39 +34,57 @@ class Personality:
 
     Attributes:
         name: Name of the personality.
-        happy_quotes: List of quotes for when it has very low stress.
-        normal_quotes: List of quotes for when it as moderately low stress.
-        unhappy_quotes: List of quotes for when it has high stress.
-        hungry_quotes: List of quotes for when it is hungry.
+        happy_quotes: Tuple of quotes for when it has very low stress.
+        normal_quotes: Tuple of quotes for when it as moderately low stress.
+        unhappy_quotes: Tuple of quotes for when it has high stress.
+        hungry_quotes: Tuple of quotes for when it is hungry.
+        pools: Read only dict from (mood, hungry) to the compiled quotes to
+               pick from.
+
+    Personalities are shared between every fish and tank using the same data
+    file, so they are read only once they are made.
     """
-    def __init__(self, name: str, happy_quotes, normal_quotes, unhappy_quotes, hungry_quotes):
-        self.name = name
-        self.happy_quotes = happy_quotes
-        self.normal_quotes = normal_quotes
-        self.unhappy_quotes = unhappy_quotes
-        self.hungry_quotes = hungry_quotes
+    __slots__ = ('name', 'happy_quotes', 'normal_quotes', 'unhappy_quotes',
+                 'hungry_quotes', 'pools')
 
-    def get_quote(self, name, stress, hunger):
+    def __init__(self, name: str, happy_quotes, normal_quotes, unhappy_quotes, hungry_quotes):
+        set_field = functools.partial(object.__setattr__, self)
+        set_field('name', name)
+        set_field('happy_quotes', tuple(happy_quotes))
+        set_field('normal_quotes', tuple(normal_quotes))
+        set_field('unhappy_quotes', tuple(unhappy_quotes))
+        set_field('hungry_quotes', tuple(hungry_quotes))
+        pools = {}
+        for mood, quotes in [(HAPPY, self.happy_quotes),
+                             (NORMAL, self.normal_quotes),
+                             (UNHAPPY, self.unhappy_quotes)]:
+            pools[mood, False] = tuple(map(compile_quote, quotes))
+            pools[mood, True] = tuple(map(compile_quote,
+                                          quotes + self.hungry_quotes))
+        set_field('pools', MappingProxyType(pools))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Personality {self.name} is read only')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Personality {self.name} is read only')
+
+    def get_quote(self, name, stress, hunger, rng: random.Random = None):
         """Gets a random quote based on the fish's personality.
 
         Args:
             stress: Float with fish's stress level, 0 being no stress.
             hunger: Float with fish's hunger level, 0 being completely full.
+            rng: Random number generator to pick the quote with. Defaults to
+                 the random module.
 
         Returns:
             String with a quote based on how the fish is feeling.
         """
-        possible_quotes = []
-        if stress < 0.20:
-            possible_quotes += self.happy_quotes
-        elif stress < 0.4:
-            possible_quotes += self.normal_quotes
-        else:
-            possible_quotes += self.unhappy_quotes
-        if hunger > 0.4:
-            possible_quotes += self.hungry_quotes
-        quote = random.choice(possible_quotes)
-        return quote.replace("{name}", name)
+        if rng is None:
+            rng = random
+        quote = rng.choice(self.pools[get_mood(stress), hunger > HUNGRY_LEVEL])
+        return name.join(quote)
 
     def to_json(self):
         """Returns the name of the personality"""
@@ -1,6 +1,10 @@
+import bisect
+import functools
 import json
-from typing import List
+import math
 import random
+import sys
+from typing import List, Tuple
 
 
 class Species:
@@ -12,35 +16,69 @@ class Species:
         name: The species name
         hunger_time: Time in seconds the species would starve if it has not
                      been fed during that time.
-        art: List of ascii art strings from youngest to oldest
-        art_ages: List of time in seconds for the fish of the given age to
-                  progress to the next ascii art.
-        colors: List of colors the fish can be.
+        art: Tuple of ascii art strings from youngest to oldest
+        art_ages: Tuple of time in seconds for the fish of the given age to
+                  progress to the next ascii art, in order so the stage of a
+                  fish can be found by binary search.
+        colors: Tuple of colors the fish can be, interned so the fish share
+                them.
+
+    Species are shared between every fish and tank using the same data file,
+    so they are read only once they are made.
     """
+    __slots__ = ('name', 'hunger_time', 'art', 'art_ages', 'colors')
+
     def __init__(self,
                  name: str,
                  hunger_time: float,
                  art: List[str],
                  art_ages: List[float],
                  colors: List[str]):
-        self.name = name
-        self.hunger_time = hunger_time
-        self.art = art
-        self.art_ages = art_ages
-        self.colors = colors
+        if len(art) != len(art_ages) + 1:
+            raise ValueError(f'{name} needs one more art than art ages')
+        art_ages = tuple(art_ages)
+        if any(b < a for a, b in zip(art_ages, art_ages[1:])):
+            raise ValueError(f'Art ages for {name} must be in order')
+        set_field = functools.partial(object.__setattr__, self)
+        set_field('name', name)
+        set_field('hunger_time', hunger_time)
+        set_field('art', tuple(art))
+        set_field('art_ages', art_ages)
+        set_field('colors', tuple(sys.intern(color) for color in colors))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Species {self.name} is read only')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Species {self.name} is read only')
+
+    def get_stage(self, age: float) -> int:
+        """Returns the index of the art for the species at the given age."""
+        return bisect.bisect_right(self.art_ages, age)
+
+    def stage_bounds(self, stage: int) -> Tuple[float, float]:
+        """Returns the ages a stage starts and ends at.
+
+        The first stage starts at -math.inf and the last ends at math.inf.
+        """
+        start = self.art_ages[stage - 1] if stage > 0 else -math.inf
+        end = self.art_ages[stage] if stage < len(self.art_ages) else math.inf
+        return start, end
 
     def get_art(self, age) -> str:
         """Returns ascii art for the species at the given age."""
-        age_index = 0
-        for i in self.art_ages:
-            if age < i:
-                break
-            age_index += 1
-        return self.art[age_index]
-
-    def get_color(self):
-        """Get a random color for this species of fish."""
-        return random.choice(self.colors)
+        return self.art[self.get_stage(age)]
+
+    def get_color(self, rng: random.Random = None):
+        """Get a random color for this species of fish.
+
+        Args:
+            rng: Random number generator to pick the color with. Defaults to
+                 the random module.
+        """
+        if rng is None:
+            rng = random
+        return rng.choice(self.colors)
 
     def to_json(self) -> str:
         """Returns the name of the species."""
@@ -0,0 +1,224 @@
+"""Write-ahead journal for autosaving the tank.
+
+Every change to the tank (adding or removing fish, feeding and cleaning) is
+appended to a journal next to the save file as it happens, so a crash only
+loses the change that was being written. Once enough changes build up they
+are compacted into a new snapshot of the save file in the background, which
+is written to a temporary file and renamed over the old one.
+
+Each record has a sequence number, and the save file keeps the number of the
+last record it includes, so replaying the journal on load never applies a
+change twice even if a crash happened partway through a compaction.
+"""
+import json
+import os
+import shutil
+import threading
+from typing import List, Tuple
+
+from src.tank import Tank
+from src import save_file, save_index
+
+
+DEFAULT_COMPACT_EVERY = 50
+
+
+class Journal:
+    """Journal of changes to a tank since it was last saved.
+
+    Attributes:
+        tank: The tank whose changes are recorded.
+        filename: The save file for the tank.
+        journal_filename: File the changes are appended to.
+        old_journal_filename: File the journal is moved to while it is being
+                              compacted.
+        compact_every: Number of records to build up before compacting.
+        seq: Sequence number of the last record.
+        records: Number of records in the journal since the last compaction.
+        lock: Mutex for writing records and taking snapshots.
+    """
+    def __init__(self, tank: Tank, filename: str,
+                 compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.tank = tank
+        self.filename = filename
+        self.journal_filename = f'{filename}.journal'
+        self.old_journal_filename = f'{filename}.journal.old'
+        self.compact_every = compact_every
+        self.seq = tank.journal_seq
+        self.records = 0
+        self.lock = threading.Lock()
+        self._journal_file = None
+        self._compaction = None
+
+    def open(self):
+        """Replay any changes left over in the journal and start recording.
+
+        The tank should already be loaded from the save file. If a journal
+        was left over, it is compacted into the save file straight away.
+        """
+        replayed = self.replay()
+        # Cut off a record that was only partly written, so new records
+        # don't get appended onto the end of it
+        _, length = self._read(self.journal_filename)
+        if os.path.isfile(self.journal_filename) \
+                and os.path.getsize(self.journal_filename) > length:
+            os.truncate(self.journal_filename, length)
+        self.tank.journal = self
+        self._journal_file = open(self.journal_filename, 'a')
+        if replayed:
+            self.compact(background=False)
+
+    def replay(self) -> int:
+        """Apply the changes in the journal that the tank doesn't have yet.
+
+        Returns:
+            Number of records that were applied.
+        """
+        journal = self.tank.journal
+        self.tank.journal = None  # Don't record the changes again
+        applied = 0
+        try:
+            for filename in [self.old_journal_filename, self.journal_filename]:
+                records, _ = self._read(filename)
+                for record in records:
+                    self.seq = max(self.seq, record['seq'])
+                    if record['seq'] <= self.tank.journal_seq:
+                        continue
+                    self._apply(record)
+                    self.tank.journal_seq = record['seq']
+                    applied += 1
+        finally:
+            self.tank.journal = journal
+        return applied
+
+    @staticmethod
+    def _read(filename: str) -> Tuple[List[dict], int]:
+        """Read the records in a journal file.
+
+        Stops at the first record that was only partly written.
+
+        Returns:
+            The records, and the number of bytes at the start of the file
+            that they take up.
+        """
+        records = []
+        length = 0
+        if not os.path.isfile(filename):
+            return records, length
+        with open(filename, 'rb') as journal_file:
+            for line in journal_file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    records += [json.loads(line)]
+                except json.JSONDecodeError:
+                    break
+                length += len(line)
+        return records, length
+
+    def _apply(self, record: dict):
+        """Apply a record to the tank."""
+        op = record['op']
+        if op == 'add_fish':
+            fish = self.tank.fish_builder.from_json(record['fish'],
+                                                    clock=self.tank.clock)
+            self.tank.add_fish(fish)
+        elif op == 'remove_fish':
+            self.tank.remove_fish(record['name'])
+        elif op == 'feed':
+            self.tank.feed(record['timestamp'])
+        elif op == 'clean':
+            self.tank.clean(record['timestamp'])
+        else:
+            raise ValueError(f'Unknown journal record {op}')
+
+    def record(self, op: str, **fields):
+        """Append a change to the journal.
+
+        Args:
+            op: Name of the tank method that made the change.
+            fields: Arguments needed to make the change again.
+        """
+        with self.lock:
+            self.seq += 1
+            record = {'seq': self.seq, 'op': op}
+            record.update(fields)
+            self._journal_file.write(json.dumps(record) + '\n')
+            self._journal_file.flush()
+            self.records += 1
+        if self.records >= self.compact_every:
+            self.compact()
+
+    def compact(self, background: bool = True):
+        """Write a new snapshot of the tank and clear out the journal.
+
+        The snapshot is taken and the journal is swapped out for a new one
+        right away. Writing the snapshot happens on another thread unless
+        background is False.
+
+        Args:
+            background: Whether to write the snapshot on another thread.
+        """
+        if background and self._compaction is not None \
+                and self._compaction.is_alive():
+            return
+        self.wait()
+        with self.lock:
+            self.tank.journal_seq = self.seq
+            data = self.tank.dumps(save_file.is_binary(self.filename)
+                                   or save_file.is_binary_file(self.filename))
+            summary = save_index.summarize(self.tank)
+            self._journal_file.close()
+            self._rotate()
+            self._journal_file = open(self.journal_filename, 'a')
+            self.records = 0
+
+        def write_snapshot():
+            save_file.write_atomic(self.filename, data)
+            save_index.write_index(self.filename, summary)
+            os.remove(self.old_journal_filename)
+        if background:
+            self._compaction = threading.Thread(target=write_snapshot)
+            self._compaction.start()
+        else:
+            write_snapshot()
+
+    def _rotate(self):
+        """Move the records in the journal over to the old journal.
+
+        If an old journal was left behind by a snapshot that never finished,
+        the save file may not have its records yet, so the journal is
+        appended to it rather than replacing it.
+        """
+        if not os.path.isfile(self.old_journal_filename):
+            os.replace(self.journal_filename, self.old_journal_filename)
+            return
+        # Cut off a record that was only partly appended before a crash
+        _, length = self._read(self.old_journal_filename)
+        with open(self.old_journal_filename, 'r+b') as old_journal_file:
+            old_journal_file.truncate(length)
+            old_journal_file.seek(length)
+            with open(self.journal_filename, 'rb') as journal_file:
+                shutil.copyfileobj(journal_file, old_journal_file)
+            old_journal_file.flush()
+            os.fsync(old_journal_file.fileno())
+        os.remove(self.journal_filename)
+
+    def wait(self):
+        """Wait for a snapshot being written in the background to finish."""
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def close(self):
+        """Stop recording and remove the journal if the tank has been saved.
+
+        If there are changes that haven't been saved, they are compacted into
+        the save file first.
+        """
+        self.wait()
+        if self.tank.journal_seq < self.seq:
+            self.compact(background=False)
+        self._journal_file.close()
+        self.tank.journal = None
+        os.remove(self.journal_filename)
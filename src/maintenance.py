@@ -0,0 +1,187 @@
+"""Bulk maintenance of many save files at once.
+
+Checking in on a tank that hasn't been opened in a while only needs the
+tank itself, so a directory of save files can be split up between worker
+processes. Each worker loads a tank along with anything left in its journal,
+checks in on it, feeds or cleans it if asked to, and saves it again with an
+atomic rename. A tank that fails doesn't stop the others, and is reported
+along with the error.
+
+The tanks shouldn't be open in the aquarium while they are being maintained.
+
+Tanks can also be summarized from the indexes written next to their save
+files, which only falls back to loading a tank if its index is out of date.
+"""
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.fish.fish_builder import FishBuilder
+from src.journal import Journal
+from src.save_index import INDEX_EXTENSION, read_index, summarize
+from src.tank import Tank, default_max_fish
+
+
+# Files next to the save files that aren't save files themselves
+SKIP_SUFFIXES = ('.journal', '.journal.old', '.tmp', INDEX_EXTENSION)
+# Number of batches to give each worker, so a slow batch doesn't hold up
+# the end of the run
+BATCHES_PER_WORKER = 4
+
+
+def find_save_files(directory: str) -> List[str]:
+    """Get every save file in a directory, in sorted order."""
+    filenames = []
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if entry.is_file() and not entry.name.endswith(SKIP_SUFFIXES):
+            filenames += [entry.path]
+    return filenames
+
+
+def describe_error(error: Exception) -> str:
+    """Get the error a tank failed with, for reporting it."""
+    return f'{type(error).__name__}: {error}'
+
+
+def maintain_tank(filename: str, timestamp: float, feed: bool = False,
+                  clean: bool = False,
+                  species_file: str = 'data/species.json',
+                  personality_file: str = 'data/personalities.json') -> dict:
+    """Check in on a tank and save it again.
+
+    Args:
+        filename: Save file for the tank.
+        timestamp: Time to check in at.
+        feed: Whether to feed the fish.
+        clean: Whether to clean the tank.
+        species_file: File the tank's species are read from.
+        personality_file: File the tank's personalities are read from.
+
+    Returns:
+        Dict with the filename, the number of fish in the tank and the error
+        if it failed, otherwise None.
+    """
+    try:
+        tank = Tank(fish_builder=FishBuilder(species_file, personality_file),
+                    clock=lambda: timestamp)
+        tank.load(filename)
+        tank.max_fish = default_max_fish(tank.width, tank.height)
+        journal = Journal(tank, filename)
+        journal.open()
+        try:
+            tank.checkin(timestamp)
+            if feed:
+                tank.feed(timestamp)
+            if clean:
+                tank.clean(timestamp)
+            tank.save(filename)
+        finally:
+            journal.close()
+    except Exception as error:  # Reported with the rest of the results
+        return {'filename': filename, 'fish': 0, 'error': describe_error(error)}
+    return {'filename': filename, 'fish': len(tank.fish), 'error': None}
+
+
+def summarize_tank(filename: str,
+                   species_file: str = 'data/species.json',
+                   personality_file: str = 'data/personalities.json') -> dict:
+    """Get the summary of a tank, loading it only if its index is missing
+    or out of date.
+
+    A tank that is loaded has the changes in its journal applied, without
+    saving them or touching the journal.
+
+    Args:
+        filename: Save file for the tank.
+        species_file: File the tank's species are read from.
+        personality_file: File the tank's personalities are read from.
+
+    Returns:
+        The summary of the tank, in the same format as save_index.summarize.
+    """
+    summary = read_index(filename)
+    if summary is None:
+        tank = Tank(fish_builder=FishBuilder(species_file, personality_file))
+        tank.load(filename)
+        tank.max_fish = default_max_fish(tank.width, tank.height)
+        Journal(tank, filename).replay()
+        summary = summarize(tank)
+        # The save doesn't have the last check in, so it isn't known
+        summary['last_checkin'] = None
+    return summary
+
+
+def summarize_tanks(filenames: List[str], **builder_files) \
+        -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    """Get the summary of each tank.
+
+    A tank that can't be summarized doesn't stop the others, and is reported
+    along with the error.
+
+    Args:
+        filenames: Save files for the tanks.
+        builder_files: species_file and personality_file for summarize_tank.
+
+    Returns:
+        Iterator of (filename, summary, error) for each tank, with the
+        summary None and the error it failed with if it failed, otherwise
+        the error None.
+    """
+    for filename in filenames:
+        try:
+            summary = summarize_tank(filename, **builder_files)
+        except Exception as error:  # Reported with the rest of the results
+            yield filename, None, describe_error(error)
+        else:
+            yield filename, summary, None
+
+
+def maintain_tanks(filenames: List[str], timestamp: float = None,
+                   feed: bool = False, clean: bool = False,
+                   workers: int = None, **builder_files) -> Dict:
+    """Check in on many tanks, split between worker processes.
+
+    Args:
+        filenames: Save files for the tanks.
+        timestamp: Time to check in at. Defaults to the current time, so
+                   every tank is checked in at the same time.
+        feed: Whether to feed the fish.
+        clean: Whether to clean the tanks.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+                 With 1, the tanks are maintained in this process.
+        builder_files: species_file and personality_file for maintain_tank.
+
+    Returns:
+        Dict with the number of tanks and fish maintained, how many seconds
+        it took, the tanks and fish per second, and a list of
+        (filename, error) for each tank that failed.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    maintain = functools.partial(maintain_tank, timestamp=timestamp,
+                                 feed=feed, clean=clean, **builder_files)
+    started = time.perf_counter()
+    if workers == 1:
+        results = list(map(maintain, filenames))
+    else:
+        chunksize = max(1, len(filenames)//(workers*BATCHES_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(maintain, filenames,
+                                        chunksize=chunksize))
+    seconds = time.perf_counter() - started
+    failures = [(result['filename'], result['error'])
+                for result in results if result['error'] is not None]
+    tanks = len(results) - len(failures)
+    fish = sum(result['fish'] for result in results)
+    return {
+        'tanks': tanks,
+        'fish': fish,
+        'seconds': seconds,
+        'tanks_per_second': tanks/seconds if seconds else 0,
+        'fish_per_second': fish/seconds if seconds else 0,
+        'failures': failures,
+    }
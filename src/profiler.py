@@ -0,0 +1,234 @@
+"""Optional instrumentation for finding where the time goes.
+
+A Profiler times calls to the methods it is asked to instrument by
+replacing them on that one object with a timed wrapper, and puts the
+original methods back when it is removed. Nothing is changed until then, so
+leaving profiling off costs nothing.
+
+The timings can be summarized with histograms, written to a json dump file,
+exported as a Chrome trace (chrome://tracing or https://ui.perfetto.dev) or
+profiled in full with cProfile.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+# Upper bounds in milliseconds of the buckets in the timing histograms
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Profiler:
+    """Times instrumented methods and counts things that happen in them.
+
+    Attributes:
+        timings: Dict from the name of each timer to a list of how many
+                 seconds each call took.
+        counters: Dict from the name of each counter to its total.
+        trace: List of (name, start, duration, thread id) for each call, if
+               the calls are being traced.
+        cprofile: Whether to profile the instrumented calls with cProfile.
+        lock: Mutex for recording from more than one thread.
+    """
+    def __init__(self, trace: bool = False, cprofile: bool = False):
+        self.timings: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.trace = [] if trace else None
+        self.cprofile = cprofile
+        self.lock = threading.Lock()
+        self._patched: List[Tuple[object, str, object]] = []
+        self._local = threading.local()
+        self._cprofile = None
+        self._cprofile_thread = None
+        self._started = time.perf_counter()
+
+    def instrument(self, obj, method_name: str, name: str = None,
+                   counter: Callable[[object], int] = None,
+                   counter_name: str = None):
+        """Time every call to a method of an object.
+
+        Args:
+            obj: The object with the method.
+            method_name: Name of the method to time.
+            name: Name of the timer. Defaults to the class and method name.
+            counter: If given, called with what the method returns to get an
+                     amount to add to a counter.
+            counter_name: Name of the counter. Defaults to the timer's name.
+        """
+        if name is None:
+            name = f'{type(obj).__name__}.{method_name}'
+        if counter_name is None:
+            counter_name = name
+        method = getattr(obj, method_name)
+        original = vars(obj).get(method_name)
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = self._enter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self._exit(name, started)
+            if counter is not None:
+                self.count(counter_name, counter(result))
+            return result
+        setattr(obj, method_name, timed)
+        self._patched.append((obj, method_name, original))
+
+    def remove(self):
+        """Put back every method that was instrumented."""
+        while self._patched:
+            obj, method_name, original = self._patched.pop()
+            if original is None:
+                delattr(obj, method_name)
+            else:
+                setattr(obj, method_name, original)
+
+    def _enter(self) -> float:
+        """Start timing a call, and cProfile if it is the outermost call."""
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        if depth == 0 and self.cprofile and self._owns_cprofile():
+            self._cprofile.enable()
+        return time.perf_counter()
+
+    def _exit(self, name: str, started: float):
+        """Finish timing a call."""
+        duration = time.perf_counter() - started
+        self._local.depth -= 1
+        if self._local.depth == 0 and self.cprofile and self._owns_cprofile():
+            self._cprofile.disable()
+        with self.lock:
+            self.timings.setdefault(name, []).append(duration)
+            if self.trace is not None:
+                self.trace.append((name, started, duration,
+                                   threading.get_ident()))
+
+    def _owns_cprofile(self) -> bool:
+        """Whether the current thread is the one that runs cProfile.
+
+        There is one cProfile.Profile for the whole process, since from
+        Python 3.12 only one profiler can be active at a time. It is enabled
+        and disabled by the first thread to make an instrumented call, so
+        calls on other threads are timed but only profiled where the
+        profiler follows every thread.
+        """
+        thread = threading.get_ident()
+        if self._cprofile_thread is None:
+            with self.lock:
+                if self._cprofile_thread is None:
+                    import cProfile  # Only loaded when profiling
+                    self._cprofile = cProfile.Profile()
+                    self._cprofile_thread = thread
+        return thread == self._cprofile_thread
+
+    def count(self, name: str, amount: int = 1):
+        """Add to a counter."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def histogram(self, name: str) -> List[Tuple[float, int]]:
+        """Get how many calls to a timer fell into each bucket.
+
+        Returns:
+            List of (upper bound in milliseconds, number of calls), with a
+            last bucket of math.inf for anything slower.
+        """
+        buckets = [0]*(len(HISTOGRAM_BOUNDS) + 1)
+        for duration in self.timings.get(name, []):
+            buckets[bisect.bisect_left(HISTOGRAM_BOUNDS, 1000*duration)] += 1
+        return list(zip(HISTOGRAM_BOUNDS + (float('inf'),), buckets))
+
+    def summary(self) -> dict:
+        """Get the count, total and percentiles in milliseconds of each timer,
+        along with the counters."""
+        timers = {}
+        for name, durations in self.timings.items():
+            ordered = sorted(durations)
+            timers[name] = {
+                'calls': len(ordered),
+                'total_ms': 1000*sum(ordered),
+                'mean_ms': 1000*sum(ordered)/len(ordered),
+                'p50_ms': 1000*ordered[len(ordered)//2],
+                'p95_ms': 1000*ordered[int(0.95*(len(ordered) - 1))],
+                'max_ms': 1000*ordered[-1],
+                'histogram': {str(bound): calls for bound, calls
+                              in self.histogram(name)},
+            }
+        return {'timers': timers, 'counters': dict(self.counters)}
+
+    def report(self) -> str:
+        """Get a table of the timers and counters."""
+        lines = [f'{"timer":<28} {"calls":>8} {"mean ms":>10} '
+                 f'{"p95 ms":>10} {"max ms":>10}']
+        for name, timer in self.summary()['timers'].items():
+            lines += [f'{name:<28} {timer["calls"]:>8} {timer["mean_ms"]:>10.3f} '
+                      f'{timer["p95_ms"]:>10.3f} {timer["max_ms"]:>10.3f}']
+        for name, total in self.counters.items():
+            lines += [f'{name:<28} {total:>8}']
+        return '\n'.join(lines)
+
+    def dump(self, filename: str):
+        """Write the summary to a json file."""
+        with open(filename, 'w') as dump_file:
+            json.dump(self.summary(), dump_file, indent=2)
+
+    def export_trace(self, filename: str):
+        """Write the traced calls to a Chrome trace json file.
+
+        Raises:
+            ValueError: If the profiler wasn't tracing calls.
+        """
+        if self.trace is None:
+            raise ValueError('Calls were not traced')
+        events = [{'name': name,
+                   'ph': 'X',
+                   'ts': 1e6*(started - self._started),
+                   'dur': 1e6*duration,
+                   'pid': os.getpid(),
+                   'tid': thread}
+                  for name, started, duration, thread in self.trace]
+        with open(filename, 'w') as trace_file:
+            json.dump({'traceEvents': events}, trace_file)
+
+    def export_cprofile(self, filename: str):
+        """Write the cProfile stats for the instrumented calls to a file.
+
+        The file can be read with pstats or snakeviz.
+
+        Raises:
+            ValueError: If the profiler wasn't running cProfile, or nothing
+                        was profiled.
+        """
+        if not self.cprofile:
+            raise ValueError('cProfile was not enabled')
+        if self._cprofile is None:
+            raise ValueError('Nothing was profiled')
+        import pstats  # Only loaded when profiling
+        pstats.Stats(self._cprofile).dump_stats(filename)
+
+
+def instrument_aquarium(profiler: Profiler, tank, tank_widget=None):
+    """Instrument the hot paths of the tank and its widget.
+
+    Args:
+        profiler: Profiler to time them with.
+        tank: Tank whose check ins, feeding, cleaning and status are timed.
+              Check ins are timed however they happen, since feeding,
+              cleaning and getting the status check in too.
+        tank_widget: TankWidget whose frames are timed, if any. The number
+                     of rows rendered each frame is counted too.
+    """
+    profiler.instrument(tank, '_checkin', name='Tank.checkin')
+    for method_name in ['feed', 'clean', 'get_status']:
+        profiler.instrument(tank, method_name)
+    if tank_widget is not None:
+        for method_name in ['build_frame', 'draw', 'move_fish', 'draw_fish',
+                            'update_rows', 'show_frame']:
+            profiler.instrument(tank_widget, method_name)
+        profiler.instrument(tank_widget.text_buffer, 'render_changes',
+                            counter=len, counter_name='rows rendered')
@@ -0,0 +1,198 @@
+"""Compact binary save format for the tank.
+
+The file starts with a header with the tank's fields, followed by a table of
+every distinct string used by the fish (names, species, personalities and
+colors), followed by one fixed width record for each fish. Records refer to
+strings by their index in the table, so they can be read one at a time
+straight out of a memory map of the file.
+"""
+import mmap
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator, List
+
+MAGIC = b'AFSH'
+VERSION = 3
+BINARY_EXTENSION = '.bin'
+# Magic and version, which every version of the header starts with
+PREFIX = struct.Struct('<4sH')
+# Magic, version, width, height, waste, journal sequence number, number of
+# fish, number of strings, and the string index of the movement
+HEADER = struct.Struct('<4sHIIdQIII')
+# Headers of older versions that can still be read. Version 2 is missing the
+# movement, and version 1 the journal sequence number as well
+OLD_HEADERS = {1: struct.Struct('<4sHIIdII'), 2: struct.Struct('<4sHIIdQII')}
+STRING_LENGTH = struct.Struct('<H')
+MAX_STRING_LENGTH = 2**(8*STRING_LENGTH.size) - 1
+# Name, species, personality and color string indexes, then birth,
+# last_fed, time_fed, stress, and last_checkin
+RECORD = struct.Struct('<4I5d')
+
+
+class SaveFileError(ValueError):
+    """Raised when a binary save file can't be read."""
+
+
+def is_binary(filename: str) -> bool:
+    """Returns whether or not the file should use the binary format."""
+    return filename.endswith(BINARY_EXTENSION)
+
+
+def is_binary_file(filename: str) -> bool:
+    """Returns whether or not an existing file is in the binary format,
+    going by the magic at the start of it rather than its name."""
+    try:
+        with open(filename, 'rb') as save_file:
+            return save_file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_tank(save_file: BinaryIO, tank_fields: dict, fish_list: List):
+    """Write a tank in the binary format.
+
+    Args:
+        save_file: File opened for writing bytes.
+        tank_fields: Dict with the tank's width, height, waste, journal_seq
+                     and movement.
+        fish_list: The fish in the tank.
+
+    Raises:
+        ValueError: If a string is too long to fit in the string table.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    movement = intern(tank_fields['movement'])
+    records = []
+    for fish in fish_list:
+        records += [RECORD.pack(intern(fish.name),
+                                intern(fish.species.name),
+                                intern(fish.personality.name),
+                                intern(fish.color),
+                                fish.birth,
+                                fish.last_fed,
+                                fish.time_fed,
+                                fish.stress,
+                                fish.last_checkin)]
+    save_file.write(HEADER.pack(MAGIC, VERSION,
+                                tank_fields['width'],
+                                tank_fields['height'],
+                                tank_fields['waste'],
+                                tank_fields['journal_seq'],
+                                len(records),
+                                len(strings),
+                                movement))
+    for text in strings:
+        encoded = text.encode('utf-8')
+        if len(encoded) > MAX_STRING_LENGTH:
+            raise ValueError(f'{text[:20]}... is too long to save')
+        save_file.write(STRING_LENGTH.pack(len(encoded)))
+        save_file.write(encoded)
+    save_file.writelines(records)
+
+
+def write_atomic(filename: str, data: bytes):
+    """Replace a file with new contents without ever leaving it half written.
+
+    The data is written to a temporary file next to it first, which is then
+    renamed over the original file.
+
+    Args:
+        filename: The file to write.
+        data: The new contents of the file.
+    """
+    temp_filename = f'{filename}.tmp'
+    with open(temp_filename, 'wb') as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_filename, filename)
+
+
+def read_tank(save_file: BinaryIO) -> Iterator[dict]:
+    """Read a tank in the binary format.
+
+    The first item is a dict with the tank's width, height, waste and
+    journal_seq, and its movement if it was saved with one. It is followed
+    by a dict for each fish in the same format as Fish.to_json, which are
+    read from the file one at a time as they are needed. Files from older
+    versions are read too.
+
+    Args:
+        save_file: File opened for reading bytes.
+
+    Raises:
+        SaveFileError: If the file isn't a binary save file, is cut short or
+                       refers to a string that isn't in it.
+    """
+    if os.fstat(save_file.fileno()).st_size < PREFIX.size:
+        raise SaveFileError('Save file is too short')
+    with mmap.mmap(save_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version = PREFIX.unpack_from(data)
+        if magic != MAGIC:
+            raise SaveFileError('Not a binary save file')
+        header = HEADER if version == VERSION else OLD_HEADERS.get(version)
+        if header is None:
+            raise SaveFileError(f'Unsupported save file version {version}')
+        if len(data) < header.size:
+            raise SaveFileError('Save file is too short')
+        # Older saves were never written by a journal, and had no movement
+        journal_seq = 0
+        movement = None
+        if version == VERSION:
+            _, _, width, height, waste, journal_seq, fish_count, \
+                string_count, movement = header.unpack_from(data)
+        elif version == 2:
+            _, _, width, height, waste, journal_seq, fish_count, \
+                string_count = header.unpack_from(data)
+        else:
+            _, _, width, height, waste, fish_count, \
+                string_count = header.unpack_from(data)
+
+        offset = header.size
+        strings = []
+        try:
+            for _ in range(string_count):
+                length, = STRING_LENGTH.unpack_from(data, offset)
+                offset += STRING_LENGTH.size
+                if offset + length > len(data):
+                    raise SaveFileError('Save file is missing strings')
+                strings += [str(data[offset:offset + length], 'utf-8')]
+                offset += length
+        except (struct.error, UnicodeDecodeError) as error:
+            raise SaveFileError('Save file is missing strings') from error
+        tank_fields = {
+            "width": width,
+            "height": height,
+            "waste": waste,
+            "journal_seq": journal_seq,
+        }
+        if movement is not None:
+            if movement >= len(strings):
+                raise SaveFileError('Save file refers to a missing string')
+            tank_fields["movement"] = strings[movement]
+        yield tank_fields
+
+        end = offset + fish_count*RECORD.size
+        if len(data) < end:
+            raise SaveFileError('Save file is missing fish')
+        with memoryview(data)[offset:end] as records:
+            for record in RECORD.iter_unpack(records):
+                name, species, personality, color = record[:4]
+                if max(name, species, personality, color) >= len(strings):
+                    raise SaveFileError('Save file refers to a missing string')
+                birth, last_fed, time_fed, stress, last_checkin = record[4:]
+                yield {
+                    "name": strings[name],
+                    "species": strings[species],
+                    "personality": strings[personality],
+                    "birth": birth,
+                    "last_fed": last_fed,
+                    "time_fed": time_fed,
+                    "stress": stress,
+                    "last_checkin": last_checkin,
+                    "color": strings[color],
+                }
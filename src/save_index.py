@@ -0,0 +1,103 @@
+"""Small index of what is in a save file, kept next to it.
+
+Whenever a tank is saved, a summary of it is written to an index file next
+to the save file: how many fish it has and their names, how many of each
+species, the waste and when it was last checked in on. Listing many tanks
+then only needs to read their indexes instead of loading every fish.
+
+The index records the modification time and size of the save file it was
+written for. If the save file changes without the index being updated, or
+there are changes in its journal that haven't been saved yet, the index is
+ignored and the tank has to be loaded to summarize it.
+"""
+import json
+import os
+from collections import Counter
+from typing import Optional
+
+from src import save_file
+
+
+INDEX_EXTENSION = '.index'
+VERSION = 1
+# Journals next to a save file with changes that aren't in it yet
+JOURNAL_EXTENSIONS = ('.journal', '.journal.old')
+
+
+def index_filename(filename: str) -> str:
+    """Get the index file for a save file."""
+    return f'{filename}{INDEX_EXTENSION}'
+
+
+def _file_version(filename: str) -> list:
+    """Get the modification time and size of a file."""
+    stat = os.stat(filename)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def has_journal(filename: str) -> bool:
+    """Returns whether a save file has a journal with changes in it."""
+    for extension in JOURNAL_EXTENSIONS:
+        try:
+            if os.path.getsize(f'{filename}{extension}'):
+                return True
+        except OSError:
+            pass
+    return False
+
+
+def summarize(tank) -> dict:
+    """Get the summary of a tank that goes in its index.
+
+    Args:
+        tank: The tank to summarize.
+
+    Returns:
+        Dict with the tank's size, waste, last check in, number of fish,
+        their names and how many fish there are of each species.
+    """
+    return {
+        'width': tank.width,
+        'height': tank.height,
+        'waste': tank.waste,
+        'last_checkin': tank.last_checkin,
+        'fish_count': len(tank.fish),
+        'names': [fish.name for fish in tank.fish],
+        'species': dict(Counter(fish.species.name for fish in tank.fish)),
+    }
+
+
+def write_index(filename: str, summary: dict):
+    """Write the index for a save file that has just been written.
+
+    Args:
+        filename: The save file.
+        summary: Summary of the tank in the save file, from summarize.
+    """
+    index = dict(summary, version=VERSION, save_file=_file_version(filename))
+    save_file.write_atomic(index_filename(filename),
+                           json.dumps(index).encode('utf-8'))
+
+
+def read_index(filename: str) -> Optional[dict]:
+    """Read the summary of a tank from the index of its save file.
+
+    Args:
+        filename: The save file.
+
+    Returns:
+        The summary of the tank, or None if there is no index or it is out of
+        date with the save file or its journal.
+    """
+    if has_journal(filename):
+        return None
+    try:
+        with open(index_filename(filename)) as index_file:
+            index = json.load(index_file)
+        if index.get('version') != VERSION \
+                or index.get('save_file') != _file_version(filename):
+            return None
+    except (OSError, ValueError):
+        return None
+    del index['version'], index['save_file']
+    return index
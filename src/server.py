@@ -0,0 +1,286 @@
+"""Aquarium server hosting many tanks in one process.
+
+Keeps the most recently used tanks in memory, all sharing one FishBuilder,
+and saves the least recently used ones back to disk when there are too many.
+Evicted tanks are written out after the lock on the tanks is let go, so other
+clients aren't held up while they are saved.
+
+Clients talk to it over a Unix socket by sending one json request per line
+and reading back one json response per line.
+
+Requests look like {"tank": "alice", "command": "feed"}, with any arguments
+for the command as extra fields.
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from src import save_file, save_index
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank, default_max_fish
+
+
+DEFAULT_MAX_TANKS = 100
+# No dots, so a tank can't be named after another tank's journal or index
+TANK_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def get_string(request: dict, field: str) -> str:
+    """Get a field of a request that should be a string.
+
+    Raises:
+        KeyError: If the field is missing.
+        ValueError: If the field isn't a string.
+    """
+    value = request[field]
+    if not isinstance(value, str):
+        raise ValueError(f'{field} should be a string')
+    return value
+
+
+class TankServer:
+    """Holds many tanks in memory and runs commands on them.
+
+    Attributes:
+        directory: Directory the tanks are saved in.
+        max_tanks: Most tanks to keep in memory at once.
+        fish_builder: FishBuilder shared by all of the tanks.
+        tanks: Tanks in memory from least to most recently used.
+        lock: Mutex for the tanks.
+        saving: Tanks that have been evicted but may not be written to disk
+                yet, along with the snapshot of each to write.
+    """
+    def __init__(self, directory: str,
+                 max_tanks: int = DEFAULT_MAX_TANKS,
+                 fish_builder: FishBuilder = None):
+        self.directory = directory
+        self.max_tanks = max_tanks
+        if fish_builder is not None:
+            self.fish_builder = fish_builder
+        else:
+            self.fish_builder = FishBuilder()
+        self.tanks = OrderedDict()
+        self.lock = threading.Lock()
+        self.saving = {}
+        self._snapshots = 0
+        # Newest snapshot written for each tank, so an older snapshot that
+        # finishes late never overwrites a newer one
+        self._written = {}
+        self._write_lock = threading.Lock()
+
+    def filename(self, name: str) -> str:
+        """Get the save file for a tank.
+
+        Raises:
+            ValueError: If the name can't be used as a filename.
+        """
+        if not TANK_NAME.match(name):
+            raise ValueError(f'Invalid tank name {name}')
+        return os.path.join(self.directory, name)
+
+    def get_tank(self, name: str) -> Tank:
+        """Get a tank, loading it from disk or making a new one if needed.
+
+        Marks the tank as the most recently used and evicts the least
+        recently used tanks if there are too many in memory. Should be called
+        while holding the lock, and the evicted tanks saved with save_evicted
+        once it is let go.
+        """
+        if name in self.tanks:
+            self.tanks.move_to_end(name)
+            return self.tanks[name]
+        filename = self.filename(name)
+        if name in self.saving:
+            # Still newer than what is on disk
+            _, tank = self.saving.pop(name)
+        else:
+            tank = Tank(fish_builder=self.fish_builder)
+            if os.path.isfile(filename):
+                tank.load(filename)
+            # Bigger tanks fit more fish
+            tank.max_fish = default_max_fish(tank.width, tank.height)
+        self.tanks[name] = tank
+        while len(self.tanks) > self.max_tanks:
+            self.evict()
+        return tank
+
+    def evict(self):
+        """Take the least recently used tank out of memory.
+
+        A snapshot of it is kept in saving until save_evicted writes it to
+        disk.
+        """
+        name, tank = self.tanks.popitem(last=False)
+        self.saving[name] = (self._snapshot(name, tank), tank)
+
+    def _snapshot(self, name: str, tank: Tank) -> Tuple[str, int, bytes, dict]:
+        """Check in on a tank and serialize it to write out later.
+
+        Should be called while holding the lock.
+
+        Returns:
+            The name of the tank, the number of the snapshot, the contents
+            of its save file and the summary for its index.
+        """
+        tank.checkin()
+        self._snapshots += 1
+        return (name, self._snapshots,
+                tank.dumps(save_file.is_binary(self.filename(name))),
+                save_index.summarize(tank))
+
+    def _write(self, snapshots: List[Tuple[str, int, bytes, dict]]):
+        """Write snapshots of tanks to disk, skipping any that are no newer
+        than one already written for the same tank."""
+        with self._write_lock:
+            for name, number, data, summary in snapshots:
+                if number <= self._written.get(name, 0):
+                    continue
+                filename = self.filename(name)
+                save_file.write_atomic(filename, data)
+                save_index.write_index(filename, summary)
+                self._written[name] = number
+
+    def save_evicted(self):
+        """Write the evicted tanks to disk without holding the lock."""
+        with self.lock:
+            snapshots = [snapshot for snapshot, _ in self.saving.values()]
+        self._write(snapshots)
+        with self.lock:
+            for name, number, _, _ in snapshots:
+                # Unless it was brought back or evicted again in the meantime
+                if name in self.saving and self.saving[name][0][1] == number:
+                    del self.saving[name]
+
+    def save_all(self):
+        """Save every tank in memory, and any evicted tanks."""
+        with self.lock:
+            snapshots = [self._snapshot(name, tank)
+                         for name, tank in self.tanks.items()]
+        self._write(snapshots)
+        self.save_evicted()
+
+    def handle(self, request: dict) -> dict:
+        """Run a command on a tank.
+
+        Args:
+            request: Dict with the name of the tank, the command and any
+                     arguments for the command.
+
+        Returns:
+            Dict with the result of the command, or an error.
+        """
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'Request should be an object'}
+        try:
+            with self.lock:
+                tank = self.get_tank(get_string(request, 'tank'))
+                response = {'ok': True, 'result': self.run(tank, request)}
+        except (KeyError, ValueError, IndexError) as error:
+            response = {'ok': False, 'error': str(error)}
+        if self.saving:
+            self.save_evicted()
+        return response
+
+    def run(self, tank: Tank, request: dict):
+        """Run a command from a request on a tank."""
+        command = get_string(request, 'command')
+        if command == 'status':
+            return tank.get_status()
+        if command == 'feed':
+            tank.feed()
+            return 'The fish have been feed'
+        if command == 'clean':
+            return tank.clean()
+        if command == 'fish':
+            return [fish.name for fish in tank.fish]
+        if command == 'add_fish':
+            if tank.is_full():
+                return 'Sorry, the tank is full'
+            name = get_string(request, 'name')
+            if name.lower() in [fish.name.lower() for fish in tank.fish]:
+                return 'Sorry, that name is already taken'
+            fish = self.fish_builder.make_fish(
+                name=name,
+                species_name=get_string(request, 'species'),
+                personality_name=get_string(request, 'personality'),
+                clock=tank.clock)
+            tank.add_fish(fish)
+            return f'Welcome {name}'
+        if command == 'remove_fish':
+            return tank.remove_fish(get_string(request, 'name'))
+        raise ValueError(f'Unknown command {command}')
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Reads json requests from a client and writes back the responses."""
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as error:
+                response = {'ok': False, 'error': str(error)}
+            else:
+                response = self.server.tank_server.handle(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that handles each client on its own thread."""
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, tank_server: TankServer):
+        self.tank_server = tank_server
+        super(UnixServer, self).__init__(socket_path, RequestHandler)
+
+
+def send(socket_path: str, request: dict) -> dict:
+    """Send a single request to a running server.
+
+    Args:
+        socket_path: Path to the server's Unix socket.
+        request: The request to send.
+
+    Returns:
+        The server's response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile('rwb') as stream:
+            stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def main():
+    """Run the aquarium server until it is interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('directory', help='Directory to save the tanks in')
+    parser.add_argument('--socket', default='aquarium.sock',
+                        help='Path for the Unix socket')
+    parser.add_argument('--max-tanks', type=int, default=DEFAULT_MAX_TANKS,
+                        help='Most tanks to keep in memory')
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    tank_server = TankServer(args.directory, max_tanks=args.max_tanks)
+    with UnixServer(args.socket, tank_server) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            tank_server.save_all()
+            os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,17 +4,29 @@ This holds all the fish and is used to interact with them, like feeding.
 The Tank class also holds all relevant data and functions for
 the main save file.
 """
+import io
 import json
+import random
 import time
+from typing import Callable, Iterable, List
 
-from src.fish.fish import Fish
+from src.fish.fish import Fish, DAY, catch_up_days
 from src.fish.fish_builder import FishBuilder
+from src import save_file, save_index
 
 
-DAY = 60*60*24
 DEFAULT_WIDTH = 30
 DEFAULT_HEIGHT = 10
 DEFAULT_MAX_FISH = 10
+# How the fish move in the interface, one of urwid_interface.movement.MOVEMENTS
+DEFAULT_MOVEMENT = 'random'
+
+
+def default_max_fish(width: int, height: int) -> int:
+    """Get how many fish fit in a tank, scaling up with its area."""
+    area = width*height
+    default_area = DEFAULT_WIDTH*DEFAULT_HEIGHT
+    return max(DEFAULT_MAX_FISH, DEFAULT_MAX_FISH*area//default_area)
 
 
 class Tank:
@@ -28,23 +40,57 @@ class Tank:
         fish: List of fish in the tank.
         fish_builder: Creates fish that are read in from json.
         last_checkin: Timestamp of when the stress was last updated.
+        store: FishStore holding the state of the fish if the tank is
+               vectorized, otherwise None.
+        journal: Journal that changes to the tank are recorded in, if any.
+        journal_seq: Sequence number of the last journal record that has
+                     been applied to the tank.
+        rng: Random number generator for anything random about the tank,
+             like what the fish say. Defaults to the random module.
+        clock: Function giving the current timestamp, used whenever a time
+               isn't given. Defaults to time.time.
+        recorder: Recorder that check ins, feeding, cleaning and status
+                  are recorded to, if the session is being recorded.
+        movement: How the fish move around the tank in the interface, saved
+                  with the tank.
     """
     def __init__(self,
                  width: int = DEFAULT_WIDTH,
                  height: int = DEFAULT_HEIGHT,
                  max_fish: int = DEFAULT_MAX_FISH,
                  waste: float = 0,
-                 last_checkin: float = None):
+                 last_checkin: float = None,
+                 vectorized: bool = False,
+                 fish_builder: FishBuilder = None,
+                 rng: random.Random = None,
+                 clock: Callable[[], float] = None,
+                 movement: str = DEFAULT_MOVEMENT):
         self.width = width
         self.height = height
         self.max_fish = max_fish
         self.waste = waste
-        self.fish = []
-        self.fish_builder = FishBuilder()
+        self.clock = clock if clock is not None else time.time
+        if vectorized:
+            # Imported here so numpy is only loaded for vectorized tanks
+            from src.fish.fish_store import FishStore
+            self.store = FishStore(clock=self.clock)
+            self.fish = self.store.fish
+        else:
+            self.store = None
+            self.fish = []
+        if fish_builder is not None:
+            self.fish_builder = fish_builder
+        else:
+            self.fish_builder = FishBuilder()
+        self.rng = rng if rng is not None else random
         if last_checkin is not None:
             self.last_checkin = last_checkin
         else:
-            self.last_checkin = time.time()
+            self.last_checkin = self.clock()
+        self.journal = None
+        self.journal_seq = 0
+        self.recorder = None
+        self.movement = movement
 
     def add_fish(self, fish: Fish):
         """Adds a fish to the tank as long as there is still room in the tank.
@@ -53,60 +99,172 @@ class Tank:
             fish: The fish to be added.
         """
         if not self.is_full():
-            self.fish += [fish]
+            if self.store is not None:
+                self.store.add(fish)
+            else:
+                self.fish += [fish]
+            if self.journal is not None:
+                self.journal.record('add_fish', fish=fish.to_json())
 
     def remove_fish(self, fish_name: str):
         """Remove fish with given name from the tank."""
         for fish in self.fish:
             if fish.name == fish_name:
-                self.fish.remove(fish)
+                if self.store is not None:
+                    self.store.remove(fish)
+                else:
+                    self.fish.remove(fish)
+                if self.journal is not None:
+                    self.journal.record('remove_fish', name=fish_name)
                 return f'Goodbye {fish_name}'
         return f'Error, could not remove {fish_name}'
 
-    def feed(self):
-        """Feed all fish in the tank."""
-        self.checkin()
-        for f in self.fish:
-            f.feed()
+    def feed(self, timestamp: float = None):
+        """Feed all fish in the tank.
 
-    def clean(self):
-        """Clean the tank if there is a significant amount of waste."""
+        Args:
+            timestamp: If given, feed the fish as if it were that time.
+                       Otherwise feed them at the current time.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        self._checkin(timestamp)
+        if self.store is not None:
+            self.store.feed(timestamp)
+        else:
+            for f in self.fish:
+                f.feed(timestamp)
+        if self.recorder is not None:
+            self.recorder.record('feed', timestamp)
+        if self.journal is not None:
+            self.journal.record('feed', timestamp=timestamp)
+
+    def clean(self, timestamp: float = None):
+        """Clean the tank if there is a significant amount of waste.
+
+        Args:
+            timestamp: If given, clean the tank as if it were that time.
+                       Otherwise clean it at the current time.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
         if self.waste > 0.15:
             self.waste = 0
-            self.checkin()
-            return "The tank is squeaky clean now"
-        self.checkin()
-        return "The tank is still pretty clean"
+            message = "The tank is squeaky clean now"
+        else:
+            message = "The tank is still pretty clean"
+        self._checkin(timestamp)
+        if self.recorder is not None:
+            self.recorder.record('clean', timestamp)
+        if self.journal is not None:
+            self.journal.record('clean', timestamp=timestamp)
+        return message
 
     def checkin(self, timestamp: float = None):
         """Update the amount of waste and checkin on the waste.
 
         Updates the amount of waste based on the number of fish and the
-        timestamp for when the last check in occurred. It will recursively
-        checkin for each day that has passed since the last checkin.
+        timestamp for when the last check in occurred. The fish are checked
+        in once for each day that has passed since the last checkin, which is
+        done in closed form so long absences don't take any longer.
 
         Args:
             timestamp: If given, perform the check in as if it were that time.
                        Otherwise check in using the current time.
         """
         if timestamp is None:
-            timestamp = time.time()
-        # Recursively checkin for each day that has passed
-        if self.last_checkin + DAY < timestamp:
-            self.checkin(timestamp - DAY)
-        for fish in self.fish:
-            fish.checkin(timestamp)
+            timestamp = self.clock()
+        self._checkin(timestamp)
+        if self.recorder is not None:
+            self.recorder.record('checkin', timestamp)
+
+    def checkin_fish(self, fish: Fish, timestamp: float = None):
+        """Check in on one fish without checking in on the rest of the tank.
+
+        Catches the fish up the same way a check in on the tank would, but
+        leaves the waste and the tank's last check in alone, so one fish
+        growing doesn't move the whole tank along.
+
+        Args:
+            fish: The fish to check in on.
+            timestamp: If given, perform the check in as if it were that time.
+                       Otherwise check in using the current time.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        if timestamp > fish.last_checkin:
+            fish.catch_up(timestamp,
+                          catch_up_days(fish.last_checkin, timestamp))
+        if self.recorder is not None:
+            self.recorder.record('checkin_fish', fish.name, timestamp)
+
+    def _checkin(self, timestamp: float):
+        """Check in without recording it, for use by other recorded changes."""
         time_delta = timestamp - self.last_checkin
+        # Checkin for each day that has passed since each fish's last check
+        # in, which is later than the tank's for fish that grew since then
+        if self.store is not None:
+            self.store.catch_up(timestamp)
+        else:
+            for fish in self.fish:
+                fish.catch_up(timestamp,
+                              catch_up_days(fish.last_checkin, timestamp))
         new_waste = 0.05*time_delta*len(self.fish)/DAY
         self.waste += new_waste
         self.last_checkin = timestamp
 
+    def get_status(self, timestamp: float = None,
+                   rng: random.Random = None) -> List[str]:
+        """Get how the fish are doing.
 
-    def get_status(self):
-        """Get how clean the tank is and how the fish are doing."""
-        self.checkin()
-        fish_status = [fish.get_status() for fish in self.fish]
-        return fish_status
+        Checks in on the tank once and then describes every fish from the
+        result, so it doesn't check in on each fish separately.
+
+        Args:
+            timestamp: If given, get the status as if it were that time.
+                       Otherwise use the current time.
+            rng: Random number generator to pick the fish's quotes with, so
+                 the status can be reproduced.
+
+        Returns:
+            List with a line for each fish.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        self._checkin(timestamp)
+        if self.recorder is not None:
+            self.recorder.record('status', timestamp)
+        return self._describe_fish(timestamp, rng)
+
+    def describe_fish(self, timestamp: float = None,
+                      rng: random.Random = None) -> List[str]:
+        """Get how the fish are doing without checking in first.
+
+        Args:
+            timestamp: If given, get how hungry the fish are as of that time.
+                       Otherwise use the current time.
+            rng: Random number generator to pick the fish's quotes with.
+
+        Returns:
+            List with a line for each fish.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        if self.recorder is not None:
+            self.recorder.record('describe', timestamp)
+        return self._describe_fish(timestamp, rng)
+
+    def _describe_fish(self, timestamp: float, rng: random.Random = None) -> List[str]:
+        """Describe every fish, getting their hunger all at once if the tank
+        is vectorized."""
+        if rng is None:
+            rng = self.rng
+        if self.store is not None:
+            hunger = self.store.get_hunger(timestamp).tolist()
+        else:
+            hunger = [fish.get_hunger(timestamp) for fish in self.fish]
+        return [fish.describe(fish_hunger, rng)
+                for fish, fish_hunger in zip(self.fish, hunger)]
 
     def is_full(self):
         """Returns whether or not the tank is full."""
@@ -117,7 +275,9 @@ class Tank:
         tank_json = {
             "width": self.width,
             "height": self.height,
-            "waste": self.waste
+            "waste": self.waste,
+            "journal_seq": self.journal_seq,
+            "movement": self.movement,
         }
         tank_json["fish"] = [f.to_json() for f in self.fish]
         return tank_json
@@ -131,19 +291,100 @@ class Tank:
         self.width = tank_json.get("width", DEFAULT_WIDTH)
         self.height = tank_json.get("height", DEFAULT_HEIGHT)
         self.waste = tank_json.get("waste", 0)
-        self.fish = []
-        for json_fish in tank_json["fish"]:
-            self.add_fish(self.fish_builder.from_json(json_fish))
+        self.journal_seq = tank_json.get("journal_seq", 0)
+        self.movement = tank_json.get("movement", DEFAULT_MOVEMENT)
+        self.load_fish(tank_json["fish"])
+
+    def load_fish(self, fish_json: Iterable[dict]):
+        """Replace the fish in the tank with fish loaded from json.
 
-    def save(self, filename):
+        Every fish is loaded even if there are more than max_fish, so none
+        are lost from a tank that was saved with a higher limit.
+
+        Args:
+            fish_json: Iterable of dicts with the serialized json of each fish.
+        """
+        if self.store is not None:
+            self.store.clear()
+        else:
+            self.fish = []
+        for json_fish in fish_json:
+            fish = self.fish_builder.from_json(json_fish, clock=self.clock)
+            if self.store is not None:
+                self.store.add(fish)
+            else:
+                self.fish.append(fish)
+
+    def load(self, filename: str):
+        """Load the tank from a file.
+
+        Files starting with save_file.MAGIC, or ending in
+        save_file.BINARY_EXTENSION, are read in the binary format, one fish
+        at a time. Anything else is read as json.
+
+        Args:
+            filename: The file to load the tank from.
+        """
+        if save_file.is_binary(filename) or save_file.is_binary_file(filename):
+            with open(filename, 'rb') as binary_file:
+                records = save_file.read_tank(binary_file)
+                tank_json = next(records)
+                self.width = tank_json["width"]
+                self.height = tank_json["height"]
+                self.waste = tank_json["waste"]
+                self.journal_seq = tank_json["journal_seq"]
+                self.movement = tank_json.get("movement", DEFAULT_MOVEMENT)
+                self.load_fish(records)
+        else:
+            with open(filename, 'r') as json_file:
+                self.load_json(json.load(json_file))
+
+    def save(self, filename: str, binary: bool = None):
         """Save the tank to a file.
 
-        Serializes the tank to json and saves it to a file.
+        Serializes the tank to json, or the binary format, and saves it to a
+        file. A summary of the tank is written to an index next to it.
 
         Args:
             filename: The file to save the tank to.
+            binary: Whether to use the binary format. If not given, the binary
+                    format is used if the filename ends in
+                    save_file.BINARY_EXTENSION.
         """
         self.checkin()
-        json_text = json.dumps(self.to_json(), indent=4)
-        with open(filename, 'w') as save_file:
-            save_file.write(json_text)
+        if binary is None:
+            binary = save_file.is_binary(filename)
+        if self.journal is not None and filename == self.journal.filename:
+            # Everything in the journal is included in the save
+            self.journal.wait()
+            with self.journal.lock:
+                self.journal_seq = self.journal.seq
+                data = self.dumps(binary)
+                summary = save_index.summarize(self)
+        else:
+            data = self.dumps(binary)
+            summary = save_index.summarize(self)
+        save_file.write_atomic(filename, data)
+        save_index.write_index(filename, summary)
+
+    def dumps(self, binary: bool = False) -> bytes:
+        """Serialize the tank as it is now without checking in.
+
+        Args:
+            binary: Whether to use the binary format instead of json.
+
+        Returns:
+            The contents of a save file for the tank.
+        """
+        if binary:
+            tank_fields = {
+                "width": self.width,
+                "height": self.height,
+                "waste": self.waste,
+                "journal_seq": self.journal_seq,
+                "movement": self.movement,
+            }
+            data = io.BytesIO()
+            save_file.write_tank(data, tank_fields, self.fish)
+            return data.getvalue()
+        return json.dumps(self.to_json(), indent=4).encode('utf-8')
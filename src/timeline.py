@@ -0,0 +1,196 @@
+"""Timeline of upcoming changes to the fish in a tank.
+
+Rather than checking in on every fish whenever something needs their state,
+the times when each fish will next become hungry, start starving, or grow
+into its next stage are worked out ahead of time and kept in a priority
+queue. Nothing is recalculated until one of those times comes around, or
+the fish are fed or added. The tank is also checked in on once a day so
+stress keeps up to date.
+"""
+import heapq
+import itertools
+import math
+import random
+from typing import Dict, List, Tuple
+
+from src.fish.fish import Fish, DAY
+from src.fish.personality import HUNGRY_LEVEL
+from src.tank import Tank
+
+
+HUNGRY = 'hungry'
+STARVING = 'starving'
+GROWTH = 'growth'
+CHECKIN = 'checkin'
+# Seconds after a fish should grow to check in on it, so rounding can't
+# leave it just short of growing
+GROWTH_MARGIN = 1
+
+
+class FishState:
+    """State of a fish as of its last event.
+
+    Attributes:
+        hungry: Whether the fish is hungry enough to ask for food.
+        starving: Whether the fish has gone its species' hunger time without
+                  being fed.
+        stage: Index of the fish's current art.
+        generation: Incremented whenever the fish's events are rescheduled,
+                    so old events in the queue can be skipped.
+    """
+    def __init__(self, fish: Fish, timestamp: float):
+        self.hungry = fish.get_hunger(timestamp) > HUNGRY_LEVEL
+        self.starving = fish.get_hunger(timestamp) >= 1
+        self.stage = fish.get_stage()
+        self.generation = 0
+
+
+class Timeline:
+    """Priority queue of upcoming events for the fish in a tank.
+
+    Attributes:
+        tank: The tank the fish are in.
+        states: Dict with the state of each fish as of its last event.
+        events: Heap of (timestamp, order, generation, fish, kind) tuples.
+    """
+    def __init__(self, tank: Tank, timestamp: float = None):
+        self.tank = tank
+        self.states: Dict[Fish, FishState] = {}
+        self.events = []
+        self._order = itertools.count()
+        self._tank_generation = 0
+        self.reschedule(timestamp)
+
+    def _push(self, timestamp: float, generation: int, fish: Fish, kind: str):
+        """Add an event to the queue."""
+        if timestamp < math.inf:
+            heapq.heappush(self.events, (timestamp, next(self._order),
+                                         generation, fish, kind))
+
+    def schedule(self, fish: Fish, timestamp: float):
+        """Work out the upcoming events for a fish.
+
+        Any events already in the queue for the fish are dropped.
+
+        Args:
+            fish: The fish to schedule events for.
+            timestamp: Only events after this time are scheduled.
+        """
+        state = self.states.get(fish)
+        if state is None:
+            state = self.states[fish] = FishState(fish, timestamp)
+        state.generation += 1
+        hunger_time = fish.species.hunger_time
+        for kind, event_time in [
+                (HUNGRY, fish.last_fed + HUNGRY_LEVEL*hunger_time),
+                (STARVING, fish.last_fed + hunger_time),
+                (GROWTH, fish.next_growth_at() + GROWTH_MARGIN)]:
+            if event_time > timestamp:
+                self._push(event_time, state.generation, fish, kind)
+
+    def reschedule(self, timestamp: float = None):
+        """Work out the events for every fish again.
+
+        Should be called after the fish are fed, added or removed.
+
+        Args:
+            timestamp: If given, reschedule as if it were that time.
+                       Otherwise use the current time.
+        """
+        if timestamp is None:
+            timestamp = self.tank.clock()
+        self.states = {fish: self.states[fish] for fish in self.tank.fish
+                       if fish in self.states}
+        for fish in self.tank.fish:
+            state = self.states.get(fish)
+            if state is not None:
+                state.hungry = fish.get_hunger(timestamp) > HUNGRY_LEVEL
+                state.starving = fish.get_hunger(timestamp) >= 1
+            self.schedule(fish, timestamp)
+        self._tank_generation += 1
+        self._push(self.tank.last_checkin + DAY, self._tank_generation,
+                   None, CHECKIN)
+
+    def next_event(self) -> float:
+        """Get the timestamp of the next event, or math.inf if there are none."""
+        while self.events:
+            _, _, generation, fish, _ = self.events[0]
+            if self._is_current(generation, fish):
+                return self.events[0][0]
+            heapq.heappop(self.events)
+        return math.inf
+
+    def _is_current(self, generation: int, fish: Fish) -> bool:
+        """Whether an event hasn't been replaced by a later schedule."""
+        if fish is None:
+            return generation == self._tank_generation
+        state = self.states.get(fish)
+        return state is not None and generation == state.generation
+
+    def _checkin(self, timestamp: float) -> List[Tuple[Fish, str]]:
+        """Check in on the tank and find any fish that changed stage."""
+        grown = []
+        if timestamp > self.tank.last_checkin:
+            self.tank.checkin(timestamp)
+        for fish in self.states:
+            grown += self._grown(fish)
+        return grown
+
+    def _grown(self, fish: Fish) -> List[Tuple[Fish, str]]:
+        """Find whether a fish changed stage since its last event."""
+        state = self.states[fish]
+        stage = fish.get_stage()
+        if stage == state.stage:
+            return []
+        state.stage = stage
+        return [(fish, GROWTH)]
+
+    def advance(self, timestamp: float = None) -> List[Tuple[Fish, str]]:
+        """Handle every event up to the given time.
+
+        Args:
+            timestamp: If given, advance to that time. Otherwise advance to
+                       the current time.
+
+        Returns:
+            List of (fish, kind) for each event that happened. Growth events
+            are reported for any fish whose art changed.
+        """
+        if timestamp is None:
+            timestamp = self.tank.clock()
+        happened = []
+        while self.next_event() <= timestamp:
+            event_time, _, _, fish, kind = heapq.heappop(self.events)
+            if kind == CHECKIN:
+                # Catch all the way up rather than one day at a time
+                happened += self._checkin(timestamp)
+                self._tank_generation += 1
+                self._push(self.tank.last_checkin + DAY,
+                           self._tank_generation, None, CHECKIN)
+            elif kind == GROWTH:
+                # Only the fish that grew is checked in on, the rest of the
+                # tank waits for its own check in
+                self.tank.checkin_fish(fish, event_time)
+                happened += self._grown(fish)
+                self.schedule(fish, event_time)
+            elif kind == HUNGRY:
+                self.states[fish].hungry = True
+                happened += [(fish, kind)]
+            elif kind == STARVING:
+                self.states[fish].starving = True
+                happened += [(fish, kind)]
+        return happened
+
+    def get_status(self, timestamp: float = None,
+                   rng: random.Random = None) -> List[str]:
+        """Get how the fish are doing without checking in on all of them.
+
+        Args:
+            timestamp: If given, get the status as of that time. Otherwise
+                       use the current time.
+            rng: Random number generator to pick the fish's quotes with.
+        """
+        if timestamp is None:
+            timestamp = self.tank.clock()
+        self.advance(timestamp)
+        return self.tank.describe_fish(timestamp, rng)
@@ -0,0 +1,166 @@
+"""Backgrounds for tanks of any size.
+
+The default sized tank uses the hand drawn BACKGROUND. Backgrounds for other
+sizes are generated with a water line, sand, kelp, plants and rocks spread
+out along the bottom. Generating is seeded by the size, so a tank looks the
+same every time it is opened, and each size is only generated once.
+"""
+import functools
+import random
+from typing import List, Optional, Tuple
+
+from src.tank import DEFAULT_HEIGHT, DEFAULT_WIDTH
+
+
+BACKGROUND = [
+    [r'+==============================+'],
+    [r'|', ('water', '~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~'), '|'],
+    [r'|                              |'],
+    [r'|   ', ('light_green', r'~|~'), '                        |'],
+    [r'|   ', ('light_green', r'~|~'), '                    ',
+     ('green', '/'), '   |'],
+    [r'|   ', ('light_green', r'~|~'), '              ',
+     ('green', '_'), '    ', ('green', '/'), ' ', ('green', '_'), '  |'],
+    [r'|   ', ('light_green', r'~|~'), '               ', ('green', '\\'),
+     '  ', ('green', '|'), ' ', ('green', '/'), '   |'],
+    [r'|   ', ('light_green', r'~|~'), '                ', ('green', '\\'),
+     ' ', ('green', r'|//'), '   |'],
+    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
+     '       ', ('rock', '___'), ' ', ('green', '\ \| \\'), '   |'],
+    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
+     '    ', ('rock', '__/ __\\'), ' ', ('green', '|/|//'), '   |'],
+    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
+     '   ', ('rock', '/   /  \\\\'), ' ', ('green', r'\|/'), '    |'],
+    [r'+', ('sand', '##############################'), '+'],
+]
+
+# Average number of columns for each kelp, plant and rock
+KELP_SPACING = 12
+PLANT_SPACING = 10
+ROCK_SPACING = 16
+# Plants and rocks from the top down, each line being (offset, text)
+PLANTS = [
+    [(0, '/'), (-1, '\\ |'), (-1, '\\|/')],
+    [(-1, '_ /'), (-1, '\\|/'), (0, '|')],
+    [(-2, '\\ \\| \\'), (-2, '|/|//'), (-1, '\\|/')],
+    [(-1, '\\ /'), (0, '|')],
+]
+ROCKS = [
+    [(1, '___'), (0, '/   \\')],
+    [(2, '___'), (0, '__/ __\\'), (0, '/   /  \\\\')],
+    [(0, '_'), (0, '/ \\')],
+]
+
+Cell = Tuple[str, Optional[str]]
+
+
+class Scene:
+    """Grid of characters and palette names for drawing a background.
+
+    Attributes:
+        width: Width of the interior of the tank.
+        height: Height of the interior of the tank.
+        cells: (character, palette name) for each position, including the
+               border around the tank.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.cells: List[List[Cell]] = [[(' ', None)]*(width + 2)
+                                        for _ in range(height + 2)]
+
+    def draw(self, x: int, y: int, text: str, palette: str = None):
+        """Draw text onto the interior of the tank, cutting off what doesn't
+        fit. Spaces in the text are left see through."""
+        if not 0 < y <= self.height:
+            return
+        for i, char in enumerate(text):
+            if char != ' ' and 0 < x + i <= self.width:
+                self.cells[y][x + i] = (char, palette)
+
+    def is_clear(self, left: int, right: int, top: int) -> bool:
+        """Whether nothing has been drawn in the columns from left to right,
+        from row top down to the sand."""
+        for y in range(max(top, 1), self.height + 1):
+            for x in range(max(left, 1), min(right, self.width) + 1):
+                if self.cells[y][x][0] != ' ':
+                    return False
+        return True
+
+    def to_rows(self) -> list:
+        """Turn the grid into rows of text that TextBuffer can read."""
+        rows = []
+        for row in self.cells:
+            parts = []
+            for char, palette in row:
+                if parts and parts[-1][0] == palette:
+                    parts[-1][1] += char
+                else:
+                    parts += [[palette, char]]
+            rows += [[text if palette is None else (palette, text)
+                      for palette, text in parts]]
+        return rows
+
+
+def _border(scene: Scene):
+    """Draw the sides of the tank, the water line and the sand."""
+    width, height = scene.width, scene.height
+    scene.cells[0] = [('+', None)] + [('=', None)]*width + [('+', None)]
+    scene.cells[-1] = [('+', None)] + [('#', 'sand')]*width + [('+', None)]
+    for y in range(1, height + 1):
+        scene.cells[y][0] = ('|', None)
+        scene.cells[y][-1] = ('|', None)
+    if height > 0:
+        scene.cells[1][1:-1] = [('~', 'water')]*width
+
+
+def _kelp(scene: Scene, rng: random.Random):
+    """Draw tall kelp along the bottom of the tank."""
+    for _ in range(scene.width//KELP_SPACING):
+        x = rng.randint(1, max(scene.width - 2, 1))
+        top = scene.height - rng.randint(scene.height//3, max(scene.height - 3, 1)) + 1
+        if scene.is_clear(x - 1, x + 3, top):
+            for y in range(top, scene.height + 1):
+                scene.draw(x, y, '~|~', 'light_green')
+
+
+def _items(scene: Scene, rng: random.Random, items: list, spacing: int,
+           palette: str):
+    """Draw plants or rocks sitting on the sand wherever there is room."""
+    for _ in range(scene.width//spacing):
+        item = rng.choice(items)
+        if len(item) >= scene.height:
+            continue
+        x = rng.randint(1, scene.width)
+        top = scene.height - len(item) + 1
+        left = x + min(offset for offset, _ in item)
+        right = x + max(offset + len(text) for offset, text in item) - 1
+        if left < 1 or right > scene.width:
+            continue
+        if not scene.is_clear(left - 1, right + 1, top):
+            continue
+        for y, (offset, text) in enumerate(item, start=top):
+            scene.draw(x + offset, y, text, palette)
+
+
+@functools.lru_cache(maxsize=None)
+def make_background(width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT) -> tuple:
+    """Get the background for a tank.
+
+    Args:
+        width: Width of the interior of the tank in characters.
+        height: Height of the interior of the tank in characters.
+
+    Returns:
+        Rows of the background in the format read by TextBuffer, including
+        the border around the tank.
+    """
+    if (width, height) == (DEFAULT_WIDTH, DEFAULT_HEIGHT):
+        return tuple(BACKGROUND)
+    rng = random.Random(f'{width}x{height}')
+    scene = Scene(width, height)
+    _border(scene)
+    _kelp(scene, rng)
+    _items(scene, rng, ROCKS, ROCK_SPACING, 'rock')
+    _items(scene, rng, PLANTS, PLANT_SPACING, 'green')
+    return tuple(scene.to_rows())
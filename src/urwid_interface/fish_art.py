@@ -1,24 +1,15 @@
+import functools
+import math
 import random
+import sys
+from typing import Tuple
 
 from src.fish.fish import Fish
+from src.fish.species import Species
 
 
-def _double_replace(text: str, char1: str, char2: str) -> str:
-    """Swaps instances of char1 and char2 in a string.
-
-    Args:
-        text: The text to do the replacements in.
-        char1: One of the strings to swap.
-        char2: The other of the strings to swap.
-
-    Returns:
-        A string with the substrings swapped
-    """
-    TEMP = '!@#$%^&temp!@#$%&'  # Giberish that would never actually show up
-    text = text.replace(char1, TEMP)
-    text = text.replace(char2, char1)
-    text = text.replace(TEMP, char2)
-    return text
+# Directional characters and their counterparts when flipped
+MIRROR = str.maketrans('<>{}()[]/\\', '><}{)(][\\/')
 
 
 def _reverse(text: str) -> str:
@@ -33,13 +24,29 @@ def _reverse(text: str) -> str:
         String with the text reversed and directional characters replaced
         with their counterparts.
     """
-    text = text[::-1]
-    text = _double_replace(text, '<', '>')
-    text = _double_replace(text, '{', '}')
-    text = _double_replace(text, '(', ')')
-    text = _double_replace(text, '[', ']')
-    text = _double_replace(text, '/', '\\')
-    return text
+    return text[::-1].translate(MIRROR)
+
+
+@functools.lru_cache(maxsize=None)
+def species_art(species: Species) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Gets the art for every growth stage of a species in both directions.
+
+    Args:
+        species: The species to get the art for.
+
+    Returns:
+        Tuple with the art facing left and the art facing right.
+    """
+    return tuple(species.art), tuple(_reverse(art) for art in species.art)
+
+
+@functools.lru_cache(maxsize=None)
+def palette_name(color: str) -> str:
+    """Gets the name of the palette for fish of the given color.
+
+    Fish of the same color share a palette, and the same name string.
+    """
+    return sys.intern(f'fish_{color}')
 
 
 class FishArt:
@@ -47,17 +54,30 @@ class FishArt:
 
     Attributes:
         fish: The fish the art is for.
-        palette_name: Name of the palette for coloring the fish.
+        palette_name: Name of the palette for coloring the fish, shared with
+                      every fish of the same color.
         x: x position of the fish (0 is far left).
         y: y position of the fish (0 is top).
+        grid: FishGrid the fish is in, kept up to date when the fish moves
+              or grows.
     """
+    __slots__ = ('fish', 'palette_name', 'x', 'y', 'flipped', 'grid', '_art',
+                 '_stage', '_stage_start', '_stage_end')
 
-    def __init__(self, fish: Fish, x: int, y: int):
+    def __init__(self, fish: Fish, x: int, y: int, flipped: bool = None,
+                 rng: random.Random = None):
         self.fish = fish
-        self.palette_name = f'fish_{fish.name}'
+        self.palette_name = palette_name(fish.color)
         self.x = x
         self.y = y
-        self.flipped = random.random() > 0.5
+        if flipped is None:
+            flipped = (rng if rng is not None else random).random() > 0.5
+        self.flipped = flipped
+        self.grid = None
+        self._art = species_art(fish.species)
+        self._stage = 0
+        self._stage_start = math.inf
+        self._stage_end = -math.inf
 
     def flip(self):
         """Flip the art."""
@@ -65,13 +85,24 @@ class FishArt:
 
     def update_position(self, x: int, y: int):
         """Change the position."""
+        old_x, old_y = self.x, self.y
         self.x = x
         self.y = y
+        if self.grid is not None:
+            self.grid.move(self, old_x, old_y)
 
     def get_art(self):
         """Get the art for the fish in the correct orientation."""
-        fish_art = self.fish.get_art()
-        # Randomly flip fish
-        if self.flipped:
-            fish_art = _reverse(fish_art)
-        return fish_art
+        time_fed = self.fish.time_fed
+        if not self._stage_start <= time_fed < self._stage_end:
+            self._update_stage(time_fed)
+        return self._art[self.flipped][self._stage]
+
+    def _update_stage(self, time_fed: float):
+        """Find the growth stage of the fish and how long it lasts."""
+        species = self.fish.species
+        stage = species.get_stage(time_fed)
+        if stage != self._stage and self.grid is not None:
+            self.grid.grown.add(self)
+        self._stage = stage
+        self._stage_start, self._stage_end = species.stage_bounds(stage)
@@ -0,0 +1,130 @@
+from typing import Dict, List, Set, Tuple
+
+from src.urwid_interface.fish_art import FishArt
+
+
+CELL_WIDTH = 8
+CELL_HEIGHT = 4
+
+
+class FishGrid:
+    """Spatial index of where the fish are in the tank.
+
+    Fish are put into buckets by the position of the left end of their art.
+    The grid is kept up to date by FishArt.update_position, so fish can be
+    moved without going through the grid, and FishArt notes any fish that
+    grew into new art.
+
+    Attributes:
+        cell_width: Width of each bucket in characters.
+        cell_height: Height of each bucket in characters.
+        cells: Dict of the fish in each bucket, keyed by bucket position.
+        rows: Dict of the fish in each row of the tank.
+        names: Dict of the fish with each name.
+        order: Dict of the order each fish was added in, used to decide which
+               fish gets drawn on top.
+        grown: Fish whose art changed since the movement engine last
+               caught up with them, which it should clear once it has.
+    """
+    def __init__(self, cell_width: int = CELL_WIDTH,
+                 cell_height: int = CELL_HEIGHT):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells: Dict[Tuple[int, int], Set[FishArt]] = {}
+        self.rows: Dict[int, Set[FishArt]] = {}
+        self.names: Dict[str, List[FishArt]] = {}
+        self.order: Dict[FishArt, int] = {}
+        self.grown: Set[FishArt] = set()
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def _cell(self, x: int, y: int) -> Tuple[int, int]:
+        """Get the position of the bucket for (x, y)."""
+        return x // self.cell_width, y // self.cell_height
+
+    def _insert(self, fish: FishArt, x: int, y: int):
+        """Put a fish in the buckets for (x, y)."""
+        self.cells.setdefault(self._cell(x, y), set()).add(fish)
+        self.rows.setdefault(y, set()).add(fish)
+
+    def _discard(self, fish: FishArt, x: int, y: int):
+        """Take a fish out of the buckets for (x, y)."""
+        self._take_out(self.cells, self._cell(x, y), fish)
+        self._take_out(self.rows, y, fish)
+
+    @staticmethod
+    def _take_out(buckets: dict, key, fish: FishArt):
+        """Take a fish out of a bucket, dropping the bucket once it's empty."""
+        bucket = buckets[key]
+        bucket.discard(fish)
+        if not bucket:
+            del buckets[key]
+
+    def add(self, fish: FishArt):
+        """Add a fish to the grid."""
+        self._insert(fish, fish.x, fish.y)
+        self.names.setdefault(fish.fish.name, []).append(fish)
+        self.order[fish] = self._next_order
+        self._next_order += 1
+        fish.grid = self
+
+    def remove(self, fish: FishArt):
+        """Remove a fish from the grid."""
+        self._discard(fish, fish.x, fish.y)
+        same_name = self.names[fish.fish.name]
+        same_name.remove(fish)
+        if not same_name:
+            del self.names[fish.fish.name]
+        del self.order[fish]
+        self.grown.discard(fish)
+        fish.grid = None
+
+    def move(self, fish: FishArt, old_x: int, old_y: int):
+        """Update the grid after a fish moved from (old_x, old_y).
+
+        Only the buckets the fish actually left are changed, so most moves
+        along a row don't touch the grid at all.
+        """
+        x, y = fish.x, fish.y
+        if old_y != y:
+            self._take_out(self.rows, old_y, fish)
+            self.rows.setdefault(y, set()).add(fish)
+        cell_width, cell_height = self.cell_width, self.cell_height
+        if old_x // cell_width != x // cell_width \
+                or old_y // cell_height != y // cell_height:
+            self._take_out(self.cells, self._cell(old_x, old_y), fish)
+            self.cells.setdefault(self._cell(x, y), set()).add(fish)
+
+    def get(self, name: str) -> FishArt:
+        """Get the first fish added with the given name, or None."""
+        same_name = self.names.get(name)
+        if same_name:
+            return same_name[0]
+        return None
+
+    def in_row(self, y: int) -> List[FishArt]:
+        """Get the fish in a row in the order they were added."""
+        return sorted(self.rows.get(y, ()), key=self.order.__getitem__)
+
+    def neighbors(self, x: int, y: int, radius: int) -> List[FishArt]:
+        """Get the fish within radius characters of (x, y) in each direction.
+
+        Args:
+            x: x position to search around.
+            y: y position to search around.
+            radius: How far to search from (x, y).
+
+        Returns:
+            List of the fish positioned within the search area.
+        """
+        min_x, min_y = self._cell(x - radius, y - radius)
+        max_x, max_y = self._cell(x + radius, y + radius)
+        found = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for fish in self.cells.get((cell_x, cell_y), ()):
+                    if abs(fish.x - x) <= radius and abs(fish.y - y) <= radius:
+                        found += [fish]
+        return found
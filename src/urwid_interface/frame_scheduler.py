@@ -0,0 +1,103 @@
+import time
+from typing import Callable
+
+
+DEFAULT_TIME_STEP = 0.2
+DEFAULT_IDLE_INTERVAL = 1
+DEFAULT_IDLE_AFTER = 60
+DEFAULT_MAX_STEPS = 25
+# How much weight the newest frame gets in the average frame time
+FRAME_TIME_WEIGHT = 0.2
+
+
+class FrameScheduler:
+    """Decides when to draw frames and how far to move the fish for each.
+
+    The fish are moved in fixed simulation steps, so they swim at the same
+    speed however often frames get drawn. When frames take longer to build
+    than the time between them, frames are coalesced: they are drawn less
+    often and each one runs several steps. After a while without any input
+    frames are drawn less often too.
+
+    Attributes:
+        time_step: Simulated seconds in each simulation step.
+        frame_interval: Seconds between frames while the user is active.
+        idle_interval: Seconds between frames while idle.
+        idle_after: Seconds without input before being considered idle.
+        max_steps: Most steps to run for one frame. Time beyond that is
+                   dropped instead of being caught up on.
+        frame_time: Average seconds it takes to build a frame.
+        backlog: Seconds of time that haven't been simulated yet.
+        last_activity: Timestamp of the last input.
+        clock: Function giving the current time in seconds, used whenever a
+               time isn't given. Defaults to time.monotonic.
+    """
+    def __init__(self,
+                 time_step: float = DEFAULT_TIME_STEP,
+                 frame_interval: float = None,
+                 idle_interval: float = DEFAULT_IDLE_INTERVAL,
+                 idle_after: float = DEFAULT_IDLE_AFTER,
+                 max_steps: int = DEFAULT_MAX_STEPS,
+                 clock: Callable[[], float] = None):
+        self.clock = clock if clock is not None else time.monotonic
+        self.time_step = time_step
+        if frame_interval is not None:
+            self.frame_interval = frame_interval
+        else:
+            self.frame_interval = time_step
+        self.idle_interval = max(idle_interval, self.frame_interval)
+        self.idle_after = idle_after
+        self.max_steps = max_steps
+        self.frame_time = 0
+        self.backlog = 0
+        self.last_activity = self.clock()
+
+    def activity(self, now: float = None):
+        """Note that there was input, so frames go back to full speed."""
+        if now is None:
+            now = self.clock()
+        self.last_activity = now
+
+    def is_idle(self, now: float = None) -> bool:
+        """Returns whether there hasn't been input for a while."""
+        if now is None:
+            now = self.clock()
+        return now - self.last_activity >= self.idle_after
+
+    def interval(self, now: float = None) -> float:
+        """Seconds between the start of one frame and the next.
+
+        Frames are spread out if they are taking longer than the interval to
+        build, so they never take up more than about two thirds of the time.
+        """
+        if self.is_idle(now):
+            interval = self.idle_interval
+        else:
+            interval = self.frame_interval
+        return max(interval, 1.5*self.frame_time)
+
+    def steps(self, elapsed: float) -> int:
+        """Get the number of simulation steps to run for the next frame.
+
+        Args:
+            elapsed: Seconds since the steps for the last frame were run.
+        """
+        self.backlog += elapsed
+        steps = int(self.backlog // self.time_step)
+        self.backlog -= steps*self.time_step
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.backlog = 0
+        return steps
+
+    def frame_done(self, duration: float, now: float = None) -> float:
+        """Record how long a frame took and get how long to wait for the next.
+
+        Args:
+            duration: Seconds it took to build the frame.
+
+        Returns:
+            Seconds to wait before starting the next frame.
+        """
+        self.frame_time += FRAME_TIME_WEIGHT*(duration - self.frame_time)
+        return max(0, self.interval(now) - duration)
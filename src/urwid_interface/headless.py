@@ -0,0 +1,104 @@
+"""Run the aquarium without a terminal.
+
+Drives the tank and the tank widget's movement and rendering with a
+simulated clock so it can run as fast as possible, timing each part of a
+frame along the way.
+"""
+import time
+from typing import Dict
+
+from src.fish.fish import DAY
+from src.tank import Tank
+from src.urwid_interface.movement import RANDOM
+from src.urwid_interface.tank_widget import TankWidget
+
+
+PHASES = ('move', 'buffer', 'markup', 'checkin')
+
+
+class HeadlessAquarium:
+    """Aquarium that runs frames without a terminal attached.
+
+    Each frame moves the fish, redraws them into the text buffer, turns the
+    changed rows into urwid markup and checks in on the tank. The simulated
+    clock moves forward by refresh_rate*speed seconds every frame, with the
+    fish moving one simulation step per frame.
+
+    Attributes:
+        tank: The tank being simulated.
+        tank_widget: Widget for the tank that does the movement and drawing.
+        speed: How many times faster than real time the clock runs.
+        clock: Current simulated timestamp.
+        start: Simulated timestamp the simulation started at.
+        frames: Number of frames run so far.
+        timings: Dict with the total seconds spent in each phase of a frame.
+    """
+    def __init__(self, tank: Tank,
+                 speed: float = 1,
+                 refresh_rate: float = 0.2,
+                 start: float = None,
+                 movement: str = RANDOM):
+        self.tank = tank
+        self.tank_widget = TankWidget(height=tank.height,
+                                      width=tank.width,
+                                      refresh_rate=refresh_rate,
+                                      movement=movement)
+        for fish in tank.fish:
+            self.tank_widget.add_fish(fish)
+        self.speed = speed
+        if start is not None:
+            self.clock = start
+        else:
+            self.clock = tank.last_checkin
+        self.start = self.clock
+        self.frames = 0
+        self.timings = {phase: 0.0 for phase in PHASES}
+
+    def step(self):
+        """Run a single frame."""
+        timer = time.perf_counter
+        started = timer()
+        self.tank_widget.move_fish()
+        moved = timer()
+        self.tank_widget.draw_fish()
+        drawn = timer()
+        self.tank_widget.update_rows()
+        updated = timer()
+        self.clock += self.tank_widget.scheduler.time_step*self.speed
+        self.tank.checkin(self.clock)
+        checked_in = timer()
+        self.timings['move'] += moved - started
+        self.timings['buffer'] += drawn - moved
+        self.timings['markup'] += updated - drawn
+        self.timings['checkin'] += checked_in - updated
+        self.frames += 1
+
+    def run(self, frames: int) -> Dict[str, float]:
+        """Run several frames and report how fast they ran.
+
+        Args:
+            frames: Number of frames to run.
+
+        Returns:
+            Dict from report for all frames run so far.
+        """
+        for _ in range(frames):
+            self.step()
+        return self.report()
+
+    def report(self) -> Dict[str, float]:
+        """Get the throughput of the frames run so far.
+
+        Returns:
+            Dict with the frames per second, simulated days per second and the
+            average milliseconds per frame spent in each phase.
+        """
+        total = sum(self.timings.values())
+        result = {
+            'frames': self.frames,
+            'frames_per_second': self.frames/total if total else 0,
+            'days_per_second': (self.clock - self.start)/DAY/total if total else 0,
+        }
+        for phase, seconds in self.timings.items():
+            result[f'{phase}_ms'] = 1000*seconds/self.frames if self.frames else 0
+        return result
@@ -1,14 +1,35 @@
+import math
 import random
 from typing import List, Callable
 
 import urwid
 
+from src.profiler import Profiler
 from src.tank import Tank
+from src.timeline import Timeline, GROWTH, HUNGRY, STARVING
 from src.urwid_interface.text_prompt import TextPrompt
 from src.urwid_interface.tank_widget import TankWidget
+from src.urwid_interface.fish_art import palette_name
 from src.urwid_interface.popup import Popup
 
 
+# Most seconds to wait between checking the timeline for events
+MAX_EVENT_WAIT = 60
+MENU_HEIGHT = 10
+# Rows on the screen used by everything besides the tank: the title, the
+# divider, the menu and the blank row under the tank
+RESERVED_ROWS = MENU_HEIGHT + 3
+# Keys for scrolling tanks too big for the screen, and how far they scroll
+# as a fraction of the screen
+PAN_KEYS = {
+    'shift left': (-1, 0),
+    'shift right': (1, 0),
+    'shift up': (0, -1),
+    'shift down': (0, 1),
+}
+PAN_FRACTION = 0.25
+
+
 class Interface:
     """Command line interface for interacting with the tank and fish.
 
@@ -16,18 +37,33 @@ class Interface:
         tank: The tank.
         bottom_widget: Urwid widget at the bottom of the tank.
         tank_widget: Urwid widget for ascii fish tank.
+        timeline: Upcoming events for the fish in the tank.
         palette: Urwid color palette.
         screen: Urwid screen for registering new palette entries.
+        rng: Random number generator to pick the personality and color of new
+             fish with. Kept apart from the tank's, so adding a fish while
+             recording doesn't use up the tank's random numbers, which the
+             replay rebuilds the fish without. Defaults to the random module.
+        profiler: If given, the main menu has a Profile item that shows its
+                  timers and counters on screen.
 
     """
     def __init__(self, tank: Tank,
-                 filename: str = 'save.json'):
+                 filename: str = 'save.json',
+                 rng: random.Random = None,
+                 profiler: Profiler = None):
         self.tank = tank
+        self.rng = rng if rng is not None else random
+        self.profiler = profiler
         self.filename = filename
         self.bottom_widget = None
         self.screen = None
         self.tank_widget = TankWidget(height=self.tank.height,
-                                      width=self.tank.width)
+                                      width=self.tank.width,
+                                      movement=tank.movement)
+        self.timeline = Timeline(tank)
+        self._event_alarm = None
+        self._status_popup = None
 
         self.palette = [
             ('banner', '', '', '', '#ffa', '#60d'),
@@ -39,12 +75,18 @@ class Interface:
             ('rock', '', '', '', '#587', ''),
         ]
 
+        colors = set()
         for fish in self.tank.fish:
             self.tank_widget.add_fish(fish)
-            self.palette += [(f'fish_{fish.name}', '', '', '', fish.color, '')]
+            colors.add(fish.color)
+        for color in sorted(colors):
+            self.palette += [(palette_name(color), '', '', '', color, '')]
 
         self.loop = None
+        self.main_menu_widget = None
 
+    def build_main_menu(self) -> urwid.Widget:
+        """Create the main menu, which isn't needed until the aquarium runs."""
         menu_items = [
             ('Status', self.status_button_action),
             ('Feed', self.feed_button_action),
@@ -54,12 +96,14 @@ class Interface:
             ('Help', self.help_button_action),
             ('Quit', self.quit),
         ]
+        if self.profiler is not None:
+            menu_items.insert(-2, ('Profile', self.profile_button_action))
         body = []
         for label, action in menu_items:
             button = urwid.Button(label)
             urwid.connect_signal(button, 'click', action)
             body.append(urwid.AttrMap(button, None, focus_map='reversed'))
-        self.main_menu_widget = urwid.ListBox(urwid.SimpleFocusListWalker(body))
+        return urwid.ListBox(urwid.SimpleFocusListWalker(body))
 
     def quit(self, _):
         """Exit the command line interface."""
@@ -69,17 +113,75 @@ class Interface:
 
     def run(self):
         """Enter the urwid line interface."""
-        self.bottom_widget = urwid.BoxAdapter(self.main_menu_widget, height=10)
+        self.main_menu_widget = self.build_main_menu()
+        self.bottom_widget = urwid.BoxAdapter(self.main_menu_widget,
+                                              height=MENU_HEIGHT)
         main_widget = urwid.Filler(urwid.Pile([urwid.Text('ASCII Aquarium'),
                                                self.tank_widget,
                                                urwid.Divider(),
                                                self.bottom_widget]))
         self.screen = urwid.raw_display.Screen()
-        self.loop = urwid.MainLoop(main_widget, self.palette, screen=self.screen)
+        self.loop = urwid.MainLoop(main_widget, self.palette, screen=self.screen,
+                                   input_filter=self.input_filter)
         self.loop.screen.set_terminal_properties(colors=256)
+        self.fit_tank()
         self.tank_widget.start_animation(self.loop)
+        self.schedule_events()
         self.loop.run()
 
+    def schedule_events(self, *args):
+        """Handle any events that are due and wait for the next one.
+
+        Growing fish are redrawn with their new art right away, and the
+        status is shown again if it is open when a fish gets hungry or starts
+        starving.
+        """
+        del args  # Unused
+        hunger_changed = False
+        for fish, kind in self.timeline.advance():
+            if kind == GROWTH:
+                self.tank_widget.redraw_fish(fish.name)
+            elif kind in (HUNGRY, STARVING):
+                hunger_changed = True
+        if hunger_changed and self._status_popup is not None \
+                and self.bottom_widget.original_widget is self._status_popup:
+            self.status_button_action(None)
+        if self._event_alarm is not None:
+            self.loop.remove_alarm(self._event_alarm)
+        wait = min(self.timeline.next_event() - self.tank.clock(), MAX_EVENT_WAIT)
+        self._event_alarm = self.loop.set_alarm_in(max(wait, 0),
+                                                   self.schedule_events)
+
+    def reschedule_events(self):
+        """Work out the fish's events again after they change."""
+        self.timeline.reschedule()
+        if self.loop is not None:
+            self.schedule_events()
+
+    def input_filter(self, keys: List[str], raw: List[int]) -> List[str]:
+        """Handle input meant for the tank.
+
+        Lets the tank know there was input so it animates at full speed,
+        fits the tank to the screen when the terminal is resized, and
+        scrolls the tank for the pan keys.
+        """
+        del raw  # Unused
+        self.tank_widget.scheduler.activity()
+        if 'window resize' in keys:
+            self.fit_tank()
+        viewport = self.tank_widget.viewport
+        for key in keys:
+            if key in PAN_KEYS:
+                dx, dy = PAN_KEYS[key]
+                self.tank_widget.pan(math.ceil(dx*PAN_FRACTION*viewport.width),
+                                     math.ceil(dy*PAN_FRACTION*viewport.height))
+        return [key for key in keys if key not in PAN_KEYS]
+
+    def fit_tank(self):
+        """Show as much of the tank as fits on the screen."""
+        cols, rows = self.screen.get_cols_rows()
+        self.tank_widget.resize(cols, rows - RESERVED_ROWS)
+
     def menu(self, title: str, choices: List[str], callback: Callable,
              cancel_button: bool = True):
         """Create a menu.
@@ -108,19 +210,27 @@ class Interface:
 
     def status_button_action(self, _):
         """Get the status of all fish."""
-        status = '\n'.join(self.tank.get_status())
-        popup = Popup(message=('yellow', status), callback=self.main_menu)
+        status = '\n'.join(self.timeline.get_status())
+        self._status_popup = Popup(message=('yellow', status),
+                                   callback=self.main_menu)
+        self.bottom_widget.original_widget = self._status_popup
+
+    def profile_button_action(self, _):
+        """Show the profiler's timers and counters so far."""
+        popup = Popup(message=self.profiler.report(), callback=self.main_menu)
         self.bottom_widget.original_widget = popup
 
     def feed_button_action(self, _):
         """Feed the fish."""
         self.tank.feed()
+        self.reschedule_events()
         popup = Popup(message='The fish have been feed', callback=self.main_menu)
         self.bottom_widget.original_widget = popup
 
     def clean_button_action(self, _):
         """Feed the fish."""
         response = self.tank.clean()
+        self.reschedule_events()
         popup = Popup(message=response, callback=self.main_menu)
         self.bottom_widget.original_widget = popup
 
@@ -155,7 +265,7 @@ class Interface:
             species: Name of the species to make the fish.
         """
         personalities = list(self.tank.fish_builder.personalities.keys())
-        personality = random.choice(personalities)
+        personality = self.rng.choice(personalities)
 
         def add_fish(name):
             """Add the fish to the tank and go back to the main menu.
@@ -180,15 +290,18 @@ class Interface:
 
             new_fish = self.tank.fish_builder.make_fish(name=name,
                                                         species_name=species,
-                                                        personality_name=personality)
+                                                        personality_name=personality,
+                                                        rng=self.rng,
+                                                        clock=self.tank.clock)
             self.tank.add_fish(new_fish)
-            self.screen.register_palette_entry(name=f'fish_{new_fish.name}',
+            self.screen.register_palette_entry(name=palette_name(new_fish.color),
                                              foreground='',
                                              background='',
                                              mono='',
                                              foreground_high=new_fish.color,
                                              background_high='')
             self.tank_widget.add_fish(new_fish)
+            self.reschedule_events()
             self.main_menu()
         name_prompt = TextPrompt(f'What do you want to name your {species}?\n', add_fish)
         self.bottom_widget.original_widget = name_prompt
@@ -225,6 +338,7 @@ class Interface:
             if response == 'Yes':
                 message = self.tank.remove_fish(fish_name)
                 self.tank_widget.remove_fish(fish_name)
+                self.reschedule_events()
                 popup = Popup(message=message, callback=self.main_menu)
                 self.bottom_widget.original_widget = popup
             else:
@@ -235,5 +349,7 @@ class Interface:
         """Prints the help message."""
         help_message = 'Feed your fish every day to make them happy.'
         help_message += ' It will take a while for them to grow up.'
+        help_message += ' If the tank is too big for the screen, hold shift'
+        help_message += ' and use the arrow keys to look around.'
         popup = Popup(help_message, self.main_menu)
         self.bottom_widget.original_widget = popup
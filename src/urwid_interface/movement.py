@@ -0,0 +1,129 @@
+"""Ways of moving the fish around a tank.
+
+A movement engine moves the fish in a TankWidget for one simulation step
+each time its move method is called, with the widget's fish_lock already
+held. It moves the fish with FishArt.update_position and FishArt.flip, and
+adds the rows it changed to the widget's dirty_rows. Each widget has its own
+engine, so different tanks can move their fish in different ways, and each
+tank saves the name of the one it uses as Tank.movement.
+
+The random walk moves every fish on its own. Schooling, which needs numpy,
+keeps fish of the same species together and stops fish from running into
+each other or the plants and rocks.
+"""
+import math
+import random
+from typing import List
+
+from src.urwid_interface.fish_art import FishArt
+
+
+RANDOM = 'random'
+SCHOOLING = 'schooling'
+MOVEMENTS = (RANDOM, SCHOOLING)
+
+
+def moving_fish(fish: List[FishArt], chance: float,
+                rng: random.Random) -> List[FishArt]:
+    """Randomly pick the fish that move this step.
+
+    Rather than rolling for every fish, the number of fish skipped before the
+    next one that moves is drawn directly, so this only takes as long as the
+    number of fish that move.
+
+    Args:
+        fish: The fish to pick from.
+        chance: Chance of each fish moving.
+        rng: Random number generator to pick them with.
+
+    Returns:
+        The fish that move, in order.
+    """
+    if chance >= 1:
+        return list(fish)
+    if chance <= 0:
+        return []
+    log_miss = math.log(1 - chance)
+    moving = []
+    index = -1
+    while True:
+        index += 1 + int(math.log(1 - rng.random())/log_miss)
+        if index >= len(fish):
+            return moving
+        moving += [fish[index]]
+
+
+class RandomWalk:
+    """Each fish wanders around on its own.
+
+    Each step, a fish moves with a chance of 0.8*time_step. A fish that moves
+    either flips around, moves up or down a row, or swims forward, bouncing
+    off the sides of the tank.
+    """
+    name = RANDOM
+
+    def moving_fish(self, tank_widget) -> List[FishArt]:
+        """Randomly pick the fish that move this step."""
+        chance = 0.8*tank_widget.scheduler.time_step
+        return moving_fish(tank_widget.fish, chance, tank_widget.rng)
+
+    def move(self, tank_widget):
+        """Move the fish in a widget for one simulation step."""
+        time_step = tank_widget.scheduler.time_step
+        chance = min(1, 0.8*time_step)
+        tank_width = tank_widget.tank_width
+        tank_height = tank_widget.tank_height
+        for fish in self.moving_fish(tank_widget):
+            tank_widget.dirty_rows.add(fish.y)
+            random_movement = tank_widget.rng.random()*chance
+            if random_movement < 0.2*time_step:
+                # Flip the fish
+                fish.flip()
+            elif random_movement < 0.3*time_step:
+                # Move up
+                if fish.y > 1:
+                    fish.update_position(fish.x, fish.y - 1)
+                else:
+                    # Bounce off top of tank
+                    fish.update_position(fish.x, fish.y + 1)
+            elif random_movement < 0.4*time_step:
+                # Move down
+                if fish.y < tank_height:
+                    fish.update_position(fish.x, fish.y + 1)
+                else:
+                    # Bounce off bottom of tank
+                    fish.update_position(fish.x, fish.y - 1)
+            elif random_movement < 0.8*time_step:
+                # Move forward
+                if fish.flipped:
+                    if fish.x < tank_width - len(fish.get_art()):
+                        # Move right
+                        fish.update_position(fish.x + 1, fish.y)
+                    else:
+                        # Bounce off side of tank
+                        fish.flip()
+                else:
+                    if fish.x > 1:
+                        # Move left
+                        fish.update_position(fish.x - 1, fish.y)
+                    else:  # Bounce off side of tank
+                        fish.flip()
+            tank_widget.dirty_rows.add(fish.y)
+
+
+def make_movement(name: str = RANDOM):
+    """Make a movement engine.
+
+    Args:
+        name: Which engine to make, one of MOVEMENTS.
+
+    Raises:
+        ValueError: If there is no engine with that name.
+    """
+    if name == RANDOM:
+        return RandomWalk()
+    if name == SCHOOLING:
+        # Imported here so numpy is only loaded for tanks that school
+        from src.urwid_interface.schooling import Schooling
+        return Schooling()
+    raise ValueError(f'Unknown movement {name}')
@@ -0,0 +1,219 @@
+"""Record a session with the aquarium and replay it exactly.
+
+While recording, the tank and the tank widget each get their own random
+number generator seeded from the recording's seed, and everything that
+changes them is written to a log: each frame and how many simulation steps
+it ran, fish being added and removed, the viewport moving, a fish that grew
+being checked in on, and the tank being checked in on, fed, cleaned or asked
+for its status along with the time it happened at.
+
+The log is a text file with one json array per line. The first line is a
+header with the seed and where the tank and fish started. Runs of frames
+with the same number of steps are written on a single line, so a long idle
+session stays small.
+
+Replaying starts from the header and applies every event as fast as it can,
+which makes a recorded session a reproducible benchmark.
+"""
+import json
+import random
+import threading
+import time
+from typing import Dict, List
+
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+from src.urwid_interface.movement import RANDOM
+from src.urwid_interface.tank_widget import TankWidget
+
+
+VERSION = 1
+
+
+def _dumps(item) -> str:
+    """Write an item as a compact line of json."""
+    return json.dumps(item, separators=(',', ':')) + '\n'
+
+
+class RecordingError(ValueError):
+    """A recording can't be replayed."""
+
+
+class Recorder:
+    """Writes everything that happens in a session to a log.
+
+    Attributes:
+        filename: The log file.
+        seed: Seed for the tank's and the widget's random number generators.
+        tank: The tank being recorded.
+        tank_widget: The widget being recorded.
+        lock: Mutex for recording from the simulation thread and the main
+              loop at the same time.
+    """
+    def __init__(self, filename: str, seed: int = None):
+        self.filename = filename
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.tank = None
+        self.tank_widget = None
+        self.lock = threading.Lock()
+        self._file = None
+        self._steps = None
+        self._frames = 0
+
+    def start(self, tank: Tank, tank_widget: TankWidget):
+        """Start recording, writing out where the tank and fish are now.
+
+        Args:
+            tank: The tank to record.
+            tank_widget: Widget showing the tank.
+        """
+        with tank_widget.fish_lock:
+            self.tank = tank
+            self.tank_widget = tank_widget
+            tank.rng = random.Random(self.seed)
+            tank_widget.rng = random.Random(self.seed + 1)
+            viewport = tank_widget.viewport
+            header = {
+                'version': VERSION,
+                'seed': self.seed,
+                'time_step': tank_widget.scheduler.time_step,
+                'movement': tank_widget.movement.name,
+                'last_checkin': tank.last_checkin,
+                'max_fish': tank.max_fish,
+                'tank': tank.to_json(),
+                'fish': [[art.fish.name, art.x, art.y, art.flipped]
+                         for art in tank_widget.fish],
+                'view': [viewport.left, viewport.top,
+                         viewport.width, viewport.height],
+            }
+            self._file = open(self.filename, 'w')
+            self._file.write(_dumps(header))
+            tank.recorder = self
+            tank_widget.recorder = self
+
+    def record(self, *event):
+        """Write an event to the log."""
+        with self.lock:
+            self._flush_frames()
+            self._file.write(_dumps(event))
+
+    def tick(self, steps: int):
+        """Record a frame that ran the given number of simulation steps."""
+        with self.lock:
+            if steps != self._steps:
+                self._flush_frames()
+                self._steps = steps
+            self._frames += 1
+
+    def _flush_frames(self):
+        """Write out the run of frames recorded so far."""
+        if self._frames:
+            self._file.write(_dumps(['tick', self._steps, self._frames]))
+        self._steps = None
+        self._frames = 0
+
+    def close(self):
+        """Stop recording."""
+        if self.tank is not None:
+            self.tank.recorder = None
+            self.tank_widget.recorder = None
+        with self.lock:
+            if self._file is not None:
+                self._flush_frames()
+                self._file.close()
+                self._file = None
+
+
+class Replay:
+    """Replays a recorded session.
+
+    Attributes:
+        tank: The tank as it was when recording started.
+        tank_widget: Widget showing the tank.
+        frames: Number of frames replayed so far.
+        status: Every status line the tank gave, in order.
+    """
+    def __init__(self, filename: str, fish_builder: FishBuilder = None):
+        with open(filename) as log:
+            header = json.loads(log.readline())
+            self._events = [json.loads(line) for line in log]
+        if header.get('version') != VERSION:
+            raise RecordingError(f'Unsupported recording version {header.get("version")}')
+        seed = header['seed']
+        self.tank = Tank(max_fish=header['max_fish'],
+                         last_checkin=header['last_checkin'],
+                         fish_builder=fish_builder,
+                         rng=random.Random(seed))
+        self.tank.load_json(header['tank'])
+        self.tank_widget = TankWidget(height=self.tank.height,
+                                      width=self.tank.width,
+                                      time_step=header['time_step'],
+                                      rng=random.Random(seed + 1),
+                                      movement=header.get('movement', RANDOM))
+        fish = {tank_fish.name: tank_fish for tank_fish in self.tank.fish}
+        for name, x, y, flipped in header['fish']:
+            self.tank_widget.add_fish(fish[name], x, y, flipped)
+        self.tank_widget.set_view(*header['view'])
+        self.frames = 0
+        self.status: List[str] = []
+
+    def apply(self, event: list):
+        """Apply one event from the log."""
+        kind, *args = event
+        if kind == 'tick':
+            steps, frames = args
+            for _ in range(frames):
+                self.tank_widget.build_frame(steps)
+                self.tank_widget.show_frame()
+            self.frames += frames
+        elif kind == 'add_fish':
+            fish_json, x, y, flipped = args
+            fish = self.tank.fish_builder.from_json(fish_json,
+                                                    clock=self.tank.clock)
+            self.tank.add_fish(fish)
+            # Placed from the widget's random numbers, the same as when it
+            # was recorded, so they stay in step with the rest of the session
+            art = self.tank_widget.add_fish(fish)
+            if (art.x, art.y, art.flipped) != (x, y, flipped):
+                raise RecordingError(f'Replay diverged adding {fish.name}')
+        elif kind == 'remove_fish':
+            self.tank.remove_fish(args[0])
+            self.tank_widget.remove_fish(args[0])
+        elif kind == 'view':
+            self.tank_widget.set_view(*args)
+        elif kind == 'checkin':
+            self.tank.checkin(args[0])
+        elif kind == 'checkin_fish':
+            name, timestamp = args
+            fish = next(tank_fish for tank_fish in self.tank.fish
+                        if tank_fish.name == name)
+            self.tank.checkin_fish(fish, timestamp)
+        elif kind == 'feed':
+            self.tank.feed(args[0])
+        elif kind == 'clean':
+            self.tank.clean(args[0])
+        elif kind == 'status':
+            self.status += self.tank.get_status(args[0])
+        elif kind == 'describe':
+            self.status += self.tank.describe_fish(args[0])
+        else:
+            raise RecordingError(f'Unknown event {kind}')
+
+    def run(self) -> Dict[str, float]:
+        """Replay the whole session as fast as possible.
+
+        Returns:
+            Dict with the number of frames, how many seconds it took and the
+            frames per second.
+        """
+        started = time.perf_counter()
+        for event in self._events:
+            self.apply(event)
+        seconds = time.perf_counter() - started
+        return {
+            'frames': self.frames,
+            'seconds': seconds,
+            'frames_per_second': self.frames/seconds if seconds else 0,
+        }
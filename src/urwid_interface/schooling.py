@@ -0,0 +1,367 @@
+"""Movement engine where fish school together by species.
+
+Works like boids on the grid of characters. Each step, every fish that moves
+looks at the fish of its own species nearby: it turns to face the way most
+of them are going, turns back if they are far behind it, and drifts up or
+down towards them. Fish never swim into each other or into the plants and
+rocks in the background, and slide up or down or turn around when they are
+blocked. Kelp can be swum through.
+
+Each step is worked out for all of the moving fish at once with numpy. Fish
+are binned into the same cells as FishGrid, and the count, position and
+direction of the fish of each species in each cell are summed up. The sums
+are kept from step to step, only changing for the fish that move or that the
+widget's FishGrid says have grown, and each moving fish looks at the sums
+for the cells around it. Whether each way a fish could move is clear is
+found by gathering the characters it would take up from an array of which
+characters are taken up by fish and obstacles. Fish only move into
+characters that were clear at the start of the step, and if two fish want
+the same one, the first fish gets it and the other turns around. Positions
+are read from the moving fish and written back to them, without keeping
+copies of where every fish is. The random numbers are drawn from the
+widget's rng in one go, so replays stay exact.
+"""
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for schooling
+    np = None
+
+from src.urwid_interface.fish_grid import CELL_HEIGHT, CELL_WIDTH
+from src.urwid_interface.movement import SCHOOLING
+
+
+# Palettes of the background that fish can't swim through
+OBSTACLE_PALETTES = ('rock', 'green')
+# Chance of a fish turning around for no reason when it moves
+FLIP_CHANCE = 0.05
+# Chance of a fish turning to face the same way as most of its school
+ALIGN_CHANCE = 0.5
+# How far behind a fish its school can be before it turns back
+TURN_DISTANCE = CELL_WIDTH
+# Chance of a fish moving a row towards the middle of its school
+COHESION_CHANCE = 0.5
+# Chance of a fish without a school nearby moving up or down a row
+WANDER_CHANCE = 0.1
+# How many characters ahead a fish looks for something in the way
+LOOKAHEAD = 3
+
+
+# The (dx, dy) moves a fish can make, with dx in the direction it is facing.
+# Staying put is never taken, but shows what the fish already overlaps.
+MOVES = ((1, -1), (1, 0), (1, 1), (0, -1), (0, 1), (0, 0))
+# The moves to try in order for a fish that wants to move dy rows, falling
+# back to sliding up or down past anything in the way
+OPTIONS = {
+    -1: ((1, -1), (1, 0), (0, -1), (1, 1), (0, 0)),
+    0: ((1, 0), (1, -1), (1, 1), (0, -1), (0, 1)),
+    1: ((1, 1), (1, 0), (0, 1), (1, -1), (0, 0)),
+}
+
+
+def _uniform(rng, count: int):
+    """Draw count random numbers from 0 to 1 from a random.Random at once."""
+    bits = rng.getrandbits(32*count).to_bytes(4*count, 'little')
+    return np.frombuffer(bits, dtype='<u4')/2**32
+
+
+class Schooling:
+    """Moves fish in schools without them overlapping.
+
+    Attributes:
+        fish: The fish as of the last step, in the same order as the widget.
+        cells: Array with the number of fish and obstacles taking up each
+               character of the tank, indexed by row and then column.
+        schools: Array with, for each cell of the grid and each species,
+                 the number of fish in it and the sums of the x positions of
+                 their middles, their y positions and their directions (1 for
+                 right and -1 for left). Kept up to date as the fish move
+                 rather than worked out again every step.
+    """
+    name = SCHOOLING
+
+    def __init__(self):
+        if np is None:
+            raise ImportError('numpy is required for schooling fish')
+        self.fish = []
+        self.cells = np.zeros((0, 0), dtype=int)
+        self.schools = np.zeros((0, 4), dtype=int)
+        self._size = None
+        # cells with empty room past the end of each row, so fish near the
+        # right of the tank can look past it without checking the bounds
+        self._padded = self.cells
+        # Arrays for the moves are laid out with a row for each move and a
+        # column for each fish, which numpy handles faster than the other
+        # way round
+        moves = np.array(MOVES)
+        self._move_dx = moves[:, :1]
+        self._move_dy = moves[:, 1:]
+        # How many characters of the fish itself each move leaves it on
+        self._same_row = (self._move_dy == 0).astype(int)
+        self._slide = self._same_row*np.abs(self._move_dx)
+        self._options = np.array([[MOVES.index(move) for move in OPTIONS[dy]]
+                                  for dy in (-1, 0, 1)]).T
+        self._width = np.arange(LOOKAHEAD)[:, None, None]
+        # How long each fish is, which way it faces and which cell of
+        # schools it is in, kept in step with the fish
+        self._length = np.zeros(0, dtype=int)
+        self._direction = np.zeros(0, dtype=int)
+        self._cell = np.zeros(0, dtype=int)
+        self._base = np.zeros(0, dtype=int)
+        self._grid_size = (0, 0)
+        self._offsets = np.zeros(0, dtype=int)
+
+    def _rebuild(self, tank_widget):
+        """Read in the fish and obstacles after the fish have changed."""
+        self.fish = list(tank_widget.fish)
+        self._size = (tank_widget.tank_width, tank_widget.tank_height)
+        text_buffer = tank_widget.text_buffer
+        obstacles = [text_buffer.palette_ids[name] for name in OBSTACLE_PALETTES
+                     if name in text_buffer.palette_ids]
+        formatting = np.array([list(row) for row in text_buffer.formatting])
+        rows, columns = formatting.shape
+        longest = max([len(art) for species in {fish.fish.species
+                                                for fish in self.fish}
+                       for art in species.art] + [LOOKAHEAD])
+        self._width = np.arange(longest)[:, None, None]
+        self._padded = np.zeros((rows, columns + LOOKAHEAD + longest),
+                                dtype=int)
+        self.cells = self._padded[:, :columns]
+        self.cells[:] = np.isin(formatting, obstacles)
+        species_ids = {}
+        self._length = np.array([len(fish.get_art()) for fish in self.fish],
+                                dtype=int)
+        self._direction = np.array([1 if fish.flipped else -1
+                                    for fish in self.fish], dtype=int)
+        # Cells are numbered with a border of empty cells around the grid,
+        # so the cells around any fish can be found by adding the offsets
+        grid_width = columns//CELL_WIDTH + 3
+        grid_height = rows//CELL_HEIGHT + 3
+        self._grid_size = (grid_width, grid_height)
+        self._offsets = np.array([dx*grid_height + dy
+                                  for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        species = np.array([species_ids.setdefault(fish.fish.species.name,
+                                                   len(species_ids))
+                            for fish in self.fish], dtype=int)
+        self._base = (species*grid_width + 1)*grid_height + 1
+        self.schools = np.zeros((len(species_ids)*grid_width*grid_height, 4),
+                                dtype=int)
+        self._cell = np.zeros(len(self.fish), dtype=int)
+        x = np.array([fish.x for fish in self.fish], dtype=int)
+        y = np.array([fish.y for fish in self.fish], dtype=int)
+        index = np.arange(len(self.fish))
+        self._enter(index, self._values(index, x, y))
+        for fish, length in zip(self.fish, self._length.tolist()):
+            self._occupy(fish.x, fish.y, length, 1)
+
+    def _occupy(self, x: int, y: int, length: int, amount: int):
+        """Add a fish to, or with a negative amount take it out of, the
+        characters it takes up."""
+        self.cells[y, max(x, 0):max(x + length, 0)] += amount
+
+    def _values(self, index, x, y):
+        """Get what fish add to the sums in schools for their cells.
+
+        Args:
+            index: Array with the indexes of the fish.
+            x: Array with the x position of each fish.
+            y: Array with the y position of each fish.
+
+        Returns:
+            Array with a row for each fish, laid out like schools.
+        """
+        values = np.ones((len(index), 4), dtype=int)
+        values[:, 1] = x + self._length[index]//2
+        values[:, 2] = y
+        values[:, 3] = self._direction[index]
+        return values
+
+    def _enter(self, index, values):
+        """Add fish to the sums in schools for the cells they are in.
+
+        Args:
+            index: Array with the indexes of the fish.
+            values: What the fish add to the sums, from _values.
+        """
+        grid_width, grid_height = self._grid_size
+        _, middle, y, _ = values.T
+        grid_x = np.minimum(np.maximum(middle//CELL_WIDTH, 0), grid_width - 3)
+        grid_y = np.minimum(np.maximum(y//CELL_HEIGHT, 0), grid_height - 3)
+        cell = self._base[index] + grid_x*grid_height + grid_y
+        self._cell[index] = cell
+        np.add.at(self.schools, cell, values)
+
+    def _leave(self, index, values):
+        """Take fish out of the sums in schools for the cells they were in.
+
+        Args:
+            index: Array with the indexes of the fish.
+            values: What the fish added to the sums, from _values.
+        """
+        np.subtract.at(self.schools, self._cell[index], values)
+
+    def _schools(self, moving, values):
+        """Find the fish of the same species around each of the moving fish.
+
+        Args:
+            moving: Array with the indexes of the fish that are moving.
+            values: What the moving fish add to the sums in schools, from
+                    _values.
+
+        Returns:
+            Array with a row for each moving fish, laid out like schools,
+            with the number of other fish of its species nearby and the sums
+            of their positions and directions.
+        """
+        around = self._cell[moving] + self._offsets[:, None]
+        # Leave the fish out of its own school
+        return self.schools.take(around, axis=0).sum(axis=0) - values
+
+    def _grow(self, grown: list):
+        """Catch up on fish whose art may have changed length.
+
+        Args:
+            grown: The fish whose art changed since they were last seen.
+        """
+        index = np.array([self.fish.index(fish) for fish in grown], dtype=int)
+        length = np.array([len(fish.get_art()) for fish in grown], dtype=int)
+        changed = (length != self._length[index]).nonzero()[0]
+        index = index[changed]
+        length = length[changed]
+        x = np.array([grown[i].x for i in changed.tolist()], dtype=int)
+        y = np.array([grown[i].y for i in changed.tolist()], dtype=int)
+        self._leave(index, self._values(index, x, y))
+        for fish_x, fish_y, old_length, new_length in zip(
+                x.tolist(), y.tolist(), self._length[index].tolist(),
+                length.tolist()):
+            self._occupy(fish_x, fish_y, old_length, -1)
+            self._occupy(fish_x, fish_y, new_length, 1)
+        self._length[index] = length
+        self._enter(index, self._values(index, x, y))
+
+    def move(self, tank_widget):
+        """Move the fish in a widget for one simulation step."""
+        size = (tank_widget.tank_width, tank_widget.tank_height)
+        if self.fish != tank_widget.fish or self._size != size:
+            self._rebuild(tank_widget)
+        grown = tank_widget.grid.grown
+        if grown:
+            self._grow(list(grown))
+            grown.clear()
+        rng = tank_widget.rng
+        chance = 0.8*tank_widget.scheduler.time_step
+        moving = (_uniform(rng, len(self.fish)) < chance).nonzero()[0]
+        if not len(moving):
+            return
+        moving_fish = [self.fish[index] for index in moving.tolist()]
+        x = np.array([fish.x for fish in moving_fish], dtype=int)
+        y = np.array([fish.y for fish in moving_fish], dtype=int)
+        length = self._length[moving]
+        tank_width, tank_height = size
+        values = self._values(moving, x, y)
+        # Sums rather than averages over the school, so they stay whole
+        # numbers. How far it is from each fish is count times the
+        # difference between its average and the fish.
+        nearby = self._schools(moving, values)
+        count, _, _, school_direction = nearby.T
+        _, school_x, school_y, _ = (nearby - count[:, None]*values).T
+        flip, align, cohesion, wander, up = _uniform(rng, 5*len(moving)) \
+            .reshape(5, len(moving))
+        direction = values[:, 3]
+        has_school = count > 0
+
+        # Turn back to a school left behind, or to swim with it
+        behind = school_x*direction < -TURN_DISTANCE*count
+        against = (2*school_direction*direction < -count) \
+            & (align < ALIGN_CHANCE)
+        turn = (flip < FLIP_CHANCE) | (has_school & (behind | against))
+        towards = has_school & (np.abs(school_y) >= count) \
+            & (cohesion < COHESION_CHANCE)
+        dy = np.where(towards, np.sign(school_y),
+                      np.where(wander < WANDER_CHANCE,
+                               np.where(up < 0.5, -1, 1), 0))
+
+        # How much is taken up where each move would put the fish and just
+        # ahead of it, all gathered at once. The last row is what is ahead.
+        stride = self._padded.shape[1]
+        cells = self._padded.reshape(-1)
+        picked = np.arange(len(moving))
+        new_x = x + self._move_dx*direction
+        to_y = y + self._move_dy
+        start = np.empty((len(MOVES) + 1, len(moving)), dtype=int)
+        start[:-1] = to_y*stride + new_x
+        start[-1] = y*stride + np.where(direction > 0, x + length,
+                                        np.maximum(x - LOOKAHEAD, 0))
+        span = np.empty_like(start)
+        span[:-1] = length
+        span[-1] = LOOKAHEAD
+        taken = (cells.take(start + self._width, mode='clip')
+                 * (self._width < span)).sum(axis=0)
+
+        # Swim up over whatever is coming up
+        dy[(dy == 0) & (taken[-1] > 0)] = -1
+
+        # Everything in the way, leaving out the fish itself. Fish already
+        # overlapping something can move anywhere that overlaps it less.
+        cost = taken[:-1] - self._same_row*length + self._slide
+        clear = (1 <= new_x) & (new_x <= tank_width - length) \
+            & (1 <= to_y) & (to_y <= tank_height) \
+            & ((cost == 0) | (cost < cost[-1]))
+        clear[-1] = False
+        options = self._options[:, dy + 1]
+        clear = clear[options, picked]
+        choice = options[clear.argmax(axis=0), picked]
+        # Bounce off anything in the way
+        turn |= ~clear.any(axis=0)
+        new_x = new_x[choice, picked]
+        new_y = to_y[choice, picked]
+
+        # The characters each fish moves into that it wasn't already in, and
+        # the ones it leaves. Along a row that is just the character at
+        # either end, otherwise all of them. If two fish move into the same
+        # character, the first one gets it.
+        swimming = (~turn).nonzero()[0]
+        from_x = x[swimming]
+        from_y = y[swimming]
+        to_x = new_x[swimming]
+        to_y = new_y[swimming]
+        span = length[swimming]
+        same = to_y == from_y
+        front = (span - 1)*(direction[swimming] > 0)*same
+        count = np.where(same, np.abs(to_x - from_x), span)
+        offset = self._width[:, 0, 0]
+        changed = offset < count[:, None]
+        entering = ((to_y*stride + to_x + front)[:, None] + offset)[changed]
+        order = entering.argsort(kind='stable')
+        ordered = entering[order]
+        owner = changed.nonzero()[0]
+        stopped = np.zeros(len(swimming), dtype=bool)
+        stopped[owner[order[1:][ordered[1:] == ordered[:-1]]]] = True
+        turn[swimming[stopped]] = True
+
+        # Move the fish out of the characters they left and into the ones
+        # they entered
+        moved = ~stopped[owner]
+        leaving = (from_y*stride + from_x + (span - 1)*same - front)[:, None] \
+            + offset
+        np.add.at(cells, entering[moved], 1)
+        np.subtract.at(cells, leaving[changed][moved], 1)
+
+        # Move the fish from where they were in schools to where they are now
+        self._leave(moving, values)
+        turning = turn.nonzero()[0]
+        for index in turning.tolist():
+            moving_fish[index].flip()
+        new_x[turning] = x[turning]
+        new_y[turning] = y[turning]
+        # direction is a view of values, so this turns them in values too
+        direction[turning] *= -1
+        self._direction[moving] = direction
+        values[:, 1] += new_x - x
+        values[:, 2] = new_y
+        self._enter(moving, values)
+        swimming = (~turn).nonzero()[0]
+        for index, to_x, to_y in zip(swimming.tolist(),
+                                     new_x[swimming].tolist(),
+                                     new_y[swimming].tolist()):
+            moving_fish[index].update_position(to_x, to_y)
+        tank_widget.dirty_rows.update(y.tolist(), new_y[swimming].tolist())
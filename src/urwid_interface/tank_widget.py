@@ -1,35 +1,19 @@
+import os
 import random
 import threading
-from typing import List
+import time
+from typing import Callable, List
 
 import urwid
 
 from src.fish.fish import Fish
+from src.urwid_interface.background import BACKGROUND, make_background
 from src.urwid_interface.fish_art import FishArt
+from src.urwid_interface.fish_grid import FishGrid
+from src.urwid_interface.frame_scheduler import FrameScheduler
+from src.urwid_interface.movement import RANDOM, make_movement
 from src.urwid_interface.text_buffer import TextBuffer
-
-
-BACKGROUND = [
-    [r'+==============================+'],
-    [r'|', ('water', '~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~'), '|'],
-    [r'|                              |'],
-    [r'|   ', ('light_green', r'~|~'), '                        |'],
-    [r'|   ', ('light_green', r'~|~'), '                    ',
-     ('green', '/'), '   |'],
-    [r'|   ', ('light_green', r'~|~'), '              ',
-     ('green', '_'), '    ', ('green', '/'), ' ', ('green', '_'), '  |'],
-    [r'|   ', ('light_green', r'~|~'), '               ', ('green', '\\'),
-     '  ', ('green', '|'), ' ', ('green', '/'), '   |'],
-    [r'|   ', ('light_green', r'~|~'), '                ', ('green', '\\'),
-     ' ', ('green', r'|//'), '   |'],
-    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
-     '       ', ('rock', '___'), ' ', ('green', '\ \| \\'), '   |'],
-    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
-     '    ', ('rock', '__/ __\\'), ' ', ('green', '|/|//'), '   |'],
-    [r'|   ', ('light_green', r'~|~'), ' ', ('light_green', r'~|~'),
-     '   ', ('rock', '/   /  \\\\'), ' ', ('green', r'\|/'), '    |'],
-    [r'+', ('sand', '##############################'), '+'],
-]
+from src.urwid_interface.viewport import Viewport
 
 
 class TankWidget(urwid.BoxAdapter):
@@ -40,116 +24,310 @@ class TankWidget(urwid.BoxAdapter):
         tank_width: Width of the interior of the tank in characters.
         tank_height: Height of the interior of the tank in characters.
         fish: FishArt for the fish in the tank.
-        fish_lock: Mutex for safe handling of fish
-        refresh_rate: How often to refresh the tank (in seconds)
+        grid: FishGrid indexing where the fish are.
+        dirty_rows: Set of rows that need to be redrawn.
+        fish_lock: Mutex for safe handling of fish and the text buffer, which
+                   are shared with the simulation thread.
+        scheduler: FrameScheduler deciding when to draw frames and how many
+                   simulation steps to move the fish for each.
+        frame: Dict with the rows of the next frame that are ready to be
+               shown, filled in by the simulation thread.
+        frame_lock: Mutex for swapping out the finished frame.
+        viewport: Viewport with the part of the tank that is shown. Only
+                  the rows and columns in it are drawn.
+        shown: Markup shown in each row of the viewport.
+        rng: Random number generator for moving and placing the fish.
+             Defaults to the random module.
+        recorder: Recorder that frames, fish and viewport changes are
+                  recorded to, if the session is being recorded.
+        movement: Movement engine that moves the fish, from
+                  movement.make_movement.
+        clock: Function giving the current time in seconds, used to time
+               the frames. Defaults to time.monotonic.
     """
     def __init__(self, height: int,
                  width: int,
                  fish: List[FishArt] = None,
                  refresh_rate: float = 0.2,
-                 background=BACKGROUND):
+                 background=None,
+                 time_step: float = None,
+                 rng: random.Random = None,
+                 movement=RANDOM,
+                 clock: Callable[[], float] = None):
         self.running = False
+        self.rng = rng if rng is not None else random
+        self.clock = clock if clock is not None else time.monotonic
+        self.recorder = None
+        if isinstance(movement, str):
+            movement = make_movement(movement)
+        self.movement = movement
         self.tank_width = width
         self.tank_height = height
-        self.refresh_rate = refresh_rate
+        if time_step is None:
+            time_step = refresh_rate
+        self.scheduler = FrameScheduler(time_step=time_step,
+                                        frame_interval=refresh_rate,
+                                        clock=self.clock)
+        if background is None:
+            background = make_background(width, height)
         self.text_buffer = TextBuffer(background)
+        self.viewport = Viewport(tank_width=self.text_buffer.window[1],
+                                 tank_height=len(self.text_buffer.rows))
         if fish:
             self.fish = fish
         else:
             self.fish = []
+        self.grid = FishGrid()
+        self.dirty_rows = set()
+        for fish_art in self.fish:
+            self.grid.add(fish_art)
+            self.dirty_rows.add(fish_art.y)
         self.fish_lock = threading.Lock()
-        tank_rows = self.text_buffer.to_urwid()
-        self.pile = urwid.Pile([urwid.Text(row) for row in tank_rows])
+        self.frame = {}
+        self.frame_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._simulation = None
+        self._loop = None
+        self._wake_pipe = None
+        self.shown = self.text_buffer.to_urwid()
+        self.pile = urwid.Pile([urwid.Text(row) for row in self.shown])
         super(TankWidget, self).__init__(urwid.Filler(self.pile),
-                                         height=(self.tank_height + 3))
+                                         height=(self.viewport.height + 1))
 
     def move_fish(self):
-        """Randomly move the fish."""
+        """Move the fish for one simulation step."""
         with self.fish_lock:
-            for fish in self.fish:
-                random_movement = random.random()
-                if random_movement < 0.2*self.refresh_rate:
-                    # Flip the fish
-                    fish.flip()
-                elif random_movement < 0.3*self.refresh_rate:
-                    # Move up
-                    if fish.y > 1:
-                        fish.update_position(fish.x, fish.y - 1)
-                    else:
-                        # Bounce off top of tank
-                        fish.update_position(fish.x, fish.y + 1)
-                elif random_movement < 0.4*self.refresh_rate:
-                    # Move down
-                    if fish.y < self.tank_height:
-                        fish.update_position(fish.x, fish.y + 1)
-                    else:
-                        # Bounce off bottom of tank
-                        fish.update_position(fish.x, fish.y - 1)
-                elif random_movement < 0.8*self.refresh_rate:
-                    # Move forward
-                    if fish.flipped:
-                        if fish.x < self.tank_width - len(fish.get_art()):
-                            # Move right
-                            fish.update_position(fish.x + 1, fish.y)
-                        else:
-                            # Bounce off side of tank
-                            fish.flip()
-                    else:
-                        if fish.x > 1:
-                            # Move left
-                            fish.update_position(fish.x - 1, fish.y)
-                        else:  # Bounce off side of tank
-                            fish.flip()
+            self._move_fish()
+
+    def _move_fish(self):
+        """Move the fish while already holding fish_lock."""
+        self.movement.move(self)
 
     def draw(self):
-        """Move the fish and redraw the tank."""
+        """Move the fish and redraw the rows of the tank they moved in."""
         self.move_fish()
-        self.text_buffer.clear()
-        for fish in self.fish:
-            self.text_buffer.add_text(x=fish.x,
-                                    y=fish.y,
-                                    text=fish.get_art(),
-                                    formatting=fish.palette_name)
-        tank_rows = self.text_buffer.to_urwid()
-        for pile_row, tank_row in zip(self.pile.contents, tank_rows):
-            pile_row[0].set_text(tank_row)
-            pile_row[0]._invalidate()
-
-    def add_fish(self, fish: Fish):
+        self.draw_fish()
+        self.update_rows()
+
+    def draw_fish(self):
+        """Redraw the fish in the text buffer for rows that need it."""
+        with self.fish_lock:
+            self._draw_fish()
+
+    def _draw_fish(self):
+        """Redraw the fish in the visible rows that need it.
+
+        Rows outside the viewport are left to be redrawn once they are
+        scrolled to, and fish outside the viewport's columns are skipped.
+        """
+        rows = self.dirty_rows.intersection(self.viewport.rows())
+        self.dirty_rows -= rows
+        left, right = self.viewport.columns()
+        for y in rows:
+            self.text_buffer.clear_row(y)
+            for fish in self.grid.in_row(y):
+                art = fish.get_art()
+                if fish.x < right and fish.x + len(art) > left:
+                    self.text_buffer.add_text(x=fish.x,
+                                              y=fish.y,
+                                              text=art,
+                                              formatting=fish.palette_name)
+
+    def update_rows(self):
+        """Update the text widgets with the rows that changed."""
+        with self.fish_lock:
+            changes = self.text_buffer.render_changes(self.viewport.rows())
+        self.show_rows(changes)
+
+    def show_rows(self, rows: dict):
+        """Show the markup for rows of the tank in the rows of the viewport.
+
+        Args:
+            rows: Dict from the row in the tank to its markup. Rows that
+                  aren't in the viewport are skipped.
+        """
+        top = self.viewport.top
+        for y, tank_row in rows.items():
+            row = y - top
+            if 0 <= row < len(self.shown) and tank_row != self.shown[row]:
+                self.shown[row] = tank_row
+                self.pile.contents[row][0].set_text(tank_row)
+
+    def resize(self, width: int, height: int):
+        """Fit the tank to the space on the screen, scrolling if needed.
+
+        Args:
+            width: Columns available for the tank.
+            height: Rows available for the tank.
+        """
+        if self.viewport.resize(width, height):
+            self._update_view()
+
+    def pan(self, dx: int, dy: int):
+        """Scroll the tank when it doesn't fit on the screen.
+
+        Args:
+            dx: Columns to scroll right, or left if negative.
+            dy: Rows to scroll down, or up if negative.
+        """
+        if self.viewport.pan(dx, dy):
+            self._update_view()
+
+    def set_view(self, left: int, top: int, width: int, height: int):
+        """Show a specific part of the tank, like when replaying a session."""
+        if self.viewport.move(left, top, width, height):
+            self._update_view()
+
+    def _update_view(self):
+        """Show the part of the tank in the viewport after it changes.
+
+        Rows that were already rendered are reused when only the rows
+        shown changed, and only the rows whose markup is different from
+        what was on the screen are updated.
+        """
+        with self.fish_lock:
+            if self.recorder is not None:
+                viewport = self.viewport
+                self.recorder.record('view', viewport.left, viewport.top,
+                                     viewport.width, viewport.height)
+            if self.text_buffer.set_window(*self.viewport.columns()):
+                # The fish have to be drawn for the new columns
+                self.dirty_rows.update(self.viewport.rows())
+            self._draw_fish()
+            self.text_buffer.render_changes(self.viewport.rows())
+            rows = [self.text_buffer.rows[y] for y in self.viewport.rows()]
+            # Drop any frame the simulation rendered for the old viewport
+            with self.frame_lock:
+                self.frame = {}
+        if len(rows) != len(self.shown):
+            self.shown = rows
+            options = self.pile.options()
+            self.pile.contents[:] = [(urwid.Text(row), options) for row in rows]
+            self.height = len(rows) + 1
+            self._invalidate()
+        else:
+            self.show_rows(dict(zip(self.viewport.rows(), rows)))
+
+    def add_fish(self, fish: Fish, x: int = None, y: int = None,
+                 flipped: bool = None):
         """Adds a fish to the tank as long as there is still room in the tank.
 
         Args:
             fish: The fish to be added.
+            x: Where to put the fish. Random if not given.
+            y: Where to put the fish. Random if not given.
+            flipped: Which way the fish faces. Random if not given.
+
+        Returns:
+            The art for the fish.
         """
-        x = random.randint(1, self.tank_width - len(fish.get_art()))
-        y = random.randint(1, self.tank_height)
         with self.fish_lock:
-            self.fish += [FishArt(fish, x, y)]
+            if x is None:
+                x = self.rng.randint(1, self.tank_width - len(fish.get_art()))
+            if y is None:
+                y = self.rng.randint(1, self.tank_height)
+            fish_art = FishArt(fish, x, y, flipped=flipped, rng=self.rng)
+            self.fish += [fish_art]
+            self.grid.add(fish_art)
+            self.dirty_rows.add(y)
+            if self.recorder is not None:
+                self.recorder.record('add_fish', fish.to_json(), x, y,
+                                     fish_art.flipped)
+        return fish_art
 
     def remove_fish(self, fish_name: str):
         """Remove the art for the fish with given name"""
-        for fish in self.fish:
-            if fish.fish.name == fish_name:
-                with self.fish_lock:
-                    self.fish.remove(fish)
-                return
+        fish = self.grid.get(fish_name)
+        if fish is not None:
+            with self.fish_lock:
+                self.fish.remove(fish)
+                self.grid.remove(fish)
+                self.dirty_rows.add(fish.y)
+                if self.recorder is not None:
+                    self.recorder.record('remove_fish', fish_name)
+
+    def build_frame(self, steps: int = 1) -> bool:
+        """Move the fish and add the rows that changed to the next frame.
+
+        Args:
+            steps: Number of simulation steps to move the fish.
+
+        Returns:
+            Whether any rows changed.
+        """
+        with self.fish_lock:
+            # Recorded while holding fish_lock so it is in the same order as
+            # any fish being added or removed
+            if self.recorder is not None:
+                self.recorder.tick(steps)
+            for _ in range(steps):
+                self._move_fish()
+            self._draw_fish()
+            changes = self.text_buffer.render_changes(self.viewport.rows())
+            if not changes:
+                return False
+            # Still holding fish_lock so the viewport can't change until the
+            # frame is handed off
+            with self.frame_lock:
+                self.frame.update(changes)
+        return True
+
+    def show_frame(self, *args) -> bool:
+        """Swap in the rows of the frame built by the simulation thread.
+
+        Called by the urwid main loop when the simulation thread signals
+        that a frame is ready.
+        """
+        del args  # Unused
+        with self.frame_lock:
+            frame, self.frame = self.frame, {}
+        self.show_rows(frame)
+        return True
+
+    def _simulate(self):
+        """Build frames until the animation is stopped."""
+        last_frame = self.clock()
+        while self.running:
+            started = self.clock()
+            steps = self.scheduler.steps(started - last_frame)
+            last_frame = started
+            if self.build_frame(steps):
+                os.write(self._wake_pipe, b'.')
+            finished = self.clock()
+            delay = self.scheduler.frame_done(finished - started, finished)
+            self._stopped.wait(delay)
+
+    def redraw_fish(self, fish_name: str):
+        """Redraw the fish with the given name, like when its art changes."""
+        with self.fish_lock:
+            for fish in self.grid.names.get(fish_name, ()):
+                self.dirty_rows.add(fish.y)
 
     def start_animation(self, loop: urwid.MainLoop):
         """Start the fish swimming.
 
+        The fish are moved and drawn on a separate thread, and the main loop
+        only has to show each frame once it is ready.
+
         Args:
-            loop: The main loop for urwid to call for schedule redraws.
+            loop: The main loop for urwid to show new frames in.
         """
         if not self.running:
             self.running = True
-
-            def redraw(*args):
-                del args  # Unused
-                if self.running:
-                    self.draw()
-                    loop.set_alarm_in(self.refresh_rate, redraw)
-            redraw()
+            self._stopped.clear()
+            self._loop = loop
+            self._wake_pipe = loop.watch_pipe(self.show_frame)
+            self._simulation = threading.Thread(target=self._simulate,
+                                                daemon=True)
+            self._simulation.start()
 
     def stop_animation(self):
         """Stop animating the fish."""
-        self.running = False
+        if self.running:
+            self.running = False
+            self._stopped.set()
+            self._simulation.join()
+            self._loop.remove_watch_pipe(self._wake_pipe)
+            self._simulation = None
+            self._loop = None
+            self._wake_pipe = None
@@ -1,60 +1,143 @@
-from typing import List, Tuple, Union
+import itertools
+import sys
+from array import array
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+# Array type code for unicode characters, which was renamed in Python 3.13
+CHAR_TYPE = 'w' if sys.version_info >= (3, 13) else 'u'
+# Array type code for palette ids
+PALETTE_TYPE = 'H'
 
 
 class TextBuffer:
     """Text based buffer for drawing the the tank.
 
+    Each row is stored as an array of characters and an array of palette
+    ids, with the palette names interned so a row can be compared and run
+    length encoded as small integers. Foreground text is written straight
+    into the rows, and clearing a row copies the background back over it
+    in place.
+
+    Only rows that have changed since they were last rendered get turned
+    back into urwid markup, and only the columns in the window are. The
+    markup for the background is built once for each window and reused for
+    any row without foreground text.
+
     Attributes:
-        text: 2d array of characters for the background.
-        formatting: 2d array of palette names for the background characters.
-        foreground_text: 2d array of characters for the foreground.
-        foreground_formatting: 2d array of palette names for the foreground.
+        palette: List of palette names, indexed by palette id. Id 0 is no
+                 formatting.
+        palette_ids: Dict from palette name to palette id.
+        background: Array of characters for each row of the background.
+        formatting: Array of palette ids for each row of the background.
+        text: Array of characters for each row with the foreground drawn in.
+        text_formatting: Array of palette ids for each row with the
+                         foreground drawn in.
+        foreground_rows: Set of rows that have foreground text in them.
+        dirty_rows: Set of rows that changed since they were last rendered.
+        window: The first column to render and the column after the last.
+        background_rows: Urwid markup for each row of the background in the
+                         window, or None if it hasn't been rendered yet.
+        rows: Urwid markup for each row as of the last render.
     """
 
     def __init__(self, background):
+        self.palette = [None]
+        self.palette_ids = {None: 0}
         self.background = []
         self.formatting = []
-        self.foreground_text = []
-        self.foreground_formatting = []
         for row in background:
             text, formatting = self.read_row(row)
-            self.background += [text]
-            self.formatting += [formatting]
-            self.foreground_text += [[None] * len(text)]
-            self.foreground_formatting += [[None] * len(text)]
+            self.background += [array(CHAR_TYPE, text)]
+            self.formatting += [array(PALETTE_TYPE, map(self.palette_id, formatting))]
+        self.text = [array(CHAR_TYPE, row) for row in self.background]
+        self.text_formatting = [array(PALETTE_TYPE, row) for row in self.formatting]
+        self.foreground_rows = set()
+        self.dirty_rows = set()
+        self.window = (0, max(map(len, self.background), default=0))
+        self.background_rows = [None]*len(self.background)
+        self.rows = [self.background_row(y) for y in range(len(self.background))]
+
+    def set_window(self, start: int, end: int) -> bool:
+        """Only render the columns from start up to end.
+
+        Every row has to be rendered again after the window changes.
+
+        Returns:
+            Whether the window changed.
+        """
+        if (start, end) == self.window:
+            return False
+        self.window = (start, end)
+        self.background_rows = [None]*len(self.background)
+        self.dirty_rows = set(range(len(self.background)))
+        return True
+
+    def background_row(self, y: int) -> Union[str, List[Union[str, Tuple[str, str]]]]:
+        """Get the markup for a row of the background in the window."""
+        row = self.background_rows[y]
+        if row is None:
+            start, end = self.window
+            row = self.background_rows[y] = self._encode(self.background[y][start:end],
+                                                         self.formatting[y][start:end])
+        return row
+
+    def palette_id(self, name: str) -> int:
+        """Get the id for a palette name, giving it one if it is new."""
+        palette_id = self.palette_ids.get(name)
+        if palette_id is None:
+            palette_id = self.palette_ids[name] = len(self.palette)
+            self.palette += [name]
+        return palette_id
 
     def add_text(self, x: int, y: int, text: str, formatting: str = None):
         """Add text to the foreground.
 
+        Any of the text that doesn't fit in the row is cut off.
+
         Args:
             x: X position for the text to start as.
             y: Y position for the text.
             text: Text to add to the foreground.
             formatting: Urwid palette name for the text.
         """
-        for i, char in enumerate(text):
-            self.foreground_text[y][x+i] = char
-            self.foreground_formatting[y][x+i] = formatting
+        if x < 0:
+            text = text[-x:]
+            x = 0
+        text = text[:len(self.text[y]) - x]
+        if not text:
+            return
+        end = x + len(text)
+        self.text[y][x:end] = array(CHAR_TYPE, text)
+        self.text_formatting[y][x:end] = array(PALETTE_TYPE,
+                                               [self.palette_id(formatting)])*len(text)
+        self.foreground_rows.add(y)
+        self.dirty_rows.add(y)
 
     def clear(self):
         """Clear the foreground."""
-        self.foreground_text = []
-        self.foreground_formatting = []
-        for row in self.background:
-            self.foreground_text += [[None] * len(row)]
-            self.foreground_formatting += [[None] * len(row)]
+        for y in self.foreground_rows:
+            self.text[y][:] = self.background[y]
+            self.text_formatting[y][:] = self.formatting[y]
+        self.dirty_rows |= self.foreground_rows
+        self.foreground_rows = set()
 
-    def get(self, x: int, y) -> str:
-        """Get the character at (x, y).
+    def clear_row(self, y: int):
+        """Clear the foreground of a single row."""
+        if y in self.foreground_rows:
+            self.text[y][:] = self.background[y]
+            self.text_formatting[y][:] = self.formatting[y]
+            self.foreground_rows.discard(y)
+            self.dirty_rows.add(y)
+
+    def get(self, x: int, y) -> Tuple[str, str]:
+        """Get the character at (x, y) and its palette name.
 
         Args:
             x: x position of the character.
             y: y position of the character.
         """
-        if self.foreground_text[y][x] is not None:
-            return self.foreground_text[y][x], \
-                   self.foreground_formatting[y][x]
-        return self.background[y][x], self.formatting[y][x]
+        return self.text[y][x], self.palette[self.text_formatting[y][x]]
 
     def read_row(self, row) -> Tuple[List[str], List[str]]:
         """Read in a row of text.
@@ -78,6 +161,72 @@ class TextBuffer:
                     formatting += [part[0]] * len(part[1])
         return text, formatting
 
+    def encode_row(self, y: int) -> Union[str, List[Union[str, Tuple[str, str]]]]:
+        """Create formatted text for a single row.
+
+        Only the columns in the window are included. Runs of characters with
+        the same palette id are joined together.
+
+        Args:
+            y: The row to create the formatted text for.
+
+        Returns:
+            String or list of strings and formatted strings for the row.
+        """
+        start, end = self.window
+        return self._encode(self.text[y][start:end],
+                            self.text_formatting[y][start:end])
+
+    def _encode(self, text: array, formatting: array) \
+            -> Union[str, List[Union[str, Tuple[str, str]]]]:
+        """Create formatted text from characters and their palette ids."""
+        row = []
+        start = 0
+        for palette_id, run in itertools.groupby(formatting):
+            end = start + sum(1 for _ in run)
+            row += [self._markup(self.palette[palette_id], text[start:end])]
+            start = end
+        if not row:
+            return ''
+        if len(row) == 1:
+            row = row[0]
+        return row
+
+    @staticmethod
+    def _markup(formatting: str, text: array) -> Union[str, Tuple[str, str]]:
+        """Turn characters into a string with its palette name if it has one."""
+        if formatting is not None:
+            return (formatting, text.tounicode())
+        return text.tounicode()
+
+    def render_changes(self, visible: Iterable[int] = None) \
+            -> Dict[int, Union[str, List[Union[str, Tuple[str, str]]]]]:
+        """Render the rows that changed since the last render.
+
+        Args:
+            visible: If given, only render these rows. Any other rows that
+                     changed are left to be rendered once they are visible.
+
+        Returns:
+            Dict mapping the index of each row whose formatted text is
+            different from the last render to its new formatted text.
+        """
+        if visible is None:
+            dirty_rows, self.dirty_rows = self.dirty_rows, set()
+        else:
+            dirty_rows = self.dirty_rows.intersection(visible)
+            self.dirty_rows -= dirty_rows
+        changes = {}
+        for y in dirty_rows:
+            if y in self.foreground_rows:
+                row = self.encode_row(y)
+            else:
+                row = self.background_row(y)
+            if row != self.rows[y]:
+                self.rows[y] = row
+                changes[y] = row
+        return changes
+
     def to_urwid(self) -> List[Union[str, Tuple[str, str]]]:
         """Create list of formatted text for an urwid Text widget.
 
@@ -85,33 +234,8 @@ class TextBuffer:
             List of strings or formatted strings suitable for setting as
             formatted text for an urwid Text widget.
         """
-        all_rows = []
-        for y in range(len(self.background)):
-            row_text = []
-            row_formatting = []
-            current_text = ''
-            current_formatting = None
-            for x in range(len(self.background[y])):
-                char, form = self.get(x, y)
-                if form != current_formatting:
-                    if current_text:
-                        row_formatting += [current_formatting]
-                        row_text += [current_text]
-                        current_text = ''
-                current_formatting = form
-                current_text += char
-            row_text += [current_text]
-            row_formatting += [current_formatting]
-            row = []
-            for text_part, f_part in zip(row_text, row_formatting):
-                if f_part is not None:
-                    row += [(f_part, text_part)]
-                else:
-                    row += [text_part]
-            if len(row) == 1:
-                row = row[0]
-            all_rows += [row]
-        return all_rows
+        self.render_changes()
+        return list(self.rows)
 
 
 def main():
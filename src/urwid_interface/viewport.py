@@ -0,0 +1,72 @@
+from typing import Tuple
+
+
+class Viewport:
+    """The part of the tank that fits on the screen.
+
+    Positions are in the tank's text buffer, which includes the border
+    around the tank. The viewport always stays inside the tank, and shows
+    all of it along any side that fits on the screen.
+
+    Attributes:
+        tank_width: Width of the whole tank, including the border.
+        tank_height: Height of the whole tank, including the border.
+        left: Leftmost column shown.
+        top: Top row shown.
+        width: Number of columns shown.
+        height: Number of rows shown.
+    """
+    def __init__(self, tank_width: int, tank_height: int):
+        self.tank_width = tank_width
+        self.tank_height = tank_height
+        self.left = 0
+        self.top = 0
+        self.width = tank_width
+        self.height = tank_height
+
+    def columns(self) -> Tuple[int, int]:
+        """Get the first column shown and the column after the last."""
+        return self.left, self.left + self.width
+
+    def rows(self) -> range:
+        """Get the rows shown."""
+        return range(self.top, self.top + self.height)
+
+    def resize(self, width: int, height: int) -> bool:
+        """Change how much of the tank fits on the screen.
+
+        Args:
+            width: Columns available on the screen.
+            height: Rows available on the screen.
+
+        Returns:
+            Whether the viewport changed.
+        """
+        return self.move(self.left, self.top,
+                         min(max(width, 1), self.tank_width),
+                         min(max(height, 1), self.tank_height))
+
+    def pan(self, dx: int, dy: int) -> bool:
+        """Scroll the viewport, stopping at the edges of the tank.
+
+        Args:
+            dx: Columns to scroll right, or left if negative.
+            dy: Rows to scroll down, or up if negative.
+
+        Returns:
+            Whether the viewport moved.
+        """
+        return self.move(self.left + dx, self.top + dy, self.width, self.height)
+
+    def move(self, left: int, top: int, width: int, height: int) -> bool:
+        """Move the viewport, keeping it inside the tank.
+
+        Returns:
+            Whether the viewport changed.
+        """
+        left = max(0, min(left, self.tank_width - width))
+        top = max(0, min(top, self.tank_height - height))
+        changed = (left, top, width, height) != \
+            (self.left, self.top, self.width, self.height)
+        self.left, self.top, self.width, self.height = left, top, width, height
+        return changed
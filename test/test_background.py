@@ -0,0 +1,50 @@
+from src.urwid_interface.background import BACKGROUND, make_background
+from src.urwid_interface.tank_widget import TankWidget
+from src.urwid_interface.text_buffer import TextBuffer
+from src.fish.fish_builder import FishBuilder
+from src.tank import DEFAULT_HEIGHT, DEFAULT_WIDTH
+
+
+def row_text(row):
+    if isinstance(row, str):
+        return row
+    return ''.join(part if isinstance(part, str) else part[1] for part in row)
+
+
+def test_default_background():
+    assert list(make_background(DEFAULT_WIDTH, DEFAULT_HEIGHT)) == BACKGROUND
+
+
+def test_make_background():
+    for width, height in [(1, 1), (5, 3), (80, 20), (300, 60)]:
+        rows = TextBuffer(make_background(width, height)).to_urwid()
+        assert len(rows) == height + 2
+        for row in rows:
+            assert len(row_text(row)) == width + 2
+        assert row_text(rows[0]) == '+' + '='*width + '+'
+        assert row_text(rows[1]) == '|' + '~'*width + '|'
+        assert row_text(rows[-1]) == '+' + '#'*width + '+'
+
+
+def test_background_cached():
+    assert make_background(80, 20) is make_background(80, 20)
+    make_background.cache_clear()
+    first = make_background(80, 20)
+    make_background.cache_clear()
+    # The same size always looks the same
+    assert make_background(80, 20) == first
+
+
+def test_large_tank():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    tank_widget = TankWidget(height=60, width=300)
+    for i in range(500):
+        tank_widget.add_fish(builder.make_fish(f'Fish {i}',
+                                               species_name='DEV_FISH',
+                                               personality_name='DEV_PERSONALITY'))
+    for _ in range(10):
+        tank_widget.draw()
+    for fish in tank_widget.fish:
+        assert 0 < fish.x <= 300 - len(fish.get_art())
+        assert 0 < fish.y <= 60
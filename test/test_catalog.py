@@ -0,0 +1,48 @@
+from pytest import raises
+import json
+import os
+import shutil
+
+from src.fish import catalog
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+
+
+def test_shared():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    other_builder = FishBuilder(species_file='test/species.json',
+                                personality_file='test/personalities.json')
+    assert builder.species is other_builder.species
+    assert builder.species['DEV_FISH'] is other_builder.species['DEV_FISH']
+    assert builder.personalities is other_builder.personalities
+    assert Tank().fish_builder.species is Tank().fish_builder.species
+
+
+def test_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CHECK_INTERVAL', 0)
+    species_file = str(tmp_path / 'species.json')
+    shutil.copy('test/species.json', species_file)
+    builder = FishBuilder(species_file=species_file,
+                          personality_file='test/personalities.json')
+    species = builder.species
+    assert builder.species is species
+    with open(species_file) as json_file:
+        json_species = json.load(json_file)
+    json_species['NEW_FISH'] = json_species['DEV_FISH']
+    with open(species_file, 'w') as json_file:
+        json.dump(json_species, json_file)
+    stat = os.stat(species_file)
+    os.utime(species_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert 'NEW_FISH' in builder.species
+
+
+def test_unknown_names():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    with raises(IndexError):
+        builder.make_fish('Fishy', species_name='NOT_A_FISH',
+                          personality_name='DEV_PERSONALITY')
+    with raises(IndexError):
+        builder.from_json({'name': 'Fishy', 'species': 'DEV_FISH',
+                           'personality': 'NOT_A_PERSONALITY'})
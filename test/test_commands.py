@@ -0,0 +1,61 @@
+from pytest import fixture, raises
+import os
+import subprocess
+import sys
+
+import fish as aquarium
+from src.tank import Tank
+
+
+@fixture
+def filename(tmp_path):
+    # The commands read the save file with the default species and personalities
+    tank = Tank()
+    tank.add_fish(tank.fish_builder.make_fish('Bubbles',
+                                              species_name='Betta',
+                                              personality_name='Shy'))
+    filename = str(tmp_path/'afish')
+    tank.save(filename)
+    return filename
+
+
+def test_status(filename, capsys):
+    aquarium.main(['status', '--file', filename])
+    assert capsys.readouterr().out.startswith('Bubbles (Betta): ')
+
+
+def test_feed(filename, capsys):
+    aquarium.main(['feed', '--file', filename])
+    assert capsys.readouterr().out == 'The fish have been feed\n'
+    tank = Tank()
+    tank.load(filename)
+    assert tank.fish[0].get_hunger() < 0.1
+
+
+def test_movement(filename):
+    aquarium.main(['status', '--file', filename, '--movement', 'schooling'])
+    tank = Tank()
+    tank.load(filename)
+    assert tank.movement == 'schooling'
+    # Kept when it isn't given again
+    aquarium.main(['status', '--file', filename])
+    tank.load(filename)
+    assert tank.movement == 'schooling'
+
+
+def test_failure_closes_journal(filename, monkeypatch):
+    def crash(tank):
+        raise RuntimeError('Crashed')
+    monkeypatch.setitem(aquarium.COMMANDS, 'status', crash)
+    with raises(RuntimeError):
+        aquarium.main(['status', '--file', filename])
+    assert not os.path.isfile(f'{filename}.journal')
+
+
+def test_commands_skip_urwid(filename):
+    script = ('import sys, fish\n'
+              f'fish.main(["status", "--file", {filename!r}])\n'
+              'assert "urwid" not in sys.modules\n'
+              'assert "numpy" not in sys.modules\n')
+    subprocess.run([sys.executable, '-c', script], check=True,
+                   stdout=subprocess.DEVNULL)
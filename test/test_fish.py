@@ -1,8 +1,9 @@
 from pytest import fixture
+import math
 import time
 
 from src.fish.fish import Fish
-from src.fish.species import get_species
+from src.fish.species import Species, get_species
 from src.fish.personality import get_personalities
 
 
@@ -61,5 +62,62 @@ def test_time_fed(fish):
     fish.checkin(205)
     assert fish.time_fed == 25
 
+
+def test_clock(fish):
+    fish.clock = lambda: 8
+    assert fish.get_hunger() == 0.8
+    fish.feed()
+    assert fish.last_fed == 8
+    fish.get_status()
+    assert fish.last_checkin == 8
+    assert Fish(name='', species=fish.species, personality=fish.personality,
+                clock=lambda: 8).birth == 8
+
+
 def test_color(fish):
     assert fish.color in ["#f00", "#0f0", "#00f"]
+
+
+def test_catch_up(fish):
+    for hunger_time in [10, DAY/3, DAY*1.5, DAY*7.3]:
+        for last_fed in [0, DAY/2, DAY*4.2]:
+            species = Species(fish.species.name, hunger_time,
+                              fish.species.art, fish.species.art_ages,
+                              fish.species.colors)
+            expected = Fish(name='', species=species,
+                            personality=fish.personality, last_fed=last_fed,
+                            stress=0.3, last_checkin=0, time_fed=0)
+            actual = Fish(name='', species=species,
+                          personality=fish.personality, last_fed=last_fed,
+                          stress=0.3, last_checkin=0, time_fed=0)
+            timestamp = DAY*20.5
+            for day in range(20, -1, -1):
+                expected.checkin(timestamp - day*DAY)
+            actual.catch_up(timestamp, 20)
+            assert abs(actual.stress - expected.stress) < 1e-9
+            assert abs(actual.time_fed - expected.time_fed) < 1e-3
+            assert actual.last_checkin == expected.last_checkin
+
+
+def test_compact(fish):
+    assert not hasattr(fish, '__dict__')
+    other = Fish(name='Other',
+                 species=fish.species,
+                 personality=fish.personality,
+                 color=''.join(['#', '0f0']))
+    assert other.color is Fish(name='', species=fish.species,
+                               personality=fish.personality,
+                               color='#0f0').color
+
+
+def test_next_growth_at(fish):
+    assert fish.get_stage() == 0
+    assert fish.next_growth_at() == 10
+    fish.time_fed = 5
+    fish.last_checkin = 5
+    assert fish.next_growth_at() == 10
+    fish.last_fed = -1
+    assert fish.next_growth_at() == math.inf
+    fish.time_fed = 100
+    assert fish.get_stage() == 2
+    assert fish.next_growth_at() == math.inf
@@ -0,0 +1,47 @@
+from pytest import fixture
+
+from src.fish.fish import Fish
+from src.fish.fish_builder import FishBuilder
+from src.urwid_interface.fish_art import FishArt, _reverse
+
+
+@fixture
+def fish_art():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    fish = builder.make_fish('Fishy',
+                             species_name='DEV_FISH',
+                             personality_name='DEV_PERSONALITY')
+    fish_art = FishArt(fish, x=1, y=1)
+    fish_art.flipped = False
+    return fish_art
+
+
+def test_reverse():
+    assert _reverse('<*{<') == '>}*>'
+    assert _reverse('(*#){') == '}(#*)'
+    assert _reverse(r'o/[o\]') == r'[/o]\o'
+
+
+def test_get_art(fish_art):
+    assert fish_art.get_art() == 'baby'
+    fish_art.flip()
+    assert fish_art.get_art() == 'ybab'
+    fish_art.fish.time_fed = 15
+    assert fish_art.get_art() == 'elinevuj'
+    fish_art.fish.time_fed = 100
+    assert fish_art.get_art() == 'tluda'
+    fish_art.fish.time_fed = -5
+    fish_art.flip()
+    assert fish_art.get_art() == 'baby'
+
+
+def test_shared_palette(fish_art):
+    assert not hasattr(fish_art, '__dict__')
+    fish = fish_art.fish
+    other = FishArt(Fish(name='Other',
+                         species=fish.species,
+                         personality=fish.personality,
+                         color=fish.color),
+                    x=1, y=1)
+    assert other.palette_name is fish_art.palette_name
@@ -0,0 +1,74 @@
+from pytest import fixture
+
+from src.fish.fish_builder import FishBuilder
+from src.urwid_interface.fish_art import FishArt
+from src.urwid_interface.fish_grid import FishGrid
+
+
+@fixture
+def builder():
+    return FishBuilder(species_file='test/species.json',
+                       personality_file='test/personalities.json')
+
+
+def make_fish_art(builder, name, x, y):
+    fish = builder.make_fish(name,
+                             species_name='DEV_FISH',
+                             personality_name='DEV_PERSONALITY')
+    return FishArt(fish, x=x, y=y)
+
+
+@fixture
+def grid(builder):
+    grid = FishGrid(cell_width=4, cell_height=2)
+    for i, (x, y) in enumerate([(1, 1), (3, 1), (10, 5), (20, 9)]):
+        grid.add(make_fish_art(builder, f'fish{i}', x, y))
+    return grid
+
+
+def test_get(grid):
+    assert grid.get('fish2').x == 10
+    assert grid.get('missing') is None
+
+
+def test_in_row(grid):
+    assert [fish.fish.name for fish in grid.in_row(1)] == ['fish0', 'fish1']
+    assert grid.in_row(2) == []
+
+
+def test_neighbors(grid):
+    names = sorted(fish.fish.name for fish in grid.neighbors(2, 1, 1))
+    assert names == ['fish0', 'fish1']
+    assert grid.neighbors(15, 7, 2) == []
+    names = sorted(fish.fish.name for fish in grid.neighbors(14, 7, 4))
+    assert names == ['fish2']
+
+
+def test_move(grid):
+    fish = grid.get('fish0')
+    fish.update_position(19, 8)
+    assert [f.fish.name for f in grid.in_row(1)] == ['fish1']
+    assert grid.in_row(8) == [fish]
+    names = sorted(f.fish.name for f in grid.neighbors(20, 9, 1))
+    assert names == ['fish0', 'fish3']
+
+
+def test_remove(grid):
+    fish = grid.get('fish1')
+    grid.remove(fish)
+    assert len(grid) == 3
+    assert grid.get('fish1') is None
+    assert grid.in_row(1) == [grid.get('fish0')]
+    fish.update_position(0, 0)
+    assert grid.in_row(0) == []
+
+
+def test_grown(grid):
+    fish = grid.get('fish2')
+    fish.get_art()
+    assert grid.grown == set()
+    fish.fish.time_fed = 50
+    fish.get_art()
+    assert grid.grown == {fish}
+    grid.remove(fish)
+    assert grid.grown == set()
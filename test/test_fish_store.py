@@ -0,0 +1,109 @@
+from pytest import fixture, importorskip
+import copy
+
+from src.fish.fish import Fish
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+
+importorskip('numpy')
+
+DAY = 60*60*24
+
+
+@fixture
+def builder():
+    return FishBuilder(species_file='test/species.json',
+                       personality_file='test/personalities.json')
+
+
+def make_fish(builder, name, last_fed, stress):
+    fish = builder.make_fish(name,
+                             species_name='DEV_FISH',
+                             personality_name='DEV_PERSONALITY')
+    fish.last_fed = last_fed
+    fish.last_checkin = 0
+    fish.stress = stress
+    fish.time_fed = 0
+    return fish
+
+
+@fixture
+def tanks(builder):
+    tank = Tank(last_checkin=0)
+    vectorized_tank = Tank(last_checkin=0, vectorized=True)
+    for i in range(5):
+        fish = make_fish(builder, str(i), last_fed=i*DAY/4, stress=i/5)
+        tank.add_fish(fish)
+        vectorized_tank.add_fish(copy.copy(fish))
+    return tank, vectorized_tank
+
+
+def assert_same_fish(tank, vectorized_tank):
+    assert len(tank.fish) == len(vectorized_tank.fish)
+    for fish, stored_fish in zip(tank.fish, vectorized_tank.fish):
+        assert fish.name == stored_fish.name
+        assert abs(fish.stress - stored_fish.stress) < 1e-9
+        assert abs(fish.time_fed - stored_fish.time_fed) < 1e-3
+        assert fish.last_fed == stored_fish.last_fed
+        assert fish.last_checkin == stored_fish.last_checkin
+
+
+def test_checkin(tanks):
+    tank, vectorized_tank = tanks
+    for timestamp in [DAY/2, DAY*3.7, DAY*40]:
+        tank.checkin(timestamp)
+        vectorized_tank.checkin(timestamp)
+        assert_same_fish(tank, vectorized_tank)
+    assert abs(tank.waste - vectorized_tank.waste) < 1e-9
+
+
+def test_checkin_fish(tanks):
+    tank, vectorized_tank = tanks
+    for each_tank in tanks:
+        each_tank.checkin_fish(each_tank.fish[2], DAY*1.5)
+    assert_same_fish(tank, vectorized_tank)
+    tank.checkin(DAY*3.7)
+    vectorized_tank.checkin(DAY*3.7)
+    assert_same_fish(tank, vectorized_tank)
+
+
+def test_feed(tanks):
+    tank, vectorized_tank = tanks
+    vectorized_tank.feed()
+    for fish in vectorized_tank.fish:
+        assert fish.get_hunger() < 0.2
+
+
+def test_remove_fish(tanks):
+    tank, vectorized_tank = tanks
+    assert tank.remove_fish('2') == vectorized_tank.remove_fish('2')
+    assert_same_fish(tank, vectorized_tank)
+    assert [fish.index for fish in vectorized_tank.fish] == [0, 1, 2, 3]
+
+
+def test_get_status(tanks):
+    _, vectorized_tank = tanks
+    status = vectorized_tank.get_status()
+    assert len(status) == 5
+    assert status[0].startswith('0 (DEV_FISH): ')
+
+
+def test_stored_fish(builder):
+    tank = Tank(last_checkin=0, vectorized=True)
+    tank.add_fish(make_fish(builder, 'Fishy', last_fed=0, stress=0))
+    fish = tank.fish[0]
+    assert isinstance(fish, Fish)
+    fish.checkin(100)
+    assert fish.time_fed == 10
+    assert tank.store.time_fed[0] == 10
+    assert fish.to_json()['time_fed'] == 10
+
+
+def test_grow(builder):
+    tank = Tank(last_checkin=0, max_fish=100, vectorized=True)
+    for i in range(100):
+        tank.add_fish(make_fish(builder, str(i), last_fed=0, stress=0))
+    assert len(tank.store) == 100
+    assert [fish.index for fish in tank.fish] == list(range(100))
+    tank.checkin(DAY*3)
+    assert all(fish.stress > 0 for fish in tank.fish)
@@ -0,0 +1,55 @@
+from pytest import fixture
+
+from src.urwid_interface.frame_scheduler import FrameScheduler
+
+
+@fixture
+def scheduler():
+    scheduler = FrameScheduler(time_step=0.2, frame_interval=0.1,
+                               idle_interval=1, idle_after=60, max_steps=10)
+    scheduler.activity(0)
+    return scheduler
+
+
+def test_steps(scheduler):
+    assert scheduler.steps(0.1) == 0
+    assert scheduler.steps(0.1) == 1
+    assert scheduler.steps(0.5) == 2
+    assert abs(scheduler.backlog - 0.1) < 1e-9
+    # Too far behind to catch up
+    assert scheduler.steps(100) == 10
+    assert scheduler.backlog == 0
+
+
+def test_same_speed(scheduler):
+    # The fish move the same amount at any frame rate
+    fast = sum(scheduler.steps(0.05) for _ in range(200))
+    slow = sum(scheduler.steps(0.5) for _ in range(20))
+    assert abs(fast - 50) <= 1
+    assert abs(slow - 50) <= 1
+
+
+def test_idle(scheduler):
+    assert scheduler.interval(now=1) == 0.1
+    assert scheduler.interval(now=100) == 1
+    scheduler.activity(100)
+    assert scheduler.interval(now=101) == 0.1
+
+
+def test_over_budget(scheduler):
+    assert scheduler.frame_done(0.05, now=1) == 0.05
+    for _ in range(50):
+        delay = scheduler.frame_done(0.3, now=1)
+    assert abs(scheduler.frame_time - 0.3) < 1e-3
+    assert abs(delay - 0.15) < 1e-2
+
+
+def test_clock():
+    now = [0]
+    scheduler = FrameScheduler(time_step=0.2, idle_after=60,
+                               clock=lambda: now[0])
+    assert not scheduler.is_idle()
+    now[0] = 100
+    assert scheduler.is_idle()
+    scheduler.activity()
+    assert scheduler.last_activity == 100
@@ -0,0 +1,32 @@
+from pytest import fixture
+
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+from src.urwid_interface.headless import HeadlessAquarium, PHASES
+
+DAY = 60*60*24
+
+
+@fixture
+def aquarium():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    tank = Tank(last_checkin=0)
+    for i in range(5):
+        fish = builder.make_fish(f'Fish {i}',
+                                 species_name='DEV_FISH',
+                                 personality_name='DEV_PERSONALITY')
+        fish.last_checkin = 0
+        tank.add_fish(fish)
+    return HeadlessAquarium(tank, speed=DAY, refresh_rate=0.5)
+
+
+def test_run(aquarium):
+    result = aquarium.run(10)
+    assert result['frames'] == 10
+    assert aquarium.clock == 5*DAY
+    assert aquarium.tank.last_checkin == 5*DAY
+    assert result['frames_per_second'] > 0
+    assert result['days_per_second'] > 0
+    for phase in PHASES:
+        assert result[f'{phase}_ms'] >= 0
@@ -0,0 +1,140 @@
+from pytest import fixture, raises
+import os
+
+from src import save_file
+from src.fish.fish_builder import FishBuilder
+from src.journal import Journal
+from src.tank import Tank
+
+DAY = 60*60*24
+
+
+@fixture
+def builder():
+    return FishBuilder(species_file='test/species.json',
+                       personality_file='test/personalities.json')
+
+
+@fixture
+def filename(tmp_path):
+    return str(tmp_path / 'afish')
+
+
+def make_tank(builder, filename):
+    tank = Tank(last_checkin=0)
+    tank.fish_builder = builder
+    if os.path.isfile(filename):
+        tank.load(filename)
+    return tank
+
+
+def add_fish(tank, name):
+    fish = tank.fish_builder.make_fish(name,
+                                       species_name='DEV_FISH',
+                                       personality_name='DEV_PERSONALITY')
+    fish.last_fed = 0
+    fish.last_checkin = 0
+    tank.add_fish(fish)
+
+
+def test_replay(builder, filename):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    add_fish(tank, 'Fishy')
+    add_fish(tank, 'Bubbles')
+    tank.remove_fish('Fishy')
+    tank.feed(DAY)
+    tank.clean(DAY*4)
+    # Nothing has been saved, but the journal has all the changes
+    assert not os.path.isfile(filename)
+    reloaded_tank = make_tank(builder, filename)
+    Journal(reloaded_tank, filename).open()
+    assert [fish.name for fish in reloaded_tank.fish] == ['Bubbles']
+    assert reloaded_tank.fish[0].last_fed == DAY
+    assert reloaded_tank.last_checkin == DAY*4
+    assert reloaded_tank.waste == tank.waste
+    # The changes were compacted into the save file
+    assert os.path.isfile(filename)
+    assert reloaded_tank.journal_seq == 5
+
+
+def test_compact(builder, filename):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename, compact_every=3)
+    journal.open()
+    for i in range(7):
+        add_fish(tank, f'Fish {i}')
+        journal.wait()
+    assert not os.path.isfile(journal.old_journal_filename)
+    assert make_tank(builder, filename).journal_seq == 6
+    reloaded_tank = make_tank(builder, filename)
+    Journal(reloaded_tank, filename).open()
+    assert len(reloaded_tank.fish) == 7
+
+
+def test_torn_record(builder, filename):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    add_fish(tank, 'Fishy')
+    with open(journal.journal_filename, 'a') as journal_file:
+        journal_file.write('{"seq": 2, "op": "add_fi')
+    reloaded_tank = make_tank(builder, filename)
+    Journal(reloaded_tank, filename).open()
+    assert [fish.name for fish in reloaded_tank.fish] == ['Fishy']
+
+
+def test_append_after_torn_record(builder, filename):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    tank.save(filename)
+    with open(journal.journal_filename, 'a') as journal_file:
+        journal_file.write('{"seq": 1, "op": "add_fi')
+    # Nothing is replayed, so the journal is appended to as it is
+    reloaded_tank = make_tank(builder, filename)
+    Journal(reloaded_tank, filename).open()
+    add_fish(reloaded_tank, 'Fishy')
+    add_fish(reloaded_tank, 'Bubbles')
+    recovered_tank = make_tank(builder, filename)
+    Journal(recovered_tank, filename).open()
+    assert [fish.name for fish in recovered_tank.fish] == ['Fishy', 'Bubbles']
+
+
+def test_crash_while_compacting(builder, filename, monkeypatch):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    for i in range(3):
+        add_fish(tank, f'Fish {i}')
+    write_atomic = save_file.write_atomic
+
+    def crash(*args):
+        raise OSError('Crashed')
+    monkeypatch.setattr(save_file, 'write_atomic', crash)
+    with raises(OSError):
+        journal.compact(background=False)
+    assert os.path.isfile(journal.old_journal_filename)
+    add_fish(tank, 'Fish 3')
+    # Crash again while compacting what was left over
+    reloaded_tank = make_tank(builder, filename)
+    with raises(OSError):
+        Journal(reloaded_tank, filename).open()
+    monkeypatch.setattr(save_file, 'write_atomic', write_atomic)
+    recovered_tank = make_tank(builder, filename)
+    Journal(recovered_tank, filename).open()
+    assert [fish.name for fish in recovered_tank.fish] == \
+        [f'Fish {i}' for i in range(4)]
+
+
+def test_close(builder, filename):
+    tank = make_tank(builder, filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    add_fish(tank, 'Fishy')
+    tank.save(filename)
+    journal.close()
+    assert not os.path.isfile(journal.journal_filename)
+    assert tank.journal is None
+    assert len(make_tank(builder, filename).fish) == 1
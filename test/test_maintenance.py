@@ -0,0 +1,120 @@
+from pytest import fixture
+import json
+
+from src.fish.fish_builder import FishBuilder
+from src.maintenance import find_save_files, maintain_tanks, summarize_tanks
+from src.tank import Tank
+
+
+BUILDER_FILES = {
+    'species_file': 'test/species.json',
+    'personality_file': 'test/personalities.json',
+}
+
+
+@fixture
+def directory(tmp_path):
+    builder = FishBuilder(**BUILDER_FILES)
+    for i in range(6):
+        tank = Tank(width=60, height=20, max_fish=40, last_checkin=0,
+                    fish_builder=builder)
+        for j in range(i + 10):
+            tank.add_fish(builder.make_fish(f'Fish {j}',
+                                            species_name='DEV_FISH',
+                                            personality_name='DEV_PERSONALITY',
+                                            timestamp=0))
+        name = f'tank{i}.bin' if i % 2 else f'tank{i}'
+        (tmp_path/name).write_bytes(tank.dumps(binary=name.endswith('.bin')))
+    (tmp_path/'tank0.journal').write_text('')
+    return tmp_path
+
+
+def test_find_save_files(directory):
+    filenames = find_save_files(str(directory))
+    assert len(filenames) == 6
+    assert not any(name.endswith('.journal') for name in filenames)
+
+
+def load(filename):
+    tank = Tank(max_fish=100, fish_builder=FishBuilder(**BUILDER_FILES))
+    tank.load(filename)
+    return tank
+
+
+def test_maintain_tanks(directory):
+    filenames = find_save_files(str(directory))
+    result = maintain_tanks(filenames, timestamp=5, feed=True, workers=2,
+                            **BUILDER_FILES)
+    assert result['tanks'] == 6
+    assert result['fish'] == sum(range(10, 16))
+    assert result['failures'] == []
+    for i, filename in enumerate(filenames):
+        tank = load(filename)
+        assert len(tank.fish) == i + 10
+        assert all(fish.last_fed == 5 for fish in tank.fish)
+        assert all(fish.last_checkin == 5 for fish in tank.fish)
+
+
+def test_failures(directory):
+    (directory/'broken').write_text('not a tank')
+    filenames = find_save_files(str(directory))
+    result = maintain_tanks(filenames, timestamp=5, workers=1, **BUILDER_FILES)
+    assert result['tanks'] == 6
+    assert [filename for filename, _ in result['failures']] == \
+        [str(directory/'broken')]
+
+
+def test_failure_closes_journal(directory, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('Checkin failed')
+    monkeypatch.setattr(Tank, 'checkin', fail)
+    filenames = find_save_files(str(directory))
+    result = maintain_tanks(filenames, timestamp=5, workers=1, **BUILDER_FILES)
+    assert len(result['failures']) == 6
+    assert not list(directory.glob('*.journal'))
+
+
+def summarize(filenames):
+    return {filename: summary for filename, summary, _
+            in summarize_tanks(filenames, **BUILDER_FILES)}
+
+
+def test_summarize_tanks(directory):
+    filenames = find_save_files(str(directory))
+    # The fixture wrote the save files without indexes, so they get loaded
+    summaries = summarize(filenames)
+    assert summaries[filenames[0]]['fish_count'] == 10
+    assert summaries[filenames[0]]['last_checkin'] is None
+    maintain_tanks(filenames, timestamp=5, workers=1, **BUILDER_FILES)
+    summaries = summarize(filenames)
+    assert summaries[filenames[5]]['species'] == {'DEV_FISH': 15}
+    assert summaries[filenames[5]]['last_checkin'] == 5
+
+
+def test_summarize_failures(directory):
+    (directory/'broken').write_text('not a tank')
+    filenames = find_save_files(str(directory))
+    results = list(summarize_tanks(filenames, **BUILDER_FILES))
+    assert [filename for filename, _, error in results if error] == \
+        [str(directory/'broken')]
+    assert len([summary for _, summary, _ in results if summary]) == 6
+
+
+def test_summarize_journal(directory):
+    filenames = find_save_files(str(directory))
+    maintain_tanks(filenames, timestamp=5, workers=1, **BUILDER_FILES)
+    # Left over in the journal by a crash
+    with open(f'{filenames[0]}.journal', 'w') as journal_file:
+        journal_file.write('{"seq": 1, "op": "remove_fish", "name": "Fish 0"}\n')
+    summaries = summarize(filenames)
+    assert summaries[filenames[0]]['fish_count'] == 9
+    assert summaries[filenames[1]]['fish_count'] == 11
+    # Fish added past the default limit, in a tank big enough for them
+    fish = FishBuilder(**BUILDER_FILES).make_fish('New fish',
+                                                  species_name='DEV_FISH',
+                                                  personality_name='DEV_PERSONALITY',
+                                                  timestamp=0)
+    with open(f'{filenames[1]}.journal', 'w') as journal_file:
+        journal_file.write(json.dumps({'seq': 1, 'op': 'add_fish',
+                                       'fish': fish.to_json()}) + '\n')
+    assert summarize(filenames)[filenames[1]]['fish_count'] == 12
@@ -1,6 +1,7 @@
 from pytest import fixture
+import random
 
-from src.fish.personality import get_personalities
+from src.fish.personality import Personality, get_personalities
 
 
 def test_get_personalities():
@@ -24,3 +25,19 @@ def test_get_quote(personality):
 
 def test_to_json(personality):
     assert personality.to_json() == "DEV_PERSONALITY"
+
+
+def test_get_quote_name():
+    personality = Personality('Named', ['Hi {name}, I am {name}'], [], [], [])
+    assert personality.get_quote('Bubbles', 0, 0) == 'Hi Bubbles, I am Bubbles'
+
+
+def test_get_quote_rng():
+    personality = Personality('Many', [str(i) for i in range(100)], [], [], [])
+    rng = random.Random(1)
+    first = [personality.get_quote('', 0, 0, rng) for _ in range(10)]
+    rng.seed(1)
+    second = [personality.get_quote('', 0, 0, rng) for _ in range(10)]
+    assert first == second
+    # Quotes drawn one after another from the generator differ
+    assert len(set(first)) > 1
@@ -0,0 +1,143 @@
+from pytest import fixture, raises
+import json
+import pstats
+import threading
+import urwid
+
+from src.profiler import Profiler, HISTOGRAM_BOUNDS, instrument_aquarium
+from src.tank import Tank
+from src.urwid_interface.interface import Interface
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def step(self, rows=3):
+        self.calls += 1
+        return list(range(rows))
+
+
+class Waiter:
+    def __init__(self):
+        self.started = threading.Event()
+        self.finish = threading.Event()
+
+    def wait(self):
+        self.started.set()
+        self.finish.wait()
+
+
+@fixture
+def counter():
+    return Counter()
+
+
+def test_instrument(counter):
+    profiler = Profiler()
+    profiler.instrument(counter, 'step', counter=len)
+    counter.step()
+    counter.step(rows=2)
+    assert counter.calls == 2
+    assert len(profiler.timings['Counter.step']) == 2
+    assert profiler.counters['Counter.step'] == 5
+
+
+def test_remove(counter):
+    profiler = Profiler()
+    profiler.instrument(counter, 'step')
+    profiler.instrument(counter, 'step', name='again')
+    profiler.remove()
+    assert 'step' not in vars(counter)
+    counter.step()
+    assert profiler.timings == {}
+
+
+def test_histogram(counter):
+    profiler = Profiler()
+    profiler.instrument(counter, 'step')
+    for _ in range(10):
+        counter.step()
+    histogram = profiler.histogram('Counter.step')
+    assert len(histogram) == len(HISTOGRAM_BOUNDS) + 1
+    assert histogram[0] == (1, 10)
+    assert sum(calls for _, calls in histogram) == 10
+
+
+def test_dump(counter, tmp_path):
+    profiler = Profiler()
+    profiler.instrument(counter, 'step')
+    counter.step()
+    profiler.dump(tmp_path/'profile.json')
+    with open(tmp_path/'profile.json') as dump_file:
+        summary = json.load(dump_file)
+    assert summary['timers']['Counter.step']['calls'] == 1
+    assert 'Counter.step' in profiler.report()
+
+
+def test_export_trace(counter, tmp_path):
+    with raises(ValueError):
+        Profiler().export_trace(tmp_path/'trace.json')
+    profiler = Profiler(trace=True)
+    profiler.instrument(counter, 'step')
+    counter.step()
+    profiler.export_trace(tmp_path/'trace.json')
+    with open(tmp_path/'trace.json') as trace_file:
+        events = json.load(trace_file)['traceEvents']
+    assert [event['name'] for event in events] == ['Counter.step']
+    assert events[0]['ph'] == 'X'
+
+
+def test_export_cprofile(counter, tmp_path):
+    profiler = Profiler(cprofile=True)
+    profiler.instrument(counter, 'step')
+    counter.step()
+    profiler.export_cprofile(str(tmp_path/'stats.prof'))
+    stats = pstats.Stats(str(tmp_path/'stats.prof'))
+    assert any(function == 'step' for _, _, function in stats.stats)
+
+
+def test_cprofile_threads(counter, tmp_path):
+    profiler = Profiler(cprofile=True)
+    waiter = Waiter()
+    profiler.instrument(waiter, 'wait')
+    profiler.instrument(counter, 'step')
+    thread = threading.Thread(target=waiter.wait)
+    thread.start()
+    waiter.started.wait()
+    # Called on this thread while the other thread is being profiled
+    counter.step()
+    waiter.finish.set()
+    thread.join()
+    assert len(profiler.timings['Waiter.wait']) == 1
+    assert len(profiler.timings['Counter.step']) == 1
+    profiler.export_cprofile(str(tmp_path/'stats.prof'))
+
+
+def test_instrument_aquarium():
+    profiler = Profiler()
+    tank = Tank(last_checkin=1)
+    instrument_aquarium(profiler, tank)
+    tank.checkin(2)
+    assert len(profiler.timings['Tank.checkin']) == 1
+    tank.feed(3)
+    tank.clean(4)
+    tank.get_status(5)
+    assert len(profiler.timings['Tank.checkin']) == 4
+    assert len(profiler.timings['Tank.feed']) == 1
+    assert len(profiler.timings['Tank.get_status']) == 1
+
+
+def test_overlay():
+    profiler = Profiler()
+    tank = Tank(last_checkin=1)
+    instrument_aquarium(profiler, tank)
+    tank.checkin(2)
+    interface = Interface(tank, profiler=profiler)
+    menu = interface.build_main_menu()
+    labels = [item.original_widget.get_label() for item in menu.body]
+    assert 'Profile' in labels
+    interface.bottom_widget = urwid.BoxAdapter(menu, height=10)
+    interface.profile_button_action(None)
+    popup = interface.bottom_widget.original_widget
+    assert 'Tank.checkin' in popup.original_widget.contents[0][0].text
@@ -0,0 +1,120 @@
+from pytest import fixture, raises
+import json
+import urwid
+
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+from src.urwid_interface.interface import Interface
+from src.urwid_interface.recording import Recorder, Replay, RecordingError
+from src.urwid_interface.tank_widget import TankWidget
+
+START = 1000
+
+
+@fixture
+def builder():
+    return FishBuilder(species_file='test/species.json',
+                       personality_file='test/personalities.json')
+
+
+def make_fish(builder, name):
+    return builder.make_fish(name,
+                             species_name='DEV_FISH',
+                             personality_name='DEV_PERSONALITY',
+                             timestamp=START)
+
+
+def shown(tank_widget):
+    return [row[0].get_text()[0] for row in tank_widget.pile.contents]
+
+
+def positions(tank_widget):
+    return [(art.fish.name, art.x, art.y, art.flipped) for art in tank_widget.fish]
+
+
+def test_record_and_replay(builder, tmp_path):
+    filename = str(tmp_path/'session.log')
+    tank = Tank(last_checkin=START, fish_builder=builder)
+    tank_widget = TankWidget(height=tank.height, width=tank.width)
+    for i in range(3):
+        fish = make_fish(builder, f'Fish {i}')
+        tank.add_fish(fish)
+        tank_widget.add_fish(fish)
+
+    recorder = Recorder(filename, seed=42)
+    recorder.start(tank, tank_widget)
+    for _ in range(50):
+        tank_widget.build_frame(1)
+    new_fish = make_fish(builder, 'New')
+    tank.add_fish(new_fish)
+    tank_widget.add_fish(new_fish)
+    tank_widget.build_frame(3)
+    tank_widget.resize(12, 6)
+    tank_widget.pan(5, 2)
+    tank.checkin_fish(new_fish, START + 4)
+    tank.feed(START + 5)
+    status = tank.get_status(START + 6)
+    tank.remove_fish('Fish 0')
+    tank_widget.remove_fish('Fish 0')
+    for _ in range(20):
+        tank_widget.build_frame(2)
+    tank_widget.show_frame()
+    recorder.close()
+
+    replay = Replay(filename, fish_builder=builder)
+    result = replay.run()
+    assert result['frames'] == 71
+    assert positions(replay.tank_widget) == positions(tank_widget)
+    assert shown(replay.tank_widget) == shown(tank_widget)
+    assert replay.status == status
+    assert replay.tank.to_json() == tank.to_json()
+
+
+class Screen:
+    def register_palette_entry(self, **entry):
+        pass
+
+
+def test_replay_interface_fish(builder, tmp_path):
+    filename = str(tmp_path/'session.log')
+    tank = Tank(last_checkin=START, fish_builder=builder, clock=lambda: START)
+    interface = Interface(tank)
+    interface.screen = Screen()
+    interface.bottom_widget = urwid.BoxAdapter(urwid.SolidFill(), height=1)
+    recorder = Recorder(filename, seed=7)
+    recorder.start(tank, interface.tank_widget)
+    # Add fish the same way as the add a fish menu
+    for i in range(5):
+        interface.get_fish_name(None, 'DEV_FISH')
+        interface.bottom_widget.original_widget.callback(f'Fish {i}')
+    status = tank.get_status(START + 1)
+    recorder.close()
+
+    replay = Replay(filename, fish_builder=builder)
+    replay.run()
+    assert replay.status == status
+    assert replay.tank.to_json() == tank.to_json()
+
+
+def test_frames_compressed(builder, tmp_path):
+    filename = str(tmp_path/'session.log')
+    tank = Tank(last_checkin=START, fish_builder=builder)
+    tank_widget = TankWidget(height=tank.height, width=tank.width)
+    recorder = Recorder(filename, seed=1)
+    recorder.start(tank, tank_widget)
+    for _ in range(100):
+        tank_widget.build_frame(1)
+    tank.checkin(START + 1)
+    recorder.close()
+    with open(filename) as log:
+        lines = [json.loads(line) for line in log]
+    assert lines[1:] == [['tick', 1, 100], ['checkin', START + 1]]
+    assert tank.recorder is None
+    assert tank_widget.recorder is None
+
+
+def test_bad_version(tmp_path):
+    filename = tmp_path/'session.log'
+    filename.write_text('{"version": 0}\n')
+    with raises(RecordingError):
+        Replay(str(filename))
@@ -0,0 +1,140 @@
+from pytest import fixture, raises
+
+from src.fish.fish_builder import FishBuilder
+from src.save_file import HEADER, MAGIC, MAX_STRING_LENGTH, OLD_HEADERS, \
+    RECORD, SaveFileError, is_binary, is_binary_file
+from src.tank import Tank
+
+FISH_NAMES = ['Fishy', 'Bubbles', 'Émile']
+
+
+@fixture
+def tank():
+    tank = Tank()
+    tank.fish_builder = FishBuilder(species_file='test/species.json',
+                                    personality_file='test/personalities.json')
+    for name in FISH_NAMES:
+        tank.add_fish(tank.fish_builder.make_fish(name,
+                                                  species_name='DEV_FISH',
+                                                  personality_name='DEV_PERSONALITY'))
+    tank.waste = 0.5
+    return tank
+
+
+def load(tank, filename):
+    loaded_tank = Tank()
+    loaded_tank.fish_builder = tank.fish_builder
+    loaded_tank.load(filename)
+    return loaded_tank
+
+
+def test_is_binary():
+    assert is_binary('tank.bin')
+    assert not is_binary('afish')
+    assert not is_binary('save.json')
+
+
+def test_is_binary_file(tank, tmp_path):
+    filename = str(tmp_path / 'tank')
+    assert not is_binary_file(filename)
+    tank.save(filename, binary=True)
+    assert is_binary_file(filename)
+    tank.save(filename, binary=False)
+    assert not is_binary_file(filename)
+
+
+def test_binary_round_trip(tank, tmp_path):
+    filename = str(tmp_path / 'tank.bin')
+    tank.save(filename)
+    assert load(tank, filename).to_json() == tank.to_json()
+
+
+def test_binary_flag(tank, tmp_path):
+    filename = str(tmp_path / 'tank')
+    tank.save(filename, binary=True)
+    with open(filename, 'rb') as binary_file:
+        assert binary_file.read(4) == b'AFSH'
+    assert load(tank, filename).to_json() == tank.to_json()
+    tank.save(filename, binary=False)
+    assert len(load(tank, filename).fish) == len(FISH_NAMES)
+
+
+def test_json_to_binary(tank, tmp_path):
+    json_filename = str(tmp_path / 'tank.json')
+    binary_filename = str(tmp_path / 'tank.bin')
+    tank.save(json_filename)
+    loaded_tank = load(tank, json_filename)
+    loaded_tank.save(binary_filename)
+    assert load(tank, binary_filename).to_json() == loaded_tank.to_json()
+
+
+def test_bad_file(tank, tmp_path):
+    filename = tmp_path / 'tank.bin'
+    filename.write_bytes(b'')
+    with raises(SaveFileError):
+        load(tank, str(filename))
+    filename.write_bytes(b'{"fish": []}' * 10)
+    with raises(SaveFileError):
+        load(tank, str(filename))
+
+
+def test_old_version(tank, tmp_path):
+    filename = tmp_path / 'tank.bin'
+    tank.save(str(filename))
+    data = filename.read_bytes()
+    _, _, width, height, waste, journal_seq, fish_count, string_count, _ = \
+        HEADER.unpack_from(data)
+    filename.write_bytes(OLD_HEADERS[2].pack(MAGIC, 2, width, height, waste,
+                                             journal_seq, fish_count,
+                                             string_count)
+                         + data[HEADER.size:])
+    loaded_tank = load(tank, str(filename))
+    assert loaded_tank.to_json() == tank.to_json()
+    filename.write_bytes(OLD_HEADERS[1].pack(MAGIC, 1, width, height, waste,
+                                             fish_count, string_count)
+                         + data[HEADER.size:])
+    loaded_tank = load(tank, str(filename))
+    assert loaded_tank.to_json() == tank.to_json()
+    assert loaded_tank.journal_seq == 0
+    filename.write_bytes(MAGIC + b'\xff\x00' + data[6:])
+    with raises(SaveFileError):
+        load(tank, str(filename))
+
+
+def test_movement(tank, tmp_path):
+    tank.movement = 'schooling'
+    for name in ['tank.bin', 'tank.json']:
+        filename = str(tmp_path / name)
+        tank.save(filename)
+        assert load(tank, filename).movement == 'schooling'
+
+
+def test_truncated_strings(tank, tmp_path):
+    filename = tmp_path / 'tank.bin'
+    tank.save(str(filename))
+    data = filename.read_bytes()
+    # Cut off partway through the string table
+    filename.write_bytes(data[:HEADER.size + 3])
+    with raises(SaveFileError):
+        load(tank, str(filename))
+    filename.write_bytes(data[:HEADER.size + 1])
+    with raises(SaveFileError):
+        load(tank, str(filename))
+
+
+def test_bad_string_index(tank, tmp_path):
+    filename = tmp_path / 'tank.bin'
+    tank.save(str(filename))
+    data = bytearray(filename.read_bytes())
+    # Point the last fish's name past the end of the string table
+    start = len(data) - RECORD.size
+    data[start:start + 4] = (1000).to_bytes(4, 'little')
+    filename.write_bytes(bytes(data))
+    with raises(SaveFileError):
+        load(tank, str(filename))
+
+
+def test_long_name(tank, tmp_path):
+    tank.fish[0].name = 'a'*(MAX_STRING_LENGTH + 1)
+    with raises(ValueError):
+        tank.save(str(tmp_path / 'tank.bin'))
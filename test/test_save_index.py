@@ -0,0 +1,64 @@
+from pytest import fixture
+
+from src.fish.fish_builder import FishBuilder
+from src.journal import Journal
+from src.save_index import index_filename, read_index
+from src.tank import Tank
+
+
+@fixture
+def tank():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    tank = Tank(last_checkin=100, fish_builder=builder)
+    for name in ['Bubbles', 'Fishy']:
+        tank.add_fish(builder.make_fish(name,
+                                        species_name='DEV_FISH',
+                                        personality_name='DEV_PERSONALITY',
+                                        timestamp=100))
+    return tank
+
+
+def test_save_writes_index(tank, tmp_path):
+    filename = str(tmp_path/'afish')
+    tank.save(filename)
+    summary = read_index(filename)
+    assert summary['fish_count'] == 2
+    assert summary['names'] == ['Bubbles', 'Fishy']
+    assert summary['species'] == {'DEV_FISH': 2}
+    assert summary['waste'] == tank.waste
+    assert summary['last_checkin'] == tank.last_checkin
+
+
+def test_missing_index(tmp_path):
+    assert read_index(str(tmp_path/'afish')) is None
+
+
+def test_stale_index(tank, tmp_path):
+    filename = str(tmp_path/'afish')
+    tank.save(filename)
+    with open(filename, 'a') as save_file:
+        save_file.write('\n')
+    assert read_index(filename) is None
+
+
+def test_compaction_updates_index(tank, tmp_path):
+    filename = str(tmp_path/'afish.bin')
+    tank.save(filename)
+    journal = Journal(tank, filename)
+    journal.open()
+    tank.remove_fish('Fishy')
+    journal.close()
+    assert read_index(filename)['names'] == ['Bubbles']
+    assert index_filename(filename) == filename + '.index'
+
+
+def test_journal_makes_index_stale(tank, tmp_path):
+    filename = str(tmp_path/'afish')
+    tank.save(filename)
+    with open(f'{filename}.journal', 'w'):
+        pass
+    assert read_index(filename) is not None
+    with open(f'{filename}.journal', 'w') as journal_file:
+        journal_file.write('{"seq": 1, "op": "clean", "timestamp": 200}\n')
+    assert read_index(filename) is None
@@ -0,0 +1,94 @@
+from pytest import fixture
+import numpy as np
+import random
+
+from src.fish.fish_builder import FishBuilder
+from src.urwid_interface.movement import SCHOOLING
+from src.urwid_interface.schooling import Schooling
+from src.urwid_interface.tank_widget import TankWidget
+
+WIDTH = 60
+HEIGHT = 20
+
+
+@fixture
+def tank_widget():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    tank_widget = TankWidget(height=HEIGHT, width=WIDTH, refresh_rate=1,
+                             rng=random.Random(0), movement=SCHOOLING)
+    # Fish spread out so none of them overlap to start with
+    for i in range(20):
+        fish = builder.make_fish(f'Fish {i}',
+                                 species_name='DEV_FISH',
+                                 personality_name='DEV_PERSONALITY')
+        tank_widget.add_fish(fish, x=1 + 10*(i % 5), y=2 + 4*(i//5))
+    return tank_widget
+
+
+def spans(tank_widget):
+    return [(fish.y, fish.x, fish.x + len(fish.get_art()))
+            for fish in tank_widget.fish]
+
+
+def test_in_bounds(tank_widget):
+    for _ in range(500):
+        tank_widget.move_fish()
+        for fish in tank_widget.fish:
+            assert 0 < fish.x <= WIDTH - len(fish.get_art())
+            assert 0 < fish.y <= HEIGHT
+
+
+def test_no_overlaps(tank_widget):
+    text_buffer = tank_widget.text_buffer
+    obstacles = {text_buffer.palette_id('rock'), text_buffer.palette_id('green')}
+    for _ in range(500):
+        tank_widget.move_fish()
+        taken = set()
+        for y, left, right in spans(tank_widget):
+            for x in range(left, right):
+                assert (x, y) not in taken
+                assert text_buffer.formatting[y][x] not in obstacles
+                taken.add((x, y))
+
+
+def test_schools(tank_widget):
+    def spread():
+        rows = [fish.y for fish in tank_widget.fish]
+        return max(rows) - min(rows)
+    before = spread()
+    for _ in range(500):
+        tank_widget.move_fish()
+    assert spread() < before
+
+
+def test_add_and_remove(tank_widget):
+    tank_widget.move_fish()
+    tank_widget.remove_fish('Fish 0')
+    tank_widget.move_fish()
+    assert len(tank_widget.movement.fish) == 19
+
+
+def assert_up_to_date(tank_widget):
+    fresh = Schooling()
+    fresh._rebuild(tank_widget)
+    assert np.array_equal(tank_widget.movement.cells, fresh.cells)
+    assert np.array_equal(tank_widget.movement.schools, fresh.schools)
+
+
+def test_kept_up_to_date(tank_widget):
+    for _ in range(200):
+        tank_widget.move_fish()
+    assert_up_to_date(tank_widget)
+
+
+def test_grow(tank_widget):
+    tank_widget.move_fish()
+    grown = tank_widget.fish[:5]
+    for fish in grown:
+        fish.fish.time_fed = 50
+        fish.get_art()
+    assert tank_widget.grid.grown == set(grown)
+    tank_widget.move_fish()
+    assert not tank_widget.grid.grown
+    assert_up_to_date(tank_widget)
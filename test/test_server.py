@@ -0,0 +1,127 @@
+from pytest import fixture
+import os
+import threading
+
+from src import save_file
+from src.fish.fish_builder import FishBuilder
+from src.server import TankServer, UnixServer, send
+from src.tank import Tank, default_max_fish
+
+
+@fixture
+def tank_server(tmp_path):
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    return TankServer(str(tmp_path), max_tanks=2, fish_builder=builder)
+
+
+def add_fish(tank_server, tank, name):
+    return tank_server.handle({'tank': tank,
+                               'command': 'add_fish',
+                               'name': name,
+                               'species': 'DEV_FISH',
+                               'personality': 'DEV_PERSONALITY'})
+
+
+def test_handle(tank_server):
+    assert add_fish(tank_server, 'alice', 'Fishy')['ok']
+    response = tank_server.handle({'tank': 'alice', 'command': 'fish'})
+    assert response == {'ok': True, 'result': ['Fishy']}
+    response = tank_server.handle({'tank': 'alice', 'command': 'status'})
+    assert response['result'][0].startswith('Fishy (DEV_FISH): ')
+    assert tank_server.handle({'tank': 'alice', 'command': 'feed'})['ok']
+    response = tank_server.handle({'tank': 'alice',
+                                   'command': 'remove_fish',
+                                   'name': 'Fishy'})
+    assert response['result'] == 'Goodbye Fishy'
+
+
+def test_errors(tank_server):
+    assert not tank_server.handle({'tank': '../alice', 'command': 'fish'})['ok']
+    assert not tank_server.handle({'tank': 'alice', 'command': 'dance'})['ok']
+    assert not tank_server.handle({'command': 'fish'})['ok']
+    response = tank_server.handle({'tank': 'alice',
+                                   'command': 'add_fish',
+                                   'name': 'Fishy',
+                                   'species': 'Shark',
+                                   'personality': 'DEV_PERSONALITY'})
+    assert not response['ok']
+
+
+def test_bad_requests(tank_server):
+    assert not tank_server.handle(['alice', 'fish'])['ok']
+    assert not tank_server.handle({'tank': 7, 'command': 'fish'})['ok']
+    assert not tank_server.handle({'tank': 'alice', 'command': None})['ok']
+    response = tank_server.handle({'tank': 'alice',
+                                   'command': 'add_fish',
+                                   'name': 7,
+                                   'species': 'DEV_FISH',
+                                   'personality': 'DEV_PERSONALITY'})
+    assert not response['ok']
+    # Would share files with the tank alice
+    assert not tank_server.handle({'tank': 'alice.journal',
+                                   'command': 'fish'})['ok']
+    assert not tank_server.handle({'tank': 'alice.index',
+                                   'command': 'fish'})['ok']
+
+
+def test_evict(tank_server, tmp_path):
+    add_fish(tank_server, 'alice', 'Fishy')
+    add_fish(tank_server, 'bob', 'Bubbles')
+    assert list(tank_server.tanks) == ['alice', 'bob']
+    add_fish(tank_server, 'carol', 'Nemo')
+    # alice was used least recently so it got saved and taken out of memory
+    assert list(tank_server.tanks) == ['bob', 'carol']
+    assert os.path.isfile(tmp_path / 'alice')
+    response = tank_server.handle({'tank': 'alice', 'command': 'fish'})
+    assert response['result'] == ['Fishy']
+    assert tank_server.tanks['alice'].fish_builder is tank_server.fish_builder
+
+
+def test_evict_outside_lock(tank_server, monkeypatch):
+    write_atomic = save_file.write_atomic
+    locked = []
+
+    def write(*args):
+        locked.append(tank_server.lock.locked())
+        write_atomic(*args)
+    monkeypatch.setattr(save_file, 'write_atomic', write)
+    for name in ['alice', 'bob', 'carol']:
+        add_fish(tank_server, name, 'Fishy')
+    assert locked and not any(locked)
+    assert tank_server.saving == {}
+
+
+def test_bring_back_evicted(tank_server):
+    add_fish(tank_server, 'alice', 'Fishy')
+    with tank_server.lock:
+        tank = tank_server.get_tank('alice')
+        tank_server.get_tank('bob')
+        tank_server.get_tank('carol')
+        # Not written to disk yet, so the tank in memory is used
+        assert tank_server.get_tank('alice') is tank
+    tank_server.save_evicted()
+    assert list(tank_server.saving) == []
+    assert [fish.name for fish in tank.fish] == ['Fishy']
+
+
+def test_big_tank(tank_server, tmp_path):
+    tank = Tank(width=90, height=30, fish_builder=tank_server.fish_builder)
+    tank.save(str(tmp_path / 'alice'))
+    with tank_server.lock:
+        tank = tank_server.get_tank('alice')
+    assert tank.max_fish == default_max_fish(90, 30)
+
+
+def test_socket(tank_server, tmp_path):
+    socket_path = str(tmp_path / 'aquarium.sock')
+    with UnixServer(socket_path, tank_server) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            add_fish(tank_server, 'alice', 'Fishy')
+            response = send(socket_path, {'tank': 'alice', 'command': 'fish'})
+            assert response == {'ok': True, 'result': ['Fishy']}
+        finally:
+            server.shutdown()
+            thread.join()
@@ -1,6 +1,8 @@
-from pytest import fixture
+import math
 
-from src.fish.species import get_species
+from pytest import fixture, raises
+
+from src.fish.species import Species, get_species
 
 
 def test_get_species():
@@ -31,3 +33,18 @@ def test_colors(species):
 
 def test_to_json(species):
     assert species.to_json() == "DEV_FISH"
+
+
+def test_stages(species):
+    assert species.get_stage(9.9) == 0
+    assert species.get_stage(10) == 1
+    assert species.stage_bounds(0) == (-math.inf, 10)
+    assert species.stage_bounds(1) == (10, 100)
+    assert species.stage_bounds(2) == (100, math.inf)
+
+
+def test_bad_art_ages():
+    with raises(ValueError):
+        Species('Bad', 10, ['a', 'b', 'c'], [100, 10], ['#fff'])
+    with raises(ValueError):
+        Species('Bad', 10, ['a', 'b'], [10, 100], ['#fff'])
@@ -1,4 +1,5 @@
 from pytest import fixture, raises
+import random
 import time
 
 from src.fish.fish import Fish
@@ -8,13 +9,17 @@ from src.tank import Tank, DEFAULT_HEIGHT, DEFAULT_WIDTH, DEFAULT_MAX_FISH
 DAY = 60*60*24
 FISH_NAME = 'DEFAULT_FISH'
 
+
+def fish_builder():
+    return FishBuilder(species_file='test/species.json',
+                       personality_file='test/personalities.json')
+
+
 @fixture
 def fish():
-    builder = FishBuilder(species_file='test/species.json',
-                          personality_file='test/personalities.json')
-    return builder.make_fish(FISH_NAME,
-                             species_name='DEV_FISH',
-                             personality_name='DEV_PERSONALITY')
+    return fish_builder().make_fish(FISH_NAME,
+                                    species_name='DEV_FISH',
+                                    personality_name='DEV_PERSONALITY')
 
 
 @fixture
@@ -41,6 +46,39 @@ def test_is_full(tank, fish):
     assert tank.is_full()
 
 
+def test_load_past_max_fish(tank, fish, tmp_path):
+    tank.max_fish = 3*DEFAULT_MAX_FISH
+    for _ in range(tank.max_fish):
+        tank.add_fish(fish)
+    filename = str(tmp_path / 'tank')
+    tank.save(filename)
+    loaded_tank = Tank()
+    loaded_tank.fish_builder = fish_builder()
+    loaded_tank.load(filename)
+    assert len(loaded_tank.fish) == 3*DEFAULT_MAX_FISH
+    assert loaded_tank.is_full()
+
+
+def test_clock(tank, fish, tmp_path):
+    later = time.time() + 100*DAY
+
+    def clock():
+        return later
+    tank.add_fish(fish)
+    filename = str(tmp_path / 'tank.bin')
+    tank.save(filename)
+    loaded_tank = Tank(fish_builder=fish_builder(), clock=clock)
+    loaded_tank.load(filename)
+    assert loaded_tank.fish[0].clock is clock
+    loaded_tank.fish[0].feed()
+    assert loaded_tank.fish[0].last_fed == later
+    new_fish = loaded_tank.fish_builder.make_fish('Bubbles',
+                                                  species_name='DEV_FISH',
+                                                  personality_name='DEV_PERSONALITY',
+                                                  clock=loaded_tank.clock)
+    assert new_fish.birth == later
+
+
 def test_remove_fish(tank, fish):
     assert len(tank.fish) == 0
     assert tank.remove_fish(FISH_NAME) == f'Error, could not remove {FISH_NAME}'
@@ -82,3 +120,37 @@ def test_clean(tank, fish):
     tank.last_checkin = current_time  # Reset checkin time
     tank.clean()
     assert tank.waste < 0.01
+
+
+def test_checkin_long_absence(tank, fish):
+    tank.last_checkin = 0
+    fish.last_checkin = 0
+    fish.last_fed = 0
+    fish.stress = 0
+    tank.add_fish(fish)
+    tank.checkin(DAY*365*50)
+    assert tank.last_checkin == DAY*365*50
+    assert abs(tank.waste - 0.05*365*50) < 1e-6
+    assert abs(fish.stress - 1) < 1e-9
+
+
+def test_checkin_fish(tank, fish):
+    fish.last_checkin = fish.last_fed = 1
+    fish.time_fed = 0
+    tank.add_fish(fish)
+    tank.checkin_fish(fish, 5)
+    assert fish.last_checkin == 5
+    assert fish.time_fed == 4
+    assert tank.last_checkin == 1
+    assert tank.waste == 0
+    # Catching up the tank later carries on from the fish's own check in
+    tank.checkin(8)
+    assert fish.last_checkin == tank.last_checkin == 8
+    assert fish.time_fed == 7
+
+
+def test_get_status(tank, fish):
+    fish.last_fed = fish.last_checkin = 1
+    tank.add_fish(fish)
+    status = tank.get_status(timestamp=2, rng=random.Random(0))
+    assert status == [f'{FISH_NAME} (DEV_FISH): normal']
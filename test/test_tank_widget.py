@@ -1,7 +1,10 @@
-from pytest import fixture
+from pytest import fixture, raises
+import os
+import urwid
 
 from src.fish.fish_builder import FishBuilder
 from src.urwid_interface.fish_art import FishArt
+from src.urwid_interface.movement import moving_fish
 from src.urwid_interface.tank_widget import TankWidget
 from src.tank import DEFAULT_HEIGHT, DEFAULT_WIDTH
 
@@ -33,3 +36,106 @@ def test_move_fish(tank_widget):
         for fish in tank_widget.fish:
             assert 0 < fish.x <= DEFAULT_WIDTH - len(fish.get_art())
             assert 0 < fish.y <= DEFAULT_HEIGHT
+
+
+def test_draw(tank_widget):
+    for _ in range(10):
+        tank_widget.draw()
+        rows = tank_widget.text_buffer.to_urwid()
+        for pile_row, tank_row in zip(tank_widget.pile.contents, rows):
+            assert pile_row[0].get_text() == urwid.Text(tank_row).get_text()
+
+
+def test_remove_fish(tank_widget):
+    assert len(tank_widget.fish) == 6
+    tank_widget.remove_fish('Fishy')
+    assert len(tank_widget.fish) == 5
+    assert len(tank_widget.grid) == 5
+    tank_widget.remove_fish('Not a fish')
+    assert len(tank_widget.fish) == 5
+
+
+def test_moving_fish(tank_widget):
+    tank_widget.fish *= 100
+    moving = sum(len(moving_fish(tank_widget.fish, 0.8*0.2, tank_widget.rng))
+                 for _ in range(100))
+    # 16% of 600 fish should move each frame
+    assert 8000 < moving < 11000
+
+
+class FakeLoop:
+    """Stands in for the urwid main loop's pipe watching."""
+    def __init__(self):
+        self.callback = None
+        self.pipe = None
+
+    def watch_pipe(self, callback):
+        self.callback = callback
+        self.pipe = os.pipe()
+        return self.pipe[1]
+
+    def remove_watch_pipe(self, write_fd):
+        for fd in self.pipe:
+            os.close(fd)
+        return True
+
+
+def test_animation(tank_widget):
+    loop = FakeLoop()
+    tank_widget.scheduler.frame_interval = 0.01
+    tank_widget.start_animation(loop)
+    assert tank_widget.running
+    # Wait for the simulation thread to signal a frame is ready
+    assert os.read(loop.pipe[0], 1)
+    tank_widget.stop_animation()
+    assert not tank_widget.running
+    loop.callback(b'.')
+    assert tank_widget.frame == {}
+    rows = tank_widget.text_buffer.to_urwid()
+    for pile_row, tank_row in zip(tank_widget.pile.contents, rows):
+        assert pile_row[0].get_text() == urwid.Text(tank_row).get_text()
+
+
+def test_clock(tank_widget):
+    times = []
+
+    def clock():
+        # Every call is a simulated second later
+        times.append(len(times))
+        return times[-1]
+    tank_widget = TankWidget(height=DEFAULT_HEIGHT, width=DEFAULT_WIDTH,
+                             fish=tank_widget.fish, refresh_rate=0.01,
+                             time_step=0.2, clock=clock)
+    assert tank_widget.scheduler.clock is clock
+    loop = FakeLoop()
+    tank_widget.start_animation(loop)
+    # A whole second passes before the first frame, so the fish move
+    assert os.read(loop.pipe[0], 1)
+    tank_widget.stop_animation()
+    assert len(times) > 1
+
+
+def test_resize(tank_widget):
+    tank_widget.resize(10, 5)
+    assert len(tank_widget.pile.contents) == 5
+    assert tank_widget.height == 6
+    tank_widget.pan(100, 100)
+    for _ in range(10):
+        tank_widget.draw()
+    # The viewport shows the bottom right corner of the tank
+    rows = range(DEFAULT_HEIGHT - 3, DEFAULT_HEIGHT + 2)
+    for pile_row, y in zip(tank_widget.pile.contents, rows):
+        expected = ''.join(tank_widget.text_buffer.get(x, y)[0]
+                           for x in range(DEFAULT_WIDTH - 8, DEFAULT_WIDTH + 2))
+        assert pile_row[0].get_text()[0] == expected
+    tank_widget.resize(100, 100)
+    assert len(tank_widget.pile.contents) == DEFAULT_HEIGHT + 2
+    rows = tank_widget.text_buffer.to_urwid()
+    for pile_row, tank_row in zip(tank_widget.pile.contents, rows):
+        assert pile_row[0].get_text() == urwid.Text(tank_row).get_text()
+
+
+def test_unknown_movement():
+    with raises(ValueError):
+        TankWidget(height=DEFAULT_HEIGHT, width=DEFAULT_WIDTH,
+                   movement='teleport')
@@ -37,3 +37,58 @@ def test_to_urwid(text_buffer):
                 else:
                     actual_row += part[-1]
             assert len(actual_row) == DEFAULT_WIDTH + 2
+
+
+def test_render_changes(text_buffer):
+    assert text_buffer.render_changes() == {}
+    text_buffer.add_text(x=5, y=3, text='fish', formatting='blue')
+    changes = text_buffer.render_changes()
+    assert list(changes.keys()) == [3]
+    assert changes[3] == [r'|    ', ('blue', 'fish'), r'                      |']
+    assert text_buffer.render_changes() == {}
+    # Drawing the same frame again doesn't change anything
+    text_buffer.clear()
+    text_buffer.add_text(x=5, y=3, text='fish', formatting='blue')
+    assert text_buffer.render_changes() == {}
+    text_buffer.clear()
+    changes = text_buffer.render_changes()
+    assert changes == {3: r'|                              |'}
+
+
+def test_add_text_clipped(text_buffer):
+    text_buffer.add_text(x=-2, y=2, text='<><', formatting='blue')
+    text_buffer.add_text(x=31, y=2, text='><>', formatting='blue')
+    assert text_buffer.get(0, 2) == ('<', 'blue')
+    assert text_buffer.get(31, 2) == ('>', 'blue')
+    assert text_buffer.to_urwid()[2] == [('blue', '<'), ' '*DEFAULT_WIDTH,
+                                         ('blue', '>')]
+
+
+def test_palette_ids(text_buffer):
+    assert text_buffer.palette[0] is None
+    text_buffer.add_text(x=1, y=2, text='fish', formatting='blue')
+    # Palette names that were already used get the same id
+    assert text_buffer.palette.count('blue') == 1
+    assert text_buffer.get(1, 2) == ('f', 'blue')
+    text_buffer.clear()
+    assert text_buffer.get(1, 2) == (' ', None)
+
+
+def test_window(text_buffer):
+    text_buffer.add_text(x=5, y=3, text='fish', formatting='blue')
+    text_buffer.render_changes()
+    assert text_buffer.set_window(4, 10)
+    assert not text_buffer.set_window(4, 10)
+    changes = text_buffer.render_changes()
+    assert changes[0] == '======'
+    assert changes[3] == [' ', ('blue', 'fish'), ' ']
+    assert changes[5] == 'o\\o   '
+
+
+def test_render_visible(text_buffer):
+    text_buffer.add_text(x=5, y=3, text='fish', formatting='blue')
+    text_buffer.add_text(x=5, y=8, text='fish', formatting='blue')
+    assert list(text_buffer.render_changes(range(0, 5))) == [3]
+    # Rows that weren't visible are rendered once they are
+    assert list(text_buffer.render_changes(range(5, 10))) == [8]
+    assert text_buffer.render_changes() == {}
@@ -0,0 +1,77 @@
+from pytest import fixture
+
+from src.fish.fish_builder import FishBuilder
+from src.tank import Tank
+from src.timeline import Timeline, HUNGRY, STARVING, GROWTH, CHECKIN, \
+    GROWTH_MARGIN
+
+START = 1000
+HUNGER_TIME = 10
+
+
+@fixture
+def tank():
+    builder = FishBuilder(species_file='test/species.json',
+                          personality_file='test/personalities.json')
+    tank = Tank(last_checkin=START, fish_builder=builder)
+    fish = builder.make_fish('Bubbles',
+                             species_name='DEV_FISH',
+                             personality_name='DEV_PERSONALITY')
+    fish.last_fed = START
+    fish.last_checkin = START
+    fish.time_fed = 0
+    tank.add_fish(fish)
+    return tank
+
+
+def kinds(events):
+    return [kind for _, kind in events]
+
+
+def test_hungry_and_starving(tank):
+    timeline = Timeline(tank, START)
+    assert timeline.advance(START + 0.3*HUNGER_TIME) == []
+    assert kinds(timeline.advance(START + 0.5*HUNGER_TIME)) == [HUNGRY]
+    assert kinds(timeline.advance(START + HUNGER_TIME)) == [STARVING]
+    fish = tank.fish[0]
+    assert timeline.states[fish].hungry
+    assert timeline.states[fish].starving
+
+
+def test_growth(tank):
+    timeline = Timeline(tank, START)
+    fish = tank.fish[0]
+    events = timeline.advance(START + HUNGER_TIME + GROWTH_MARGIN)
+    assert (fish, GROWTH) in events
+    assert timeline.states[fish].stage == 1
+    assert fish.get_art() == 'juvenile'
+    # Only the fish that grew was checked in on
+    assert tank.last_checkin == START
+    assert tank.waste == 0
+
+
+def test_reschedule_after_feeding(tank):
+    timeline = Timeline(tank, START)
+    fish = tank.fish[0]
+    tank.feed(START + 0.3*HUNGER_TIME)
+    timeline.reschedule(START + 0.3*HUNGER_TIME)
+    # Events from before the fish was fed are skipped
+    assert timeline.advance(START + 0.5*HUNGER_TIME) == []
+    assert kinds(timeline.advance(START + 0.8*HUNGER_TIME)) == [HUNGRY]
+    assert not timeline.states[fish].starving
+
+
+def test_daily_checkin(tank):
+    timeline = Timeline(tank, START)
+    timeline.advance(START + 5*24*60*60)
+    assert tank.last_checkin == START + 5*24*60*60
+    assert any(kind == CHECKIN for *_, kind in timeline.events)
+
+
+def test_get_status(tank):
+    timeline = Timeline(tank, START)
+    status = timeline.get_status(START + 1)
+    assert len(status) == 1
+    assert status[0].startswith('Bubbles (DEV_FISH): ')
+    # Nothing was due, so the tank wasn't checked in on
+    assert tank.last_checkin == START
@@ -0,0 +1,47 @@
+from pytest import fixture
+
+from src.urwid_interface.viewport import Viewport
+
+
+@fixture
+def viewport():
+    return Viewport(tank_width=100, tank_height=40)
+
+
+def test_whole_tank(viewport):
+    assert viewport.columns() == (0, 100)
+    assert viewport.rows() == range(0, 40)
+    assert not viewport.pan(5, 5)
+
+
+def test_resize(viewport):
+    assert viewport.resize(30, 10)
+    assert viewport.columns() == (0, 30)
+    assert viewport.rows() == range(0, 10)
+    assert not viewport.resize(30, 10)
+    # Can't be bigger than the tank
+    viewport.resize(200, 200)
+    assert viewport.columns() == (0, 100)
+    assert viewport.rows() == range(0, 40)
+
+
+def test_pan(viewport):
+    viewport.resize(30, 10)
+    assert viewport.pan(10, 5)
+    assert viewport.columns() == (10, 40)
+    assert viewport.rows() == range(5, 15)
+    # Stops at the edges of the tank
+    viewport.pan(1000, 1000)
+    assert viewport.columns() == (70, 100)
+    assert viewport.rows() == range(30, 40)
+    viewport.pan(-1000, -1000)
+    assert viewport.columns() == (0, 30)
+
+
+def test_resize_at_edge(viewport):
+    viewport.resize(30, 10)
+    viewport.pan(1000, 1000)
+    # Growing at the edge moves back so it stays inside the tank
+    viewport.resize(50, 20)
+    assert viewport.columns() == (50, 100)
+    assert viewport.rows() == range(20, 40)